@@ -0,0 +1,246 @@
+import { HazardStore } from '../src/data/index.js';
+import { seededRandom, StubHazard } from './stub.js';
+
+/**
+ * Options for the synthetic city
+ * @interface CityOptions
+ */
+export interface CityOptions {
+    /** Number of hazards */
+    hazards: number;
+    seed: number;
+    /** Number of districts, each with its own road grid; at most 24 */
+    districts?: number;
+    /** City center; defaults to the box the uniform stub data covers */
+    lat?: number;
+    lng?: number;
+    /** Radius of the built-up area in meters */
+    radiusM?: number;
+    /** Days of reports, ending at `end` */
+    days?: number;
+    /** Epoch milliseconds of the latest possible report */
+    end?: number;
+}
+
+/** The first eight match the uniform stub data, so existing benchmarks keep working */
+const DISTRICT_NAMES = [
+    'Downtown', 'Midtown', 'Uptown', 'Harbor', 'Riverside', 'Westside', 'Eastside', 'Airport',
+    'Northgate', 'Southport', 'Old Town', 'University', 'Industrial Park', 'Lakeside', 'Hillcrest', 'Chinatown',
+    'Financial District', 'Market', 'Parkview', 'Bayview', 'Fairview', 'Greenfield', 'Ironworks', 'Stadium',
+];
+
+const TYPES = ['pothole', 'crack', 'debris', 'flooding', 'sinkhole'];
+const TYPE_WEIGHTS = [0.55, 0.25, 0.09, 0.07, 0.04];
+
+/** Severity 1-5 weights per type; sinkholes skew severe, cracks mild */
+const SEVERITY_WEIGHTS = [
+    [0.25, 0.30, 0.25, 0.13, 0.07],
+    [0.45, 0.30, 0.15, 0.07, 0.03],
+    [0.40, 0.30, 0.20, 0.07, 0.03],
+    [0.20, 0.25, 0.25, 0.20, 0.10],
+    [0.05, 0.10, 0.20, 0.30, 0.35],
+];
+
+const STATUSES = ['open', 'in_progress', 'resolved'];
+
+/** Mean days to repair by severity; crews get to severe hazards first */
+const MEAN_REPAIR_DAYS = [0, 120, 60, 30, 14, 5];
+
+/** Share of hazards deferred to a later budget, taking DEFERRED_FACTOR times longer */
+const DEFERRED_SHARE = 0.1;
+const DEFERRED_FACTOR = 8;
+
+/** Share of hazards on an intersection rather than along a block */
+const INTERSECTION_SHARE = 0.15;
+
+/** Lateral spread of a hazard around the road centerline, in meters */
+const LANE_JITTER_M = 8;
+
+const DAY_MS = 86_400_000;
+const METERS_PER_DEGREE = 111_320;
+
+/**
+ * A district: a patch of rotated road grid with its own block size
+ * @interface District
+ */
+interface District {
+    x: number;
+    y: number;
+    radius: number;
+    cos: number;
+    sin: number;
+    avenueSpacing: number;
+    streetSpacing: number;
+}
+
+/** Cumulative distribution of weights, normalized to end at 1 */
+function cumulative(weights: number[]): Float64Array {
+    const total = weights.reduce((sum, weight) => sum + weight, 0);
+    const result = new Float64Array(weights.length);
+    let running = 0;
+    weights.forEach((weight, i) => {
+        running += weight / total;
+        result[i] = running;
+    });
+    result[weights.length - 1] = 1;
+    return result;
+}
+
+function pick(distribution: Float64Array, u: number): number {
+    let i = 0;
+    while (u > distribution[i]) {
+        i++;
+    }
+    return i;
+}
+
+/**
+ * Generates a synthetic city of hazards straight into store columns.
+ * Districts are laid out from the center outwards, each a rotated road
+ * grid; hazards fall along its avenues and streets, bunch at
+ * intersections, and thin out from district and city centers. Types,
+ * severities (by type), seasonal report times (peaking with late-winter
+ * freeze-thaw) and repair progress (faster for severe hazards) follow
+ * fixed distributions. The same options always give the same city.
+ * @param {CityOptions} options - City shape and size
+ * @returns {HazardStore} Store holding the hazards, ids 1..hazards
+ */
+export function generateCity(options: CityOptions): HazardStore {
+    const random = seededRandom(options.seed);
+    const count = options.hazards;
+    const districtCount = Math.min(DISTRICT_NAMES.length, options.districts ?? DISTRICT_NAMES.length);
+    const centerLat = options.lat ?? 40.725;
+    const centerLng = options.lng ?? -73.95;
+    const cityRadius = options.radiusM ?? 15_000;
+    const days = options.days ?? 730;
+    const end = options.end ?? Date.UTC(2026, 0, 1);
+    const start = end - days * DAY_MS;
+
+    // Sunflower layout puts district 0 (Downtown) in the middle
+    const cityAngle = random() * Math.PI;
+    const districts: District[] = [];
+    const districtWeights: number[] = [];
+    for (let i = 0; i < districtCount; i++) {
+        const distance = cityRadius * Math.sqrt(i / districtCount);
+        const angle = i * Math.PI * (3 - Math.sqrt(5));
+        const gridAngle = cityAngle + (random() - 0.5) * Math.PI / 3;
+        const density = Math.exp(-1.5 * distance / cityRadius);
+        districts.push({
+            x: distance * Math.cos(angle),
+            y: distance * Math.sin(angle),
+            radius: 1.2 * cityRadius / Math.sqrt(districtCount),
+            cos: Math.cos(gridAngle),
+            sin: Math.sin(gridAngle),
+            // Denser districts have shorter blocks
+            avenueSpacing: 180 + 200 * (1 - density),
+            streetSpacing: 70 + 60 * (1 - density),
+        });
+        districtWeights.push(density * (0.5 + random()));
+    }
+
+    const districtDistribution = cumulative(districtWeights);
+    const typeDistribution = cumulative(TYPE_WEIGHTS);
+    const severityDistributions = SEVERITY_WEIGHTS.map(cumulative);
+    const lngScale = 1 / (METERS_PER_DEGREE * Math.cos(centerLat * Math.PI / 180));
+
+    const ids: number[] = new Array(count);
+    const lat = new Float64Array(count);
+    const lng = new Float64Array(count);
+    const severity = new Uint8Array(count);
+    const type = new Uint16Array(count);
+    const status = new Uint16Array(count);
+    const area = new Uint16Array(count);
+    const createdAt = new Float64Array(count);
+    const updatedAt = new Float64Array(count);
+
+    for (let row = 0; row < count; row++) {
+        ids[row] = row + 1;
+
+        const d = pick(districtDistribution, random());
+        const district = districts[d];
+        // Gaussian offset from the district center, in grid coordinates
+        const radial = district.radius * 0.5 * Math.sqrt(-2 * Math.log(1 - random()));
+        const theta = 2 * Math.PI * random();
+        let gx = radial * Math.cos(theta);
+        let gy = radial * Math.sin(theta);
+        const road = random();
+        if (road < INTERSECTION_SHARE) {
+            gx = Math.round(gx / district.avenueSpacing) * district.avenueSpacing;
+            gy = Math.round(gy / district.streetSpacing) * district.streetSpacing;
+        } else if (road < 0.45) {
+            gx = Math.round(gx / district.avenueSpacing) * district.avenueSpacing + (random() - 0.5) * LANE_JITTER_M;
+        } else {
+            gy = Math.round(gy / district.streetSpacing) * district.streetSpacing + (random() - 0.5) * LANE_JITTER_M;
+        }
+        const x = district.x + gx * district.cos - gy * district.sin;
+        const y = district.y + gx * district.sin + gy * district.cos;
+        lat[row] = centerLat + y / METERS_PER_DEGREE;
+        lng[row] = centerLng + x * lngScale;
+        area[row] = d + 1;
+
+        const t = pick(typeDistribution, random());
+        const s = pick(severityDistributions[t], random()) + 1;
+        type[row] = t + 1;
+        severity[row] = s;
+
+        // Reports follow the seasons, peaking in late February
+        let created: number;
+        do {
+            created = start + random() * days * DAY_MS;
+        } while (random() > 0.7 + 0.3 * Math.cos(2 * Math.PI * ((created / DAY_MS) % 365.25 - 55) / 365.25));
+        created = Math.floor(created / 1000) * 1000;
+
+        const age = end - created;
+        const deferred = random() < DEFERRED_SHARE ? DEFERRED_FACTOR : 1;
+        const repair = -Math.log(1 - random()) * MEAN_REPAIR_DAYS[s] * deferred * DAY_MS;
+        createdAt[row] = created;
+        if (repair < age) {
+            status[row] = 3;
+            updatedAt[row] = created + Math.floor(repair / 1000) * 1000;
+        } else if (repair * 0.6 < age) {
+            status[row] = 2;
+            updatedAt[row] = created + Math.floor(repair * 0.6 / 1000) * 1000;
+        } else {
+            status[row] = 1;
+            updatedAt[row] = created;
+        }
+    }
+
+    return HazardStore.fromColumns({
+        ids,
+        lat,
+        lng,
+        severity,
+        type,
+        status,
+        area,
+        createdAt,
+        updatedAt,
+        types: [null, ...TYPES],
+        statuses: [null, ...STATUSES],
+        areas: [null, ...DISTRICT_NAMES.slice(0, districtCount)],
+    });
+}
+
+/**
+ * Converts generated hazards to rows for the Supabase stub
+ * @param {HazardStore} store - Generated hazards
+ * @returns {StubHazard[]} Rows in store order
+ */
+export function toStubHazards(store: HazardStore): StubHazard[] {
+    const rows: StubHazard[] = new Array(store.count);
+    for (let row = 0; row < store.count; row++) {
+        rows[row] = {
+            id: store.ids[row],
+            lat: store.lat[row],
+            lng: store.lng[row],
+            severity: store.severity[row],
+            type: store.types.decode(store.type[row])!,
+            status: store.statuses.decode(store.status[row])!,
+            area: store.areas.decode(store.area[row])!,
+            created_at: new Date(store.createdAt[row]).toISOString(),
+            updated_at: new Date(store.updatedAt[row]).toISOString(),
+        };
+    }
+    return rows;
+}
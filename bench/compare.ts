@@ -0,0 +1,45 @@
+import { readFileSync } from 'fs';
+
+/**
+ * Compares two benchmark reports written by bench/load.ts.
+ *
+ * Usage:
+ *   tsx bench/compare.ts <baseline.json> <candidate.json>
+ */
+
+function load(path: string): any {
+    return JSON.parse(readFileSync(path, 'utf8'));
+}
+
+function delta(before: number, after: number): string {
+    if (!before) {
+        return `${after}`;
+    }
+    const change = ((after - before) / before) * 100;
+    return `${before} -> ${after} (${change >= 0 ? '+' : ''}${change.toFixed(1)}%)`;
+}
+
+const [baselinePath, candidatePath] = process.argv.slice(2);
+if (!baselinePath || !candidatePath) {
+    console.error('Usage: tsx bench/compare.ts <baseline.json> <candidate.json>');
+    process.exit(1);
+}
+
+const baseline = load(baselinePath);
+const candidate = load(candidatePath);
+
+console.log(`${baseline.label}@${baseline.revision} vs ${candidate.label}@${candidate.revision}`);
+console.log(`throughput (calls/s): ${delta(baseline.throughput, candidate.throughput)}`);
+for (const metric of ['p50', 'p95', 'p99']) {
+    console.log(`overall ${metric} (ms): ${delta(baseline.overall[metric], candidate.overall[metric])}`);
+}
+for (const tool of Object.keys(candidate.tools)) {
+    const before = baseline.tools[tool];
+    const after = candidate.tools[tool];
+    if (!before) {
+        continue;
+    }
+    console.log(`${tool} p50/p99 (ms): ${delta(before.p50, after.p50)} / ${delta(before.p99, after.p99)}`);
+}
+console.log(`session creation p99 (ms): ${delta(baseline.sessionCreation.p99, candidate.sessionCreation.p99)}`);
+console.log(`rss growth (KB): ${delta(baseline.rss.growthKb, candidate.rss.growthKb)}`);
@@ -0,0 +1,95 @@
+import { writeSnapshot } from '../src/data/index.js';
+import { generateCity, toStubHazards } from './city.js';
+import { startStub } from './stub.js';
+
+/**
+ * Synthetic city-scale hazard data for benchmarks.
+ *
+ * Generates a deterministic city (see bench/city.ts) and either writes it
+ * as a hazard mirror snapshot, which the server warm-starts from with
+ * MIRROR_SNAPSHOT_PATH or serves offline with DATA_BACKEND=memory and
+ * DATA_FILE, or serves it from the Supabase stub.
+ *
+ * Usage:
+ *   tsx bench/generate.ts [--hazards 2000000] [--seed 42] [--districts 24]
+ *                         [--days 730] (--snapshot hazards.snapshot | --stub [--port 54321])
+ */
+
+/**
+ * Generator options
+ * @interface GenerateOptions
+ */
+interface GenerateOptions {
+    hazards: number;
+    seed: number;
+    districts: number;
+    days: number;
+    snapshot?: string;
+    stub: boolean;
+    port: number;
+}
+
+function parseOptions(argv: string[]): GenerateOptions {
+    const options: GenerateOptions = {
+        hazards: 2_000_000,
+        seed: 42,
+        districts: 24,
+        days: 730,
+        stub: false,
+        port: 54321,
+    };
+
+    for (let i = 0; i < argv.length; i++) {
+        const next = () => argv[++i];
+        switch (argv[i]) {
+            case '--hazards': options.hazards = Number(next()); break;
+            case '--seed': options.seed = Number(next()); break;
+            case '--districts': options.districts = Number(next()); break;
+            case '--days': options.days = Number(next()); break;
+            case '--snapshot': options.snapshot = next(); break;
+            case '--stub': options.stub = true; break;
+            case '--port': options.port = Number(next()); break;
+        }
+    }
+    if (!options.snapshot && !options.stub) {
+        throw new Error('Pass --snapshot <file> or --stub');
+    }
+    return options;
+}
+
+const rate = (rows: number, ms: number) => `${((rows / ms) * 1000 / 1e6).toFixed(2)}M rows/s`;
+
+async function main(): Promise<void> {
+    const options = parseOptions(process.argv.slice(2));
+
+    let started = performance.now();
+    const store = generateCity(options);
+    const generateMs = performance.now() - started;
+    console.log(`generated ${store.count} hazards in ${Math.round(generateMs)} ms (${rate(store.count, generateMs)})`);
+
+    if (options.snapshot) {
+        started = performance.now();
+        let latest = 0;
+        for (let row = 0; row < store.count; row++) {
+            latest = Math.max(latest, store.updatedAt[row]);
+        }
+        const bytes = await writeSnapshot(options.snapshot, store, {
+            watermark: new Date(latest).toISOString(),
+            fullLoadAt: Date.now(),
+        });
+        const writeMs = performance.now() - started;
+        console.log(`wrote ${(bytes / 1048576).toFixed(1)} MiB to ${options.snapshot} in ${Math.round(writeMs)} ms`);
+        console.log(`total ${rate(store.count, generateMs + writeMs)}`);
+    }
+
+    if (options.stub) {
+        started = performance.now();
+        const { url } = await startStub({ port: options.port, rows: toStubHazards(store) });
+        console.log(`Supabase stub serving ${store.count} hazards at ${url} (ready in ${Math.round(performance.now() - started)} ms)`);
+    }
+}
+
+main().catch((error) => {
+    console.error('Generation failed:', error);
+    process.exit(1);
+});
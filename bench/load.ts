@@ -0,0 +1,316 @@
+import { spawn, execFileSync, ChildProcess } from 'child_process';
+import { mkdirSync, writeFileSync, readFileSync } from 'fs';
+import { createServer } from 'net';
+import { Client } from '@modelcontextprotocol/sdk/client/index.js';
+import { StreamableHTTPClientTransport } from '@modelcontextprotocol/sdk/client/streamableHttp.js';
+import { startStub, seededRandom } from './stub.js';
+
+/**
+ * Load-generation benchmark for the /mcp endpoint.
+ *
+ * Starts a Supabase stub and the server (as a child process pointed at the
+ * stub), then drives concurrent MCP sessions through a weighted mix of tool
+ * calls and writes a JSON report that `bench/compare.ts` can diff.
+ *
+ * Usage:
+ *   tsx bench/load.ts [--sessions 50] [--duration 30] [--warmup 5]
+ *                     [--mix query_hazards=60,estimate_repair_plan=25,project_worsening=15]
+ *                     [--hazards 10000] [--stub-latency 0] [--server-args "--stateless"]
+ *                     [--dist] [--label name] [--out bench/results]
+ */
+
+/**
+ * Benchmark options
+ * @interface BenchOptions
+ */
+interface BenchOptions {
+    sessions: number;
+    durationS: number;
+    warmupS: number;
+    mix: { [tool: string]: number };
+    hazards: number;
+    stubLatencyMs: number;
+    serverArgs: string[];
+    dist: boolean;
+    label: string;
+    out: string;
+    seed: number;
+}
+
+/**
+ * Latency summary in milliseconds
+ * @interface LatencySummary
+ */
+interface LatencySummary {
+    count: number;
+    errors: number;
+    mean: number;
+    p50: number;
+    p95: number;
+    p99: number;
+    max: number;
+}
+
+function parseOptions(argv: string[]): BenchOptions {
+    const options: BenchOptions = {
+        sessions: 50,
+        durationS: 30,
+        warmupS: 5,
+        mix: { query_hazards: 60, estimate_repair_plan: 25, project_worsening: 15 },
+        hazards: 10_000,
+        stubLatencyMs: 0,
+        serverArgs: [],
+        dist: false,
+        label: 'run',
+        out: 'bench/results',
+        seed: 42,
+    };
+
+    for (let i = 0; i < argv.length; i++) {
+        const next = () => argv[++i];
+        switch (argv[i]) {
+            case '--sessions': options.sessions = Number(next()); break;
+            case '--duration': options.durationS = Number(next()); break;
+            case '--warmup': options.warmupS = Number(next()); break;
+            case '--hazards': options.hazards = Number(next()); break;
+            case '--stub-latency': options.stubLatencyMs = Number(next()); break;
+            case '--server-args': options.serverArgs = next().split(' ').filter(Boolean); break;
+            case '--dist': options.dist = true; break;
+            case '--label': options.label = next(); break;
+            case '--out': options.out = next(); break;
+            case '--seed': options.seed = Number(next()); break;
+            case '--mix':
+                options.mix = Object.fromEntries(next().split(',').map((entry) => {
+                    const [tool, weight] = entry.split('=');
+                    return [tool, Number(weight)];
+                }));
+                break;
+        }
+    }
+    return options;
+}
+
+function summarize(samples: number[], errors: number): LatencySummary {
+    const sorted = Float64Array.from(samples).sort();
+    const at = (q: number) => (sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))] : 0);
+    const sum = sorted.reduce((acc, value) => acc + value, 0);
+    const round = (value: number) => Math.round(value * 1000) / 1000;
+    return {
+        count: sorted.length,
+        errors,
+        mean: round(sorted.length ? sum / sorted.length : 0),
+        p50: round(at(0.5)),
+        p95: round(at(0.95)),
+        p99: round(at(0.99)),
+        max: round(sorted.length ? sorted[sorted.length - 1] : 0),
+    };
+}
+
+function freePort(): Promise<number> {
+    return new Promise((resolve, reject) => {
+        const probe = createServer();
+        probe.listen(0, '127.0.0.1', () => {
+            const address = probe.address();
+            probe.close(() => (typeof address === 'object' && address ? resolve(address.port) : reject(new Error('No port'))));
+        });
+    });
+}
+
+function rssKb(pid: number): number {
+    try {
+        return Number(execFileSync('ps', ['-o', 'rss=', '-p', String(pid)]).toString().trim());
+    } catch {
+        return 0;
+    }
+}
+
+function gitRevision(): string {
+    try {
+        return execFileSync('git', ['rev-parse', '--short', 'HEAD']).toString().trim();
+    } catch {
+        return 'unknown';
+    }
+}
+
+async function waitForHealth(url: string, timeoutMs: number): Promise<void> {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+        try {
+            const res = await fetch(`${url}/health`);
+            if (res.ok) {
+                return;
+            }
+        } catch {
+            // Not listening yet
+        }
+        await new Promise((resolve) => setTimeout(resolve, 100));
+    }
+    throw new Error(`Server did not become healthy within ${timeoutMs} ms`);
+}
+
+function startServer(options: BenchOptions, port: number, supabaseUrl: string): ChildProcess {
+    const entry = options.dist ? ['dist/index.js'] : ['--import', 'tsx', 'src/index.ts'];
+    return spawn(process.execPath, [...entry, '--port', String(port), ...options.serverArgs], {
+        env: { ...process.env, SUPABASE_URL: supabaseUrl, SUPABASE_KEY: 'bench', NODE_ENV: 'development' },
+        stdio: ['ignore', 'ignore', 'inherit'],
+    });
+}
+
+/**
+ * Builds tool arguments for a call, drawn from the synthetic data set
+ * @param {string} tool - Tool name
+ * @param {() => number} random - PRNG
+ * @param {number} hazards - Number of hazards in the stub
+ * @returns {any} Tool arguments
+ */
+function toolArguments(tool: string, random: () => number, hazards: number): any {
+    const hazardId = 1 + Math.floor(random() * hazards);
+    switch (tool) {
+        case 'query_hazards': {
+            const kinds = ['area_with_most_hazards', 'top_severe_in_area', 'counts_by_type', 'open_vs_resolved', 'radius'];
+            const kind = kinds[Math.floor(random() * kinds.length)];
+            return { kind, area: 'Downtown', lat: 40.55 + random() * 0.35, lng: -74.15 + random() * 0.4, radius: 1000 };
+        }
+        case 'estimate_repair_plan':
+            return { hazard_id: hazardId };
+        case 'project_worsening':
+            return random() < 0.5
+                ? { hazard_id: hazardId }
+                : { lat: 40.55 + random() * 0.35, lng: -74.15 + random() * 0.4 };
+        default:
+            return {};
+    }
+}
+
+async function main(): Promise<void> {
+    const options = parseOptions(process.argv.slice(2));
+    const stub = await startStub({ hazards: options.hazards, seed: options.seed, latencyMs: options.stubLatencyMs });
+    const port = await freePort();
+    const server = startServer(options, port, stub.url);
+    const baseUrl = `http://localhost:${port}`;
+
+    try {
+        await waitForHealth(baseUrl, 30_000);
+
+        const tools = Object.keys(options.mix);
+        const totalWeight = tools.reduce((acc, tool) => acc + options.mix[tool], 0);
+        const pickTool = (random: () => number) => {
+            let roll = random() * totalWeight;
+            for (const tool of tools) {
+                roll -= options.mix[tool];
+                if (roll < 0) {
+                    return tool;
+                }
+            }
+            return tools[tools.length - 1];
+        };
+
+        const latencies: { [tool: string]: number[] } = Object.fromEntries(tools.map((tool) => [tool, []]));
+        const errors: { [tool: string]: number } = Object.fromEntries(tools.map((tool) => [tool, 0]));
+        const sessionLatencies: number[] = [];
+        let sessionErrors = 0;
+
+        let measuring = false;
+        let stopping = false;
+        let rssStart = rssKb(server.pid!);
+        let rssPeak = rssStart;
+        const rssTimer = setInterval(() => {
+            rssPeak = Math.max(rssPeak, rssKb(server.pid!));
+        }, 1000);
+
+        const runSession = async (index: number) => {
+            const random = seededRandom(options.seed + index);
+            const client = new Client({ name: 'pothole-bench', version: '0.1.0' });
+            const transport = new StreamableHTTPClientTransport(new URL(`${baseUrl}/mcp`));
+
+            const connectStart = performance.now();
+            try {
+                await client.connect(transport);
+            } catch (error) {
+                sessionErrors++;
+                return;
+            }
+            sessionLatencies.push(performance.now() - connectStart);
+
+            while (!stopping) {
+                const tool = pickTool(random);
+                const started = performance.now();
+                let failed = false;
+                try {
+                    const result = await client.callTool({ name: tool, arguments: toolArguments(tool, random, options.hazards) });
+                    failed = Boolean(result.isError);
+                } catch {
+                    failed = true;
+                }
+                if (measuring) {
+                    latencies[tool].push(performance.now() - started);
+                    if (failed) {
+                        errors[tool]++;
+                    }
+                }
+            }
+
+            await transport.terminateSession().catch(() => {});
+            await client.close().catch(() => {});
+        };
+
+        const runs = Array.from({ length: options.sessions }, (_, index) => runSession(index));
+
+        await new Promise((resolve) => setTimeout(resolve, options.warmupS * 1000));
+        rssStart = rssKb(server.pid!);
+        measuring = true;
+        const measureStart = performance.now();
+        await new Promise((resolve) => setTimeout(resolve, options.durationS * 1000));
+        measuring = false;
+        const elapsedS = (performance.now() - measureStart) / 1000;
+        const rssEnd = rssKb(server.pid!);
+        stopping = true;
+        await Promise.all(runs);
+        clearInterval(rssTimer);
+
+        const perTool = Object.fromEntries(tools.map((tool) => [tool, summarize(latencies[tool], errors[tool])]));
+        const allSamples = tools.flatMap((tool) => latencies[tool]);
+        const allErrors = tools.reduce((acc, tool) => acc + errors[tool], 0);
+
+        const report = {
+            label: options.label,
+            version: JSON.parse(readFileSync('package.json', 'utf8')).version,
+            revision: gitRevision(),
+            timestamp: new Date().toISOString(),
+            node: process.version,
+            options,
+            throughput: Math.round((allSamples.length / elapsedS) * 10) / 10,
+            overall: summarize(allSamples, allErrors),
+            tools: perTool,
+            sessionCreation: summarize(sessionLatencies, sessionErrors),
+            rss: {
+                startKb: rssStart,
+                endKb: rssEnd,
+                peakKb: rssPeak,
+                growthKb: rssEnd - rssStart,
+            },
+        };
+
+        mkdirSync(options.out, { recursive: true });
+        const file = `${options.out}/${options.label}-${report.timestamp.replace(/[:.]/g, '-')}.json`;
+        writeFileSync(file, JSON.stringify(report, null, 2));
+
+        console.log(`throughput: ${report.throughput} calls/s over ${elapsedS.toFixed(1)} s`);
+        console.log(`overall: p50 ${report.overall.p50} ms, p95 ${report.overall.p95} ms, p99 ${report.overall.p99} ms, errors ${allErrors}`);
+        for (const tool of tools) {
+            const summary = perTool[tool];
+            console.log(`  ${tool}: n=${summary.count} p50 ${summary.p50} ms, p95 ${summary.p95} ms, p99 ${summary.p99} ms, errors ${summary.errors}`);
+        }
+        console.log(`session creation: p50 ${report.sessionCreation.p50} ms, p99 ${report.sessionCreation.p99} ms`);
+        console.log(`rss: ${rssStart} KB -> ${rssEnd} KB (peak ${rssPeak} KB)`);
+        console.log(`results written to ${file}`);
+    } finally {
+        server.kill('SIGINT');
+        stub.server.close();
+    }
+}
+
+main().catch((error) => {
+    console.error('Benchmark failed:', error);
+    process.exit(1);
+});
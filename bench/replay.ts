@@ -0,0 +1,234 @@
+import { mkdirSync, readFileSync, writeFileSync } from 'fs';
+
+/**
+ * Replays MCP traffic recorded with `--record <file>` against a server.
+ *
+ * Requests are re-sent on their recorded schedule, scaled by --speed (1 for
+ * real time, N for N times faster, max for no waiting). Requests of one
+ * recorded session go out one after another, in order, on a session of
+ * their own on the target; different sessions overlap as they did when
+ * recorded. A session recorded without its initialize request is opened
+ * with a synthetic one.
+ *
+ * Usage:
+ *   tsx bench/replay.ts <recording.jsonl> [--url http://localhost:3002/mcp]
+ *                       [--speed 1|N|max] [--label name] [--out bench/results]
+ */
+
+/**
+ * Replay options
+ * @interface ReplayOptions
+ */
+interface ReplayOptions {
+    file: string;
+    url: string;
+    /** Time scale; Infinity sends every request as soon as its session allows */
+    speed: number;
+    label: string;
+    out: string;
+}
+
+/**
+ * A recorded request, as written by the server's traffic recorder
+ * @interface RecordedRequest
+ */
+interface RecordedRequest {
+    t: number;
+    session?: string;
+    body: any;
+}
+
+/**
+ * Latency summary in milliseconds
+ * @interface LatencySummary
+ */
+interface LatencySummary {
+    count: number;
+    mean: number;
+    p50: number;
+    p95: number;
+    p99: number;
+    max: number;
+}
+
+function parseOptions(argv: string[]): ReplayOptions {
+    const options: ReplayOptions = {
+        file: '',
+        url: 'http://localhost:3002/mcp',
+        speed: 1,
+        label: 'replay',
+        out: 'bench/results',
+    };
+
+    for (let i = 0; i < argv.length; i++) {
+        const next = () => argv[++i];
+        switch (argv[i]) {
+            case '--url': options.url = next(); break;
+            case '--speed': {
+                const speed = next();
+                options.speed = speed === 'max' ? Infinity : Number(speed);
+                break;
+            }
+            case '--label': options.label = next(); break;
+            case '--out': options.out = next(); break;
+            default: options.file = argv[i];
+        }
+    }
+    if (!options.file) {
+        throw new Error('Usage: tsx bench/replay.ts <recording.jsonl> [--url URL] [--speed 1|N|max]');
+    }
+    if (!(options.speed > 0)) {
+        throw new Error('--speed must be a positive number or max');
+    }
+    return options;
+}
+
+function summarize(samples: number[]): LatencySummary {
+    const sorted = Float64Array.from(samples).sort();
+    const at = (q: number) => (sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))] : 0);
+    const sum = sorted.reduce((acc, value) => acc + value, 0);
+    const round = (value: number) => Math.round(value * 1000) / 1000;
+    return {
+        count: sorted.length,
+        mean: round(sorted.length ? sum / sorted.length : 0),
+        p50: round(at(0.5)),
+        p95: round(at(0.95)),
+        p99: round(at(0.99)),
+        max: round(sorted.length ? sorted[sorted.length - 1] : 0),
+    };
+}
+
+/**
+ * Groups recorded requests into per-session lanes, in recorded order.
+ * Requests without a session (stateless servers) each get a lane.
+ * @param {RecordedRequest[]} requests - Recorded requests
+ * @returns {RecordedRequest[][]} Lanes
+ */
+function toLanes(requests: RecordedRequest[]): RecordedRequest[][] {
+    const sorted = [...requests].sort((a, b) => a.t - b.t);
+    const bySession = new Map<string, RecordedRequest[]>();
+    const lanes: RecordedRequest[][] = [];
+    for (const request of sorted) {
+        if (request.session === undefined) {
+            lanes.push([request]);
+            continue;
+        }
+        let lane = bySession.get(request.session);
+        if (!lane) {
+            lane = [];
+            bySession.set(request.session, lane);
+            lanes.push(lane);
+        }
+        lane.push(request);
+    }
+    return lanes;
+}
+
+function isInitialize(body: any): boolean {
+    return body?.method === 'initialize' || (Array.isArray(body) && body.some((message) => message?.method === 'initialize'));
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function main(): Promise<void> {
+    const options = parseOptions(process.argv.slice(2));
+    const requests: RecordedRequest[] = readFileSync(options.file, 'utf8')
+        .split('\n')
+        .filter((line) => line.trim())
+        .map((line) => JSON.parse(line));
+    if (requests.length === 0) {
+        throw new Error(`${options.file} holds no recorded requests`);
+    }
+
+    const lanes = toLanes(requests);
+    const origin = requests.reduce((min, request) => Math.min(min, request.t), Infinity);
+    const latencies: number[] = [];
+    const lateness: number[] = [];
+    let errors = 0;
+    let synthetic = 0;
+
+    const send = async (body: unknown, session: string | undefined): Promise<string | undefined> => {
+        const started = performance.now();
+        try {
+            const res = await fetch(options.url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json, text/event-stream',
+                    ...(session ? { 'mcp-session-id': session } : {}),
+                },
+                body: JSON.stringify(body),
+            });
+            // Reading the whole body waits for streamed responses to finish
+            await res.text();
+            if (res.status >= 400) {
+                errors++;
+            }
+            return res.headers.get('mcp-session-id') ?? undefined;
+        } catch {
+            errors++;
+            return undefined;
+        } finally {
+            latencies.push(performance.now() - started);
+        }
+    };
+
+    const started = performance.now();
+    await Promise.all(lanes.map(async (lane) => {
+        let session: string | undefined;
+        if (lane[0].session !== undefined && !isInitialize(lane[0].body)) {
+            // Recording began mid-session; open one so the rest is accepted
+            synthetic++;
+            session = await send({
+                jsonrpc: '2.0',
+                id: 0,
+                method: 'initialize',
+                params: { protocolVersion: '2025-03-26', capabilities: {}, clientInfo: { name: 'pothole-replay', version: '1.0.0' } },
+            }, undefined);
+            await send({ jsonrpc: '2.0', method: 'notifications/initialized' }, session);
+        }
+
+        for (const request of lane) {
+            const due = (request.t - origin) / options.speed;
+            const wait = due - (performance.now() - started);
+            if (wait > 0) {
+                await sleep(wait);
+            }
+            if (isFinite(options.speed)) {
+                lateness.push(Math.max(0, performance.now() - started - due));
+            }
+            const issued = await send(request.body, session);
+            session ??= issued;
+        }
+    }));
+    const wallMs = performance.now() - started;
+
+    const report = {
+        label: options.label,
+        timestamp: new Date().toISOString(),
+        node: process.version,
+        options: { ...options, speed: isFinite(options.speed) ? options.speed : 'max' },
+        requests: requests.length,
+        sessions: lanes.length,
+        syntheticInitializes: synthetic,
+        errors,
+        wallMs: Math.round(wallMs),
+        requestsPerSecond: Math.round((latencies.length / wallMs) * 1000 * 10) / 10,
+        latencyMs: summarize(latencies),
+        // How far sends fell behind the recorded schedule; large values mean the replay is the bottleneck
+        latenessMs: summarize(lateness),
+    };
+
+    mkdirSync(options.out, { recursive: true });
+    const file = `${options.out}/${options.label}-${report.timestamp.replace(/[:.]/g, '-')}.json`;
+    writeFileSync(file, JSON.stringify(report, null, 2));
+
+    console.log(`${report.requests} requests over ${report.sessions} sessions in ${report.wallMs} ms (${report.requestsPerSecond} req/s), ${errors} errors`);
+    console.log(`latency p50 ${report.latencyMs.p50} ms, p99 ${report.latencyMs.p99} ms; schedule lag p99 ${report.latenessMs.p99} ms`);
+    console.log(`results written to ${file}`);
+}
+
+main().catch((error) => {
+    console.error('Replay failed:', error);
+    process.exit(1);
+});
@@ -0,0 +1,139 @@
+import { mkdirSync, mkdtempSync, rmSync, writeFileSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { createClient } from '@supabase/supabase-js';
+import { DEFAULT_MIRROR_OPTIONS, HazardMirror, readSnapshot, writeSnapshot } from '../src/data/index.js';
+import { startStub } from './stub.js';
+
+/**
+ * Time-to-ready benchmark for the hazard mirror.
+ *
+ * Starts a Supabase stub, then measures how long a fresh mirror takes to
+ * become ready with a full paged load, how long saving a snapshot takes,
+ * and how long a mirror warm-started from that snapshot (bulk read plus a
+ * delta sync) takes to become ready.
+ *
+ * Usage:
+ *   tsx bench/snapshot.ts [--hazards 200000] [--stub-latency 20] [--runs 3]
+ *                         [--label name] [--out bench/results]
+ */
+
+/**
+ * Benchmark options
+ * @interface SnapshotBenchOptions
+ */
+interface SnapshotBenchOptions {
+    hazards: number;
+    stubLatencyMs: number;
+    runs: number;
+    label: string;
+    out: string;
+    seed: number;
+}
+
+function parseOptions(argv: string[]): SnapshotBenchOptions {
+    const options: SnapshotBenchOptions = {
+        hazards: 200_000,
+        stubLatencyMs: 20,
+        runs: 3,
+        label: 'snapshot',
+        out: 'bench/results',
+        seed: 42,
+    };
+
+    for (let i = 0; i < argv.length; i++) {
+        const next = () => argv[++i];
+        switch (argv[i]) {
+            case '--hazards': options.hazards = Number(next()); break;
+            case '--stub-latency': options.stubLatencyMs = Number(next()); break;
+            case '--runs': options.runs = Number(next()); break;
+            case '--label': options.label = next(); break;
+            case '--out': options.out = next(); break;
+            case '--seed': options.seed = Number(next()); break;
+        }
+    }
+    return options;
+}
+
+const median = (values: number[]) => {
+    const sorted = [...values].sort((a, b) => a - b);
+    return Math.round(sorted[Math.floor(sorted.length / 2)] * 10) / 10;
+};
+
+async function timed<T>(fn: () => Promise<T>): Promise<[T, number]> {
+    const started = performance.now();
+    const result = await fn();
+    return [result, performance.now() - started];
+}
+
+async function main(): Promise<void> {
+    const options = parseOptions(process.argv.slice(2));
+    const stub = await startStub({ hazards: options.hazards, seed: options.seed, latencyMs: options.stubLatencyMs });
+    const supabase = createClient(stub.url, 'bench-key', {
+        auth: { persistSession: false, autoRefreshToken: false, detectSessionInUrl: false },
+    });
+    const directory = mkdtempSync(join(tmpdir(), 'pothole-snapshot-'));
+    const path = join(directory, 'hazards.snapshot');
+
+    const cold: number[] = [];
+    const save: number[] = [];
+    const read: number[] = [];
+    const warm: number[] = [];
+    let bytes = 0;
+
+    try {
+        for (let run = 0; run < options.runs; run++) {
+            rmSync(path, { force: true });
+
+            const coldMirror = new HazardMirror(supabase, { ...DEFAULT_MIRROR_OPTIONS });
+            cold.push((await timed(() => coldMirror.ready()))[1]);
+
+            const stats = coldMirror.stats();
+            const [written, saveMs] = await timed(() => writeSnapshot(path, coldMirror.store, {
+                watermark: stats.watermark,
+                fullLoadAt: Date.now(),
+            }));
+            bytes = written;
+            save.push(saveMs);
+
+            read.push((await timed(() => readSnapshot(path)))[1]);
+
+            const warmMirror = new HazardMirror(supabase, { ...DEFAULT_MIRROR_OPTIONS, snapshotPath: path });
+            warm.push((await timed(() => warmMirror.ready()))[1]);
+            if (!warmMirror.stats().restored || warmMirror.size !== coldMirror.size) {
+                throw new Error('Warm start did not restore the snapshot');
+            }
+        }
+
+        const report = {
+            label: options.label,
+            timestamp: new Date().toISOString(),
+            node: process.version,
+            options,
+            snapshotBytes: bytes,
+            coldReadyMs: median(cold),
+            snapshotWriteMs: median(save),
+            snapshotReadMs: median(read),
+            warmReadyMs: median(warm),
+            speedup: Math.round((median(cold) / median(warm)) * 10) / 10,
+        };
+
+        mkdirSync(options.out, { recursive: true });
+        const file = `${options.out}/${options.label}-${report.timestamp.replace(/[:.]/g, '-')}.json`;
+        writeFileSync(file, JSON.stringify(report, null, 2));
+
+        console.log(`${options.hazards} hazards, ${(bytes / 1048576).toFixed(1)} MiB snapshot`);
+        console.log(`cold start (full load): ${report.coldReadyMs} ms`);
+        console.log(`snapshot write: ${report.snapshotWriteMs} ms, read: ${report.snapshotReadMs} ms`);
+        console.log(`warm start (snapshot + delta sync): ${report.warmReadyMs} ms (${report.speedup}x faster)`);
+        console.log(`results written to ${file}`);
+    } finally {
+        rmSync(directory, { recursive: true, force: true });
+        stub.server.close();
+    }
+}
+
+main().catch((error) => {
+    console.error('Benchmark failed:', error);
+    process.exit(1);
+});
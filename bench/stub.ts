@@ -0,0 +1,286 @@
+import { createServer, IncomingMessage, Server, ServerResponse } from 'http';
+
+/**
+ * A synthetic hazard row, shaped like the hazards table
+ * @interface StubHazard
+ */
+export interface StubHazard {
+    id: number;
+    lat: number;
+    lng: number;
+    severity: number;
+    type: string;
+    status: string;
+    area: string;
+    created_at: string;
+    updated_at: string;
+}
+
+/**
+ * Options for the Supabase stub
+ * @interface StubOptions
+ */
+export interface StubOptions {
+    /** Port to listen on; 0 picks a free port */
+    port?: number;
+    /** Number of synthetic hazards to serve */
+    hazards?: number;
+    /** Seed for the synthetic data */
+    seed?: number;
+    /** Rows to serve instead of generating the uniform synthetic set */
+    rows?: StubHazard[];
+    /** Artificial latency added to every response, in milliseconds */
+    latencyMs?: number;
+}
+
+const TYPES = ['pothole', 'crack', 'debris', 'sinkhole', 'flooding'];
+const STATUSES = ['open', 'in_progress', 'resolved'];
+const AREAS = ['Downtown', 'Midtown', 'Uptown', 'Harbor', 'Riverside', 'Westside', 'Eastside', 'Airport'];
+
+/**
+ * Small deterministic PRNG (mulberry32)
+ * @param {number} seed - Seed value
+ * @returns {() => number} Generator of floats in [0, 1)
+ */
+export function seededRandom(seed: number): () => number {
+    let state = seed >>> 0;
+    return () => {
+        state = (state + 0x6d2b79f5) >>> 0;
+        let t = state;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+/**
+ * Generates synthetic hazards spread over a city-sized box
+ * @param {number} count - Number of hazards
+ * @param {number} seed - Seed value
+ * @returns {StubHazard[]} Hazards with ids 1..count
+ */
+export function generateHazards(count: number, seed: number): StubHazard[] {
+    const random = seededRandom(seed);
+    const start = Date.UTC(2025, 0, 1);
+    const hazards: StubHazard[] = [];
+    for (let id = 1; id <= count; id++) {
+        const reported = new Date(start + Math.floor(random() * 300 * 86_400_000)).toISOString();
+        hazards.push({
+            id,
+            lat: 40.55 + random() * 0.35,
+            lng: -74.15 + random() * 0.4,
+            severity: 1 + Math.floor(random() * 5),
+            type: TYPES[Math.floor(random() * TYPES.length)],
+            status: STATUSES[Math.floor(random() * STATUSES.length)],
+            area: AREAS[Math.floor(random() * AREAS.length)],
+            created_at: reported,
+            updated_at: reported,
+        });
+    }
+    return hazards;
+}
+
+/**
+ * Precomputed answers for the analytics RPCs, in the shapes
+ * AnalyticsRpcResults sets out
+ * @param {StubHazard[]} hazards - Hazards to aggregate
+ * @returns {{ [name: string]: (args: any) => unknown }} RPC implementations
+ */
+export function buildRpcs(hazards: StubHazard[]): { [name: string]: (args: any) => unknown } {
+    const countBy = (field: keyof StubHazard) => {
+        const counts = new Map<unknown, number>();
+        for (const hazard of hazards) {
+            counts.set(hazard[field], (counts.get(hazard[field]) || 0) + 1);
+        }
+        return Array.from(counts, ([key, count]) => ({ [field]: key, count }))
+            .sort((a, b) => b.count - a.count);
+    };
+
+    const byArea = countBy('area');
+    const byType = countBy('type');
+    const byStatus = countBy('status');
+    const resolved = hazards.filter((hazard) => hazard.status === 'resolved').length;
+
+    return {
+        area_with_most_hazards: () => byArea.slice(0, 1),
+        counts_by_type: () => byType,
+        open_vs_resolved: () => ({ open: hazards.length - resolved, resolved, by_status: byStatus }),
+        top_severe_in_area: (args: any) => hazards
+            .filter((hazard) => hazard.area === args?.area_name && hazard.status !== 'resolved')
+            .sort((a, b) => b.severity - a.severity || b.id - a.id)
+            .slice(0, 10),
+    };
+}
+
+/**
+ * Applies a PostgREST filter such as `eq.5`, `gt.10` or `in.(1,2,3)`
+ * @param {StubHazard[]} rows - Rows to filter
+ * @param {string} column - Column name
+ * @param {string} filter - PostgREST operator and operand
+ * @returns {StubHazard[]} Matching rows
+ */
+function applyFilter(rows: StubHazard[], column: string, filter: string): StubHazard[] {
+    const dot = filter.indexOf('.');
+    const op = filter.slice(0, dot);
+    const operand = filter.slice(dot + 1);
+    const value = (row: StubHazard) => (row as any)[column];
+    const coerce = (raw: string) => (column === 'id' || column === 'severity' ? Number(raw) : raw);
+
+    switch (op) {
+        case 'eq':
+            return rows.filter((row) => value(row) === coerce(operand));
+        case 'gt':
+            return rows.filter((row) => value(row) > coerce(operand));
+        case 'gte':
+            return rows.filter((row) => value(row) >= coerce(operand));
+        case 'lt':
+            return rows.filter((row) => value(row) < coerce(operand));
+        case 'lte':
+            return rows.filter((row) => value(row) <= coerce(operand));
+        case 'in': {
+            const wanted = new Set(operand.replace(/^\(|\)$/g, '').split(',').map((raw) => coerce(raw.replace(/^"|"$/g, ''))));
+            return rows.filter((row) => wanted.has(value(row)));
+        }
+        default:
+            return rows;
+    }
+}
+
+/**
+ * Starts a PostgREST-compatible stub serving synthetic hazards.
+ * Supports what the server's Supabase calls use: `select`, `eq`/`gt`/`in`
+ * filters, `order`, `limit`, `offset`, single-object responses, and the
+ * four analytics RPCs.
+ * @param {StubOptions} options - Stub options
+ * @returns {Promise<{ url: string, server: Server, hazards: StubHazard[] }>} Running stub
+ */
+export async function startStub(options: StubOptions = {}): Promise<{ url: string, server: Server, hazards: StubHazard[] }> {
+    const hazards = options.rows ?? generateHazards(options.hazards ?? 10_000, options.seed ?? 42);
+    const byId = new Map(hazards.map((hazard) => [hazard.id, hazard]));
+    const rpcs = buildRpcs(hazards);
+    const latencyMs = options.latencyMs ?? 0;
+
+    const server = createServer(async (req, res) => {
+        if (latencyMs > 0) {
+            await new Promise((resolve) => setTimeout(resolve, latencyMs));
+        }
+        try {
+            await handleStubRequest(req, res, hazards, byId, rpcs);
+        } catch (error: any) {
+            sendJson(res, 500, { code: 'STUB', message: error.message, details: null, hint: null });
+        }
+    });
+
+    await new Promise<void>((resolve) => server.listen(options.port ?? 0, '127.0.0.1', resolve));
+    const address = server.address();
+    const port = typeof address === 'object' && address ? address.port : options.port;
+    return { url: `http://127.0.0.1:${port}`, server, hazards };
+}
+
+async function handleStubRequest(
+    req: IncomingMessage,
+    res: ServerResponse,
+    hazards: StubHazard[],
+    byId: Map<number, StubHazard>,
+    rpcs: { [name: string]: (args: any) => unknown }
+): Promise<void> {
+    const url = new URL(req.url!, 'http://stub');
+    const rpc = url.pathname.match(/^\/rest\/v1\/rpc\/([a-z_]+)$/);
+
+    if (rpc) {
+        const body = await readBody(req);
+        const fn = rpcs[rpc[1]];
+        if (!fn) {
+            sendJson(res, 404, { code: 'PGRST202', message: `Could not find the function ${rpc[1]}`, details: null, hint: null });
+            return;
+        }
+        sendJson(res, 200, fn(body ? JSON.parse(body) : {}));
+        return;
+    }
+
+    if (url.pathname !== '/rest/v1/hazards') {
+        sendJson(res, 404, { code: 'PGRST205', message: 'Not found', details: null, hint: null });
+        return;
+    }
+
+    let rows: StubHazard[] = hazards;
+    const idFilter = url.searchParams.get('id');
+    if (idFilter?.startsWith('eq.')) {
+        // Fast path for the lookups the tools make on every call
+        const hazard = byId.get(Number(idFilter.slice(3)));
+        rows = hazard ? [hazard] : [];
+    }
+    for (const [column, filter] of url.searchParams) {
+        if (['select', 'order', 'limit', 'offset'].includes(column) || (column === 'id' && idFilter?.startsWith('eq.'))) {
+            continue;
+        }
+        rows = applyFilter(rows, column, filter);
+    }
+
+    const order = url.searchParams.get('order');
+    if (order) {
+        const keys = order.split(',').map((key) => {
+            const [column, direction] = key.split('.');
+            return { column, sign: direction === 'desc' ? -1 : 1 };
+        });
+        rows = [...rows].sort((a: any, b: any) => {
+            for (const { column, sign } of keys) {
+                if (a[column] !== b[column]) {
+                    return a[column] > b[column] ? sign : -sign;
+                }
+            }
+            return 0;
+        });
+    }
+
+    const offset = Number(url.searchParams.get('offset') ?? 0);
+    const limit = url.searchParams.has('limit') ? Number(url.searchParams.get('limit')) : rows.length;
+    rows = rows.slice(offset, offset + limit);
+
+    const select = url.searchParams.get('select');
+    const projected = select && select !== '*'
+        ? rows.map((row: any) => Object.fromEntries(select.split(',').map((column) => [column.trim(), row[column.trim()]])))
+        : rows;
+
+    if ((req.headers.accept ?? '').includes('application/vnd.pgrst.object+json')) {
+        if (projected.length !== 1) {
+            sendJson(res, 406, {
+                code: 'PGRST116',
+                message: 'JSON object requested, multiple (or no) rows returned',
+                details: `The result contains ${projected.length} rows`,
+                hint: null,
+            });
+            return;
+        }
+        sendJson(res, 200, projected[0]);
+        return;
+    }
+
+    sendJson(res, 200, projected);
+}
+
+function readBody(req: IncomingMessage): Promise<string> {
+    return new Promise((resolve, reject) => {
+        const chunks: Buffer[] = [];
+        req.on('data', (chunk) => chunks.push(chunk));
+        req.on('end', () => resolve(Buffer.concat(chunks).toString('utf8')));
+        req.on('error', reject);
+    });
+}
+
+function sendJson(res: ServerResponse, status: number, body: unknown): void {
+    const payload = JSON.stringify(body);
+    res.writeHead(status, {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Content-Length': Buffer.byteLength(payload),
+    });
+    res.end(payload);
+}
+
+if (import.meta.url === `file://${process.argv[1]}`) {
+    const port = Number(process.argv[2] ?? 54321);
+    const count = Number(process.argv[3] ?? 10_000);
+    startStub({ port, hazards: count }).then(({ url }) => {
+        console.log(`Supabase stub serving ${count} hazards at ${url}`);
+    });
+}
@@ -0,0 +1,150 @@
+/**
+ * Cache counters exposed for monitoring
+ * @interface CacheStats
+ */
+export interface CacheStats {
+    size: number;
+    maxEntries: number;
+    /** Lookups answered with a fresh value */
+    hits: number;
+    /** Lookups answered with an expired value while it was refreshed */
+    staleHits: number;
+    /** Lookups that had to wait for the loader */
+    misses: number;
+    /** Background refreshes started */
+    refreshes: number;
+    /** Background refreshes that failed, leaving the stale value in place */
+    refreshErrors: number;
+    /** Entries dropped to stay within maxEntries */
+    evictions: number;
+}
+
+/**
+ * Freshness policy for a cached value
+ * @interface CachePolicy
+ */
+export interface CachePolicy {
+    /** Time a value is served as fresh */
+    ttlMs: number;
+    /** Extra time an expired value may still be served while it is refreshed */
+    staleMs: number;
+}
+
+interface CacheEntry<V> {
+    value: V;
+    freshUntil: number;
+    staleUntil: number;
+    refreshing: boolean;
+}
+
+/**
+ * Bounded in-process cache with per-lookup TTL, LRU eviction and
+ * stale-while-revalidate. Entries are kept in a Map in least-recently-used
+ * order. An expired entry still inside its stale window is returned at once
+ * and refreshed in the background, so callers only wait on the loader when
+ * nothing usable is cached. Loader failures are never cached.
+ * @class TtlCache
+ */
+export class TtlCache<V> {
+    private entries = new Map<string, CacheEntry<V>>();
+    private hits = 0;
+    private staleHits = 0;
+    private misses = 0;
+    private refreshes = 0;
+    private refreshErrors = 0;
+    private evictions = 0;
+
+    /**
+     * Creates a new TtlCache
+     * @param {number} maxEntries - Maximum number of cached values
+     */
+    constructor(private readonly maxEntries: number) {}
+
+    /**
+     * Returns the cached value for a key, loading it when necessary
+     * @param {string} key - Cache key
+     * @param {CachePolicy} policy - Freshness policy for this key
+     * @param {(signal?: AbortSignal) => Promise<V>} load - Loader; a rejection is passed to the caller and not cached
+     * @param {AbortSignal} [signal] - Passed to loads the caller waits for; background refreshes run without it
+     * @returns {Promise<V>} Cached or freshly loaded value
+     */
+    async get(key: string, policy: CachePolicy, load: (signal?: AbortSignal) => Promise<V>, signal?: AbortSignal): Promise<V> {
+        const now = Date.now();
+        const entry = this.entries.get(key);
+
+        if (entry && now < entry.staleUntil) {
+            this.entries.delete(key);
+            this.entries.set(key, entry);
+
+            if (now < entry.freshUntil) {
+                this.hits++;
+            } else {
+                this.staleHits++;
+                this.refresh(key, entry, policy, load);
+            }
+            return entry.value;
+        }
+
+        this.misses++;
+        const value = await load(signal);
+        this.set(key, value, policy);
+        return value;
+    }
+
+    /**
+     * Drops every cached value
+     */
+    clear(): void {
+        this.entries.clear();
+    }
+
+    /**
+     * Returns cache counters
+     * @returns {CacheStats} Cache counters
+     */
+    stats(): CacheStats {
+        return {
+            size: this.entries.size,
+            maxEntries: this.maxEntries,
+            hits: this.hits,
+            staleHits: this.staleHits,
+            misses: this.misses,
+            refreshes: this.refreshes,
+            refreshErrors: this.refreshErrors,
+            evictions: this.evictions,
+        };
+    }
+
+    private refresh(key: string, entry: CacheEntry<V>, policy: CachePolicy, load: (signal?: AbortSignal) => Promise<V>): void {
+        if (entry.refreshing) {
+            return;
+        }
+        entry.refreshing = true;
+        this.refreshes++;
+
+        load().then(
+            (value) => this.set(key, value, policy),
+            () => {
+                entry.refreshing = false;
+                this.refreshErrors++;
+            }
+        );
+    }
+
+    private set(key: string, value: V, policy: CachePolicy): void {
+        const now = Date.now();
+        this.entries.delete(key);
+        this.entries.set(key, {
+            value,
+            freshUntil: now + policy.ttlMs,
+            staleUntil: now + policy.ttlMs + policy.staleMs,
+            refreshing: false,
+        });
+
+        while (this.entries.size > this.maxEntries) {
+            const oldest = this.entries.keys().next().value as string;
+            this.entries.delete(oldest);
+            this.evictions++;
+        }
+    }
+}
@@ -7,6 +7,14 @@ export interface CliOptions {
     port?: number;
     /** Force STDIO transport mode */
     stdio?: boolean;
+    /** Serve HTTP requests without MCP sessions */
+    stateless?: boolean;
+    /** Number of HTTP worker processes */
+    workers?: number;
+    /** Indent JSON in tool results */
+    pretty?: boolean;
+    /** JSONL file to record incoming MCP requests to */
+    record?: string;
 }
 
 /**
@@ -18,6 +26,15 @@ export interface CliOptions {
  * @example
  * // node index.js --stdio
  * // Returns: { stdio: true }
+ * @example
+ * // node index.js --port 3002 --stateless
+ * // Returns: { port: 3002, stateless: true }
+ * @example
+ * // node index.js --port 3002 --workers 4
+ * // Returns: { port: 3002, workers: 4 }
+ * @example
+ * // node index.js --port 3002 --record traffic.jsonl
+ * // Returns: { port: 3002, record: 'traffic.jsonl' }
  */
 export function parseArgs(): CliOptions {
     const args = process.argv.slice(2);
@@ -33,6 +50,22 @@ export function parseArgs(): CliOptions {
             case '--stdio':
                 options.stdio = true;
                 break;
+            case '--stateless':
+                options.stateless = true;
+                break;
+            case '--pretty':
+                options.pretty = true;
+                break;
+            case '--workers':
+                if (i + 1 < args.length) {
+                    options.workers = parseInt(args[++i], 10);
+                }
+                break;
+            case '--record':
+                if (i + 1 < args.length) {
+                    options.record = args[++i];
+                }
+                break;
         }
     }
 
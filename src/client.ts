@@ -1,11 +1,250 @@
-import { createClient } from '@supabase/supabase-js';
+import { createClient, SupabaseClient } from '@supabase/supabase-js';
+import { supabaseDuration } from './metrics.js';
+
+/** Default number of concurrent upstream connections per Supabase project */
+export const DEFAULT_POOL_SIZE = 64;
+
+/**
+ * Point-in-time statistics for a pooled Supabase client
+ * @interface ClientPoolStats
+ */
+export interface ClientPoolStats {
+    /** Supabase project URL the pool belongs to */
+    url: string;
+    /** Maximum number of concurrent upstream requests */
+    size: number;
+    /** Requests currently holding a connection slot */
+    active: number;
+    /** Requests waiting for a free slot */
+    queued: number;
+    /** Highest number of concurrently active requests observed */
+    peakActive: number;
+    /** Total requests sent through the pool */
+    totalRequests: number;
+    /** Requests that had to wait because every slot was busy */
+    saturatedRequests: number;
+    /** Requests aborted while waiting for a slot */
+    abandonedRequests: number;
+    /** Current utilisation, active / size (1 means fully saturated) */
+    saturation: number;
+}
+
+/**
+ * Bounded keep-alive connection pool in front of the global fetch.
+ * Node's built-in fetch keeps idle sockets alive per origin; capping the
+ * number of concurrent requests caps the number of sockets it opens, and
+ * requests beyond the cap wait in FIFO order for a free slot. A slot is
+ * held until the response body has been read to the end, cancelled or
+ * failed, since the socket stays busy until then. A request whose signal
+ * aborts while it waits leaves the queue without taking one.
+ * @class ConnectionPool
+ */
+export class ConnectionPool {
+    private active = 0;
+    private peakActive = 0;
+    private totalRequests = 0;
+    private saturatedRequests = 0;
+    private abandonedRequests = 0;
+    private waiters: Array<() => void> = [];
+
+    /**
+     * Creates a new ConnectionPool
+     * @param {string} url - Upstream URL, used for reporting
+     * @param {number} size - Maximum number of concurrent requests
+     */
+    constructor(private readonly url: string, private readonly size: number) {}
+
+    /**
+     * Fetch implementation handed to the Supabase client
+     * @param {RequestInfo | URL} input - Request target
+     * @param {RequestInit} [init] - Request options
+     * @returns {Promise<Response>} Upstream response
+     */
+    fetch = async (input: RequestInfo | URL, init?: RequestInit): Promise<Response> => {
+        await this.acquire(init?.signal ?? undefined);
+        const started = performance.now();
+        let response: Response;
+        try {
+            response = await fetch(input, init);
+        } catch (error) {
+            this.release();
+            throw error;
+        } finally {
+            supabaseDuration.labels({ target: requestTarget(input) }).observe((performance.now() - started) / 1000);
+        }
+
+        if (!response.body) {
+            this.release();
+            return response;
+        }
+        return new Response(releaseWhenConsumed(response.body, () => this.release()), {
+            status: response.status,
+            statusText: response.statusText,
+            headers: response.headers,
+        });
+    };
+
+    /**
+     * Returns current pool statistics
+     * @returns {ClientPoolStats} Pool statistics
+     */
+    stats(): ClientPoolStats {
+        return {
+            url: this.url,
+            size: this.size,
+            active: this.active,
+            queued: this.waiters.length,
+            peakActive: this.peakActive,
+            totalRequests: this.totalRequests,
+            saturatedRequests: this.saturatedRequests,
+            abandonedRequests: this.abandonedRequests,
+            saturation: this.active / this.size,
+        };
+    }
+
+    private acquire(signal?: AbortSignal): Promise<void> {
+        if (signal?.aborted) {
+            return Promise.reject(signal.reason);
+        }
+        this.totalRequests++;
+        if (this.active < this.size) {
+            this.take();
+            return Promise.resolve();
+        }
+
+        this.saturatedRequests++;
+        return new Promise((resolve, reject) => {
+            const onAbort = () => {
+                const index = this.waiters.indexOf(waiter);
+                if (index >= 0) {
+                    this.waiters.splice(index, 1);
+                    this.abandonedRequests++;
+                    reject(signal!.reason);
+                }
+            };
+            const waiter = () => {
+                signal?.removeEventListener('abort', onAbort);
+                this.take();
+                resolve();
+            };
+            signal?.addEventListener('abort', onAbort, { once: true });
+            this.waiters.push(waiter);
+        });
+    }
+
+    private take(): void {
+        this.active++;
+        if (this.active > this.peakActive) {
+            this.peakActive = this.active;
+        }
+    }
+
+    private release(): void {
+        this.active--;
+        const next = this.waiters.shift();
+        if (next) {
+            next();
+        }
+    }
+}
+
+/**
+ * Wraps a response body so a callback runs once it has been read to the
+ * end, cancelled, or failed
+ * @param {ReadableStream<Uint8Array>} body - Response body
+ * @param {() => void} onSettled - Called exactly once
+ * @returns {ReadableStream<Uint8Array>} Body passing the same bytes through
+ */
+function releaseWhenConsumed(body: ReadableStream<Uint8Array>, onSettled: () => void): ReadableStream<Uint8Array> {
+    const reader = body.getReader();
+    let settled = false;
+    const settle = () => {
+        if (!settled) {
+            settled = true;
+            onSettled();
+        }
+    };
+
+    return new ReadableStream<Uint8Array>({
+        async pull(controller) {
+            try {
+                const { value, done } = await reader.read();
+                if (done) {
+                    settle();
+                    controller.close();
+                } else {
+                    controller.enqueue(value);
+                }
+            } catch (error) {
+                settle();
+                controller.error(error);
+            }
+        },
+        cancel(reason) {
+            settle();
+            return reader.cancel(reason);
+        },
+    });
+}
+
+/**
+ * Names the RPC or table a PostgREST request targets, for metric labels
+ * @param {RequestInfo | URL} input - Request target
+ * @returns {string} `rpc:<name>`, `table:<name>`, or `other`
+ */
+function requestTarget(input: RequestInfo | URL): string {
+    const href = typeof input === 'string' ? input : input instanceof URL ? input.href : input.url;
+    const match = href.match(/\/rest\/v1\/(rpc\/)?([^/?#]+)/);
+    if (!match) {
+        return 'other';
+    }
+    return match[1] ? `rpc:${match[2]}` : `table:${match[2]}`;
+}
+
+/** Process-wide registry of shared clients, keyed by project URL and key */
+const registry = new Map<string, { client: SupabaseClient; pool: ConnectionPool }>();
 
 /**
- * Creates a new Supabase client instance.
+ * Returns the shared Supabase client for a project, creating it on first use.
+ * Every caller with the same URL and key gets the same client and the same
+ * connection pool. Sessions are not persisted and tokens are not refreshed,
+ * so the shared client runs no per-instance timers.
  * @param {string} supabaseUrl The URL of the Supabase project.
  * @param {string} supabaseKey The API key for the Supabase project.
- * @returns {SupabaseClient} A new Supabase client instance.
+ * @param {number} [poolSize] Maximum concurrent upstream requests, applied on first creation.
+ * @returns {SupabaseClient} The shared Supabase client instance.
+ */
+export function getSupabaseClient(
+    supabaseUrl: string,
+    supabaseKey: string,
+    poolSize: number = DEFAULT_POOL_SIZE
+): SupabaseClient {
+    const registryKey = `${supabaseUrl}\u0000${supabaseKey}`;
+    const existing = registry.get(registryKey);
+    if (existing) {
+        return existing.client;
+    }
+
+    const pool = new ConnectionPool(supabaseUrl, Math.max(1, poolSize));
+    const client = createClient(supabaseUrl, supabaseKey, {
+        auth: {
+            persistSession: false,
+            autoRefreshToken: false,
+            detectSessionInUrl: false,
+        },
+        global: {
+            fetch: pool.fetch,
+        },
+    });
+
+    registry.set(registryKey, { client, pool });
+    return client;
+}
+
+/**
+ * Returns statistics for every pooled client in the registry
+ * @returns {ClientPoolStats[]} One entry per shared client
  */
-export function createSupabaseClient(supabaseUrl: string, supabaseKey: string) {
-    return createClient(supabaseUrl, supabaseKey);
-}
\ No newline at end of file
+export function getClientPoolStats(): ClientPoolStats[] {
+    return Array.from(registry.values(), ({ pool }) => pool.stats());
+}
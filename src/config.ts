@@ -1,4 +1,13 @@
 import dotenv from 'dotenv';
+import { DEFAULT_POOL_SIZE } from './client.js';
+import { DEFAULT_MAX_SESSIONS, DEFAULT_SESSION_IDLE_TTL_MS } from './transport/sessions.js';
+import { DEFAULT_COMPRESSION_THRESHOLD } from './transport/compression.js';
+import type { OutputFormat } from './tools/format.js';
+import { DEFAULT_MIRROR_OPTIONS } from './data/mirror.js';
+import type { DataBackend } from './data/backend.js';
+import { DEFAULT_WEATHER_OPTIONS } from './weather/cached.js';
+import { DEFAULT_COMPUTE_POOL_OPTIONS } from './workers/pool.js';
+import { DEFAULT_DEADLINE_OPTIONS, parseToolDeadlines } from './deadlines.js';
 
 // Load environment variables from .env file
 dotenv.config();
@@ -8,9 +17,60 @@ dotenv.config();
  * @interface Config
  */
 export interface Config {
-    supabaseUrl: string;
-    supabaseKey: string;
+    /** Where hazards are read from: Supabase, or a local file held in memory */
+    dataBackend: DataBackend;
+    /** Hazard snapshot or JSON file served by the memory backend */
+    dataFile?: string;
+    /** Supabase project, required by the Supabase backend */
+    supabaseUrl?: string;
+    supabaseKey?: string;
+    /** Maximum concurrent upstream requests shared by all sessions */
+    supabasePoolSize: number;
     port: number;
+    /** Serve HTTP requests without MCP sessions, reusing prebuilt servers */
+    stateless: boolean;
+    /** Maximum number of live HTTP sessions */
+    maxSessions: number;
+    /** Idle time after which an HTTP session is evicted */
+    sessionIdleTtlMs: number;
+    /** Number of HTTP worker processes; 1 serves from the main process */
+    workers: number;
+    /** Index of this process in cluster mode, unset outside a worker */
+    workerId?: number;
+    /** JSON layout of tool results */
+    outputFormat: OutputFormat;
+    /** Compress HTTP responses when the client accepts gzip or brotli */
+    compression: boolean;
+    /** Minimum response size in bytes before compression is applied */
+    compressionThreshold: number;
+    /** Interval between hazard mirror delta syncs */
+    mirrorSyncIntervalMs: number;
+    /** Mirror lag beyond which hazard reads go straight to Supabase */
+    mirrorMaxLagMs: number;
+    /** Interval between full reloads of the hazard mirror */
+    mirrorFullReloadIntervalMs: number;
+    /** File the hazard mirror is saved to and warm-started from, if any */
+    mirrorSnapshotPath?: string;
+    /** Minimum interval between hazard mirror snapshot writes */
+    mirrorSnapshotIntervalMs: number;
+    /** Local weather file used by project_worsening; unset assumes rain */
+    weatherFile?: string;
+    /** Geohash length of a weather cache cell */
+    weatherCellPrecision: number;
+    /** Time a weather lookup is reused for its cell and hour */
+    weatherCacheTtlMs: number;
+    /** Maximum number of cell-hours in the weather cache */
+    weatherCacheMaxEntries: number;
+    /** Worker threads for CPU-heavy tool work; 0 keeps it on the event loop */
+    computeThreads: number;
+    /** Compute tasks allowed to wait for a thread before new ones are refused */
+    computeQueueLimit: number;
+    /** JSONL file incoming HTTP requests are recorded to; unset disables recording */
+    recordPath?: string;
+    /** Time a tool call may run before it is abandoned; 0 disables */
+    toolDeadlineMs: number;
+    /** Deadlines of individual tools, overriding toolDeadlineMs */
+    toolDeadlines: { [tool: string]: number };
     isProduction: boolean;
 }
 
@@ -20,18 +80,108 @@ export interface Config {
  * @throws {Error} If any required environment variables are missing
  */
 export function loadConfig(): Config {
+    const dataBackend: DataBackend = process.env.DATA_BACKEND === 'memory' ? 'memory' : 'supabase';
+    const dataFile = process.env.DATA_FILE || undefined;
     const supabaseUrl = process.env.SUPABASE_URL;
     const supabaseKey = process.env.SUPABASE_KEY;
+    const supabasePoolSize = process.env.SUPABASE_POOL_SIZE
+        ? parseInt(process.env.SUPABASE_POOL_SIZE, 10)
+        : DEFAULT_POOL_SIZE;
     const port = process.env.PORT ? parseInt(process.env.PORT, 10) : 8080;
+    const stateless = process.env.MCP_STATELESS === 'true';
+    const maxSessions = process.env.MAX_SESSIONS
+        ? parseInt(process.env.MAX_SESSIONS, 10)
+        : DEFAULT_MAX_SESSIONS;
+    const sessionIdleTtlMs = process.env.SESSION_IDLE_TTL_MS
+        ? parseInt(process.env.SESSION_IDLE_TTL_MS, 10)
+        : DEFAULT_SESSION_IDLE_TTL_MS;
+    const workers = process.env.WORKERS ? parseInt(process.env.WORKERS, 10) : 1;
+    const outputFormat: OutputFormat = process.env.OUTPUT_FORMAT === 'pretty' ? 'pretty' : 'compact';
+    const compression = process.env.COMPRESSION !== 'off';
+    const compressionThreshold = process.env.COMPRESSION_THRESHOLD
+        ? parseInt(process.env.COMPRESSION_THRESHOLD, 10)
+        : DEFAULT_COMPRESSION_THRESHOLD;
+    const mirrorSyncIntervalMs = process.env.MIRROR_SYNC_INTERVAL_MS
+        ? parseInt(process.env.MIRROR_SYNC_INTERVAL_MS, 10)
+        : DEFAULT_MIRROR_OPTIONS.syncIntervalMs;
+    const mirrorMaxLagMs = process.env.MIRROR_MAX_LAG_MS
+        ? parseInt(process.env.MIRROR_MAX_LAG_MS, 10)
+        : DEFAULT_MIRROR_OPTIONS.maxLagMs;
+    const mirrorFullReloadIntervalMs = process.env.MIRROR_FULL_RELOAD_INTERVAL_MS
+        ? parseInt(process.env.MIRROR_FULL_RELOAD_INTERVAL_MS, 10)
+        : DEFAULT_MIRROR_OPTIONS.fullReloadIntervalMs;
+    const mirrorSnapshotPath = process.env.MIRROR_SNAPSHOT_PATH || undefined;
+    const mirrorSnapshotIntervalMs = process.env.MIRROR_SNAPSHOT_INTERVAL_MS
+        ? parseInt(process.env.MIRROR_SNAPSHOT_INTERVAL_MS, 10)
+        : DEFAULT_MIRROR_OPTIONS.snapshotIntervalMs;
+    const weatherFile = process.env.WEATHER_FILE || undefined;
+    const weatherCellPrecision = process.env.WEATHER_CELL_PRECISION
+        ? parseInt(process.env.WEATHER_CELL_PRECISION, 10)
+        : DEFAULT_WEATHER_OPTIONS.cellPrecision;
+    const weatherCacheTtlMs = process.env.WEATHER_CACHE_TTL_MS
+        ? parseInt(process.env.WEATHER_CACHE_TTL_MS, 10)
+        : DEFAULT_WEATHER_OPTIONS.cacheTtlMs;
+    const weatherCacheMaxEntries = process.env.WEATHER_CACHE_MAX_ENTRIES
+        ? parseInt(process.env.WEATHER_CACHE_MAX_ENTRIES, 10)
+        : DEFAULT_WEATHER_OPTIONS.cacheMaxEntries;
+    const computeThreads = process.env.COMPUTE_THREADS
+        ? parseInt(process.env.COMPUTE_THREADS, 10)
+        : DEFAULT_COMPUTE_POOL_OPTIONS.threads;
+    const computeQueueLimit = process.env.COMPUTE_QUEUE_LIMIT
+        ? parseInt(process.env.COMPUTE_QUEUE_LIMIT, 10)
+        : DEFAULT_COMPUTE_POOL_OPTIONS.maxQueue;
+    const recordPath = process.env.RECORD_PATH || undefined;
+    const toolDeadlineMs = process.env.TOOL_DEADLINE_MS
+        ? parseInt(process.env.TOOL_DEADLINE_MS, 10)
+        : DEFAULT_DEADLINE_OPTIONS.defaultMs;
+    // Written as tool=ms pairs, e.g. query_hazards=5000,project_worsening=60000
+    const toolDeadlines = process.env.TOOL_DEADLINES
+        ? parseToolDeadlines(process.env.TOOL_DEADLINES)
+        : DEFAULT_DEADLINE_OPTIONS.tools;
     const isProduction = process.env.NODE_ENV === 'production';
 
-    if (!supabaseUrl) {
-        throw new Error('SUPABASE_URL is not defined in environment variables');
-    }
+    if (dataBackend === 'memory') {
+        if (!dataFile) {
+            throw new Error('DATA_FILE is not defined in environment variables');
+        }
+    } else {
+        if (!supabaseUrl) {
+            throw new Error('SUPABASE_URL is not defined in environment variables');
+        }
 
-    if (!supabaseKey) {
-        throw new Error('SUPABASE_KEY is not defined in environment variables');
+        if (!supabaseKey) {
+            throw new Error('SUPABASE_KEY is not defined in environment variables');
+        }
     }
 
-    return { supabaseUrl, supabaseKey, port, isProduction };
+    return {
+        dataBackend,
+        dataFile,
+        supabaseUrl,
+        supabaseKey,
+        supabasePoolSize,
+        port,
+        stateless,
+        maxSessions,
+        sessionIdleTtlMs,
+        workers,
+        outputFormat,
+        compression,
+        compressionThreshold,
+        mirrorSyncIntervalMs,
+        mirrorMaxLagMs,
+        mirrorFullReloadIntervalMs,
+        mirrorSnapshotPath,
+        mirrorSnapshotIntervalMs,
+        weatherFile,
+        weatherCellPrecision,
+        weatherCacheTtlMs,
+        weatherCacheMaxEntries,
+        computeThreads,
+        computeQueueLimit,
+        recordPath,
+        toolDeadlineMs,
+        toolDeadlines,
+        isProduction
+    };
 }
@@ -0,0 +1,257 @@
+import { SupabaseClient } from '@supabase/supabase-js';
+import { getSupabaseClient } from '../client.js';
+import { HazardRecord, HazardStore } from './store.js';
+import { MemoryBackend } from './memory.js';
+
+/** Analytics RPCs every backend answers */
+export type AnalyticsRpc = 'area_with_most_hazards' | 'top_severe_in_area' | 'counts_by_type' | 'open_vs_resolved';
+
+/**
+ * Results of the analytics RPCs, the contract every backend meets. Group
+ * keys are null for hazards without a value, and groups are ordered by
+ * count, largest first.
+ * @interface AnalyticsRpcResults
+ */
+export interface AnalyticsRpcResults {
+    /** The area with the most hazards, as a list of one group; empty without hazards */
+    area_with_most_hazards: Array<{ area: string | null, count: number }>;
+    /** Hazards by type */
+    counts_by_type: Array<{ type: string | null, count: number }>;
+    /** Hazards resolved and not, where open counts every status but resolved */
+    open_vs_resolved: { open: number, resolved: number, by_status: Array<{ status: string | null, count: number }> };
+    /** Up to 10 hazards of the area that are not resolved, most severe first, then highest id first */
+    top_severe_in_area: HazardRecord[];
+}
+
+/** Where hazards are read from */
+export type DataBackend = 'supabase' | 'memory';
+
+/**
+ * Outcome of a backend read, shaped like a PostgREST response so callers
+ * handle every backend the same way
+ * @interface BackendResult
+ */
+export interface BackendResult<T> {
+    data: T | null;
+    error: { message: string } | null;
+}
+
+/**
+ * Position of a delta sync within rows ordered by (updated_at, id)
+ * @interface UpdateCursor
+ */
+export interface UpdateCursor {
+    updatedAt: string;
+    id: any;
+}
+
+/**
+ * Data access beneath the tool handlers. Hazard rows come back as plain
+ * objects with the columns of the hazards table.
+ * @interface HazardBackend
+ */
+export interface HazardBackend {
+    /** Backend kind, for logs and health output */
+    readonly kind: DataBackend;
+
+    /**
+     * Runs an analytics RPC; data takes the shape AnalyticsRpcResults gives for kind
+     * @param {AnalyticsRpc} kind - RPC name
+     * @param {string} [area] - Area for top_severe_in_area
+     * @param {AbortSignal} [signal] - Abandons the read when aborted
+     */
+    rpc(kind: AnalyticsRpc, area?: string, signal?: AbortSignal): Promise<BackendResult<any>>;
+
+    /**
+     * Looks up one hazard; data is null when it does not exist
+     * @param {any} id - Hazard id
+     * @param {AbortSignal} [signal] - Abandons the read when aborted
+     */
+    hazard(id: any, signal?: AbortSignal): Promise<BackendResult<any>>;
+
+    /**
+     * Looks up several hazards; ids that do not exist are left out
+     * @param {any[]} ids - Hazard ids
+     * @param {AbortSignal} [signal] - Abandons the read when aborted
+     */
+    hazards(ids: any[], signal?: AbortSignal): Promise<BackendResult<any[]>>;
+
+    /**
+     * Reads a page of the hazards inside a latitude/longitude box, ordered
+     * by id, for location lookups while the mirror is too stale to serve them
+     * @param {number} minLat - Southern edge in degrees
+     * @param {number} minLng - Western edge in degrees
+     * @param {number} maxLat - Northern edge in degrees
+     * @param {number} maxLng - Eastern edge in degrees
+     * @param {any} afterId - Last id of the previous page; undefined for the first page
+     * @param {number} limit - Page size
+     * @param {AbortSignal} [signal] - Abandons the read when aborted
+     */
+    hazardsInBox(
+        minLat: number,
+        minLng: number,
+        maxLat: number,
+        maxLng: number,
+        afterId: any,
+        limit: number,
+        signal?: AbortSignal
+    ): Promise<BackendResult<any[]>>;
+
+    /**
+     * Reads a page of hazards ordered by id, for mirror bulk loads
+     * @param {any} afterId - Last id of the previous page; undefined for the first page
+     * @param {number} limit - Page size
+     */
+    pageById(afterId: any, limit: number): Promise<BackendResult<any[]>>;
+
+    /**
+     * Reads a page of hazards ordered by (updated_at, id), for mirror delta syncs
+     * @param {string} since - Earliest updated_at of the first page
+     * @param {UpdateCursor | undefined} after - Last row of the previous page; undefined for the first page
+     * @param {number} limit - Page size
+     */
+    pageByUpdate(since: string, after: UpdateCursor | undefined, limit: number): Promise<BackendResult<any[]>>;
+
+    /**
+     * Returns the store holding the hazards, for backends that keep them in
+     * process. Mirrors adopt it rather than paging through a copy.
+     */
+    localStore?(): Promise<HazardStore>;
+}
+
+/**
+ * Attaches a signal to a PostgREST query, which hands it to fetch so an
+ * abort cancels the HTTP request
+ * @private
+ */
+function withSignal<Q extends { abortSignal(signal: AbortSignal): Q }>(query: Q, signal?: AbortSignal): Q {
+    return signal ? query.abortSignal(signal) : query;
+}
+
+/**
+ * Reads hazards from Supabase through PostgREST
+ * @class SupabaseBackend
+ */
+export class SupabaseBackend implements HazardBackend {
+    readonly kind = 'supabase';
+
+    /**
+     * Creates a new SupabaseBackend
+     * @param {SupabaseClient} supabase - Client to read through
+     */
+    constructor(private readonly supabase: SupabaseClient) {}
+
+    async rpc(kind: AnalyticsRpc, area?: string, signal?: AbortSignal): Promise<BackendResult<any>> {
+        return await withSignal(kind === 'top_severe_in_area'
+            ? this.supabase.rpc(kind, { area_name: area })
+            : this.supabase.rpc(kind), signal);
+    }
+
+    async hazard(id: any, signal?: AbortSignal): Promise<BackendResult<any>> {
+        return await withSignal(this.supabase.from('hazards').select('*').eq('id', id), signal).single();
+    }
+
+    async hazards(ids: any[], signal?: AbortSignal): Promise<BackendResult<any[]>> {
+        return await withSignal(this.supabase.from('hazards').select('*').in('id', ids), signal);
+    }
+
+    async hazardsInBox(
+        minLat: number,
+        minLng: number,
+        maxLat: number,
+        maxLng: number,
+        afterId: any,
+        limit: number,
+        signal?: AbortSignal
+    ): Promise<BackendResult<any[]>> {
+        let query = this.supabase
+            .from('hazards')
+            .select('*')
+            .gte('lat', minLat)
+            .lte('lat', maxLat)
+            .gte('lng', minLng)
+            .lte('lng', maxLng)
+            .order('id', { ascending: true })
+            .limit(limit);
+        if (afterId !== undefined) {
+            query = query.gt('id', afterId);
+        }
+        return await withSignal(query, signal);
+    }
+
+    async pageById(afterId: any, limit: number): Promise<BackendResult<any[]>> {
+        let query = this.supabase
+            .from('hazards')
+            .select('*')
+            .order('id', { ascending: true })
+            .limit(limit);
+        if (afterId !== undefined) {
+            query = query.gt('id', afterId);
+        }
+        return await query;
+    }
+
+    async pageByUpdate(since: string, after: UpdateCursor | undefined, limit: number): Promise<BackendResult<any[]>> {
+        const query = this.supabase
+            .from('hazards')
+            .select('*')
+            .order('updated_at', { ascending: true })
+            .order('id', { ascending: true })
+            .limit(limit);
+        return await (after
+            ? query.or(`updated_at.gt."${after.updatedAt}",and(updated_at.eq."${after.updatedAt}",id.gt.${after.id})`)
+            : query.gte('updated_at', since));
+    }
+}
+
+/**
+ * Settings that pick and reach a backend
+ * @interface BackendOptions
+ */
+export interface BackendOptions {
+    dataBackend: DataBackend;
+    supabaseUrl?: string;
+    supabaseKey?: string;
+    supabasePoolSize?: number;
+    /** Hazards file for the memory backend */
+    dataFile?: string;
+}
+
+/** One backend per pooled Supabase client */
+const supabaseBackends = new WeakMap<SupabaseClient, SupabaseBackend>();
+
+/** One memory backend per hazards file */
+const memoryBackends = new Map<string, MemoryBackend>();
+
+/**
+ * Returns the shared backend for a configuration, creating it on first use.
+ * Every caller with the same settings gets the same backend, and with it
+ * the same mirror, caches and indexes.
+ * @param {BackendOptions} options - Backend settings
+ * @returns {HazardBackend} The shared backend
+ * @throws {Error} If the settings the backend needs are missing
+ */
+export function getHazardBackend(options: BackendOptions): HazardBackend {
+    if (options.dataBackend === 'memory') {
+        if (!options.dataFile) {
+            throw new Error('The memory backend needs a hazards file');
+        }
+        let backend = memoryBackends.get(options.dataFile);
+        if (!backend) {
+            backend = new MemoryBackend(options.dataFile);
+            memoryBackends.set(options.dataFile, backend);
+        }
+        return backend;
+    }
+
+    if (!options.supabaseUrl || !options.supabaseKey) {
+        throw new Error('The Supabase backend needs a project URL and key');
+    }
+    const client = getSupabaseClient(options.supabaseUrl, options.supabaseKey, options.supabasePoolSize);
+    let backend = supabaseBackends.get(client);
+    if (!backend) {
+        backend = new SupabaseBackend(client);
+        supabaseBackends.set(client, backend);
+    }
+    return backend;
+}
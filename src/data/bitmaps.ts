@@ -0,0 +1,185 @@
+import { compareIds, HazardStore, StoreObserver } from './store.js';
+import { getHazardMirror } from './mirror.js';
+import type { HazardBackend } from './backend.js';
+import { RoaringBitmap } from './roaring.js';
+import { selectTop } from '../topk.js';
+
+/**
+ * Conditions a hazard must meet. Within a dimension any listed value
+ * matches; across dimensions every condition must hold.
+ * @interface HazardFilter
+ */
+export interface HazardFilter {
+    type?: string[];
+    status?: string[];
+    severity?: number[];
+    min_severity?: number;
+    area?: string[];
+    /** Earliest creation time, as an ISO date or timestamp */
+    created_from?: string;
+    /** Latest creation time, as an ISO date or timestamp */
+    created_to?: string;
+}
+
+/** Ordering of filtered hazards: by id, most severe first, or newest first */
+export type FilterOrder = 'id' | 'severity' | 'newest';
+
+/** Highest severity a bitmap is kept for */
+const MAX_SEVERITY = 255;
+
+/**
+ * Bitmap indexes over the rows of a hazard store: one RoaringBitmap of
+ * row numbers per type, status, severity and area value. A filter is
+ * answered by uniting the bitmaps of the accepted values in each
+ * dimension and intersecting the dimensions; creation-time bounds, which
+ * have too many distinct values to index this way, are checked on the
+ * surviving rows only.
+ * @class HazardBitmaps
+ */
+export class HazardBitmaps implements StoreObserver {
+    private store?: HazardStore;
+    private types: RoaringBitmap[] = [];
+    private statuses: RoaringBitmap[] = [];
+    private severities: RoaringBitmap[] = [];
+    private areas: RoaringBitmap[] = [];
+
+    /**
+     * Indexes every row of a store and follows its changes from then on
+     * @param {HazardStore} store - Store to index
+     */
+    attach(store: HazardStore): void {
+        this.store = store;
+        this.types = [];
+        this.statuses = [];
+        this.severities = [];
+        this.areas = [];
+        for (let row = 0; row < store.count; row++) {
+            this.add(store, row);
+        }
+        store.observe(this);
+    }
+
+    add(store: HazardStore, row: number): void {
+        if (store === this.store) {
+            bitmapFor(this.types, store.type[row]).add(row);
+            bitmapFor(this.statuses, store.status[row]).add(row);
+            bitmapFor(this.severities, store.severity[row]).add(row);
+            bitmapFor(this.areas, store.area[row]).add(row);
+        }
+    }
+
+    remove(store: HazardStore, row: number): void {
+        if (store === this.store) {
+            this.types[store.type[row]]?.remove(row);
+            this.statuses[store.status[row]]?.remove(row);
+            this.severities[store.severity[row]]?.remove(row);
+            this.areas[store.area[row]]?.remove(row);
+        }
+    }
+
+    /**
+     * Finds the hazards matching a filter
+     * @param {HazardFilter} filter - Conditions to meet
+     * @param {FilterOrder} orderBy - Ordering of the returned page
+     * @param {number} offset - Matches to skip
+     * @param {number} limit - Maximum number of rows to return; 0 only counts
+     * @returns {{ total: number, rows: number[] }} Number of matches and the requested page of rows
+     */
+    query(filter: HazardFilter, orderBy: FilterOrder, offset: number, limit: number): { total: number, rows: number[] } {
+        const store = this.store;
+        if (!store) {
+            return { total: 0, rows: [] };
+        }
+
+        const dimensions: RoaringBitmap[] = [];
+        const unite = (bitmaps: RoaringBitmap[], codes: Array<number | undefined>) => {
+            const present = codes.filter((code): code is number => code !== undefined && bitmaps[code] !== undefined);
+            // Queries only read the bitmaps, so a single one is used as is
+            dimensions.push(present.length === 1
+                ? bitmaps[present[0]]
+                : present.reduce((union, code) => union.or(bitmaps[code]), new RoaringBitmap()));
+        };
+
+        if (filter.type) {
+            unite(this.types, filter.type.map((value) => store.types.lookup(value)));
+        }
+        if (filter.status) {
+            unite(this.statuses, filter.status.map((value) => store.statuses.lookup(value)));
+        }
+        if (filter.area) {
+            unite(this.areas, filter.area.map((value) => store.areas.lookup(value)));
+        }
+        if (filter.severity || filter.min_severity !== undefined) {
+            const min = filter.min_severity ?? 0;
+            const accepted = filter.severity ?? Array.from({ length: MAX_SEVERITY + 1 }, (_, severity) => severity);
+            unite(this.severities, accepted.filter((severity) => severity >= min));
+        }
+
+        // Intersect the most selective dimensions first to keep intermediates small
+        dimensions.sort((a, b) => a.size - b.size);
+        const matches = dimensions.reduce<RoaringBitmap | undefined>((result, bitmap) => (result ? result.and(bitmap) : bitmap), undefined);
+
+        const from = filter.created_from ? Date.parse(filter.created_from) : -Infinity;
+        const to = filter.created_to ? Date.parse(filter.created_to) : Infinity;
+        const timeBounded = filter.created_from !== undefined || filter.created_to !== undefined;
+        if (!timeBounded && limit === 0) {
+            return { total: matches ? matches.size : store.count, rows: [] };
+        }
+
+        const rows: number[] = [];
+        const collect = (row: number) => {
+            const createdAt = store.createdAt[row];
+            if (!timeBounded || (createdAt >= from && createdAt <= to)) {
+                rows.push(row);
+            }
+        };
+        if (matches) {
+            matches.forEach(collect);
+        } else {
+            for (let row = 0; row < store.count; row++) {
+                collect(row);
+            }
+        }
+
+        const total = rows.length;
+        if (limit === 0) {
+            return { total, rows: [] };
+        }
+
+        const ids = store.ids;
+        const severity = store.severity;
+        const createdAt = store.createdAt;
+        const newer = (a: number, b: number) => (createdAt[rows[b]] || 0) - (createdAt[rows[a]] || 0);
+        const compare = orderBy === 'id'
+            ? (a: number, b: number) => compareIds(ids[rows[a]], ids[rows[b]])
+            : orderBy === 'severity'
+                ? (a: number, b: number) => (severity[rows[b]] - severity[rows[a]]) || newer(a, b)
+                : newer;
+        const page = selectTop(total, offset + limit, compare).slice(offset).map((i) => rows[i]);
+        return { total, rows: page };
+    }
+}
+
+function bitmapFor(bitmaps: RoaringBitmap[], code: number): RoaringBitmap {
+    return bitmaps[code] ?? (bitmaps[code] = new RoaringBitmap());
+}
+
+/** One set of bitmap indexes per backend */
+const registry = new WeakMap<HazardBackend, HazardBitmaps>();
+
+/**
+ * Returns the shared bitmap indexes for a backend, kept in step with its
+ * hazard mirror
+ * @param {HazardBackend} backend - Hazard backend
+ * @returns {HazardBitmaps} Bitmap indexes over the backend's mirrored hazards
+ */
+export function getHazardBitmaps(backend: HazardBackend): HazardBitmaps {
+    let bitmaps = registry.get(backend);
+    if (!bitmaps) {
+        const created = new HazardBitmaps();
+        getHazardMirror(backend).watchStore((store) => created.attach(store));
+        registry.set(backend, created);
+        bitmaps = created;
+    }
+    return bitmaps;
+}
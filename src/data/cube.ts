@@ -0,0 +1,257 @@
+import { HazardStore, StoreObserver } from './store.js';
+import { getHazardMirror } from './mirror.js';
+import type { AnalyticsRpcResults, HazardBackend } from './backend.js';
+
+/** Dimensions hazards are counted along */
+export type CubeDimension = 'type' | 'status' | 'severity' | 'area' | 'week';
+
+export const CUBE_DIMENSIONS: CubeDimension[] = ['type', 'status', 'severity', 'area', 'week'];
+
+/**
+ * Restricts which cells a roll-up counts. Every listed dimension must
+ * match one of its values; weeks are compared by their Monday as YYYY-MM-DD.
+ * @interface CubeFilter
+ */
+export interface CubeFilter {
+    type?: string[];
+    status?: string[];
+    severity?: number[];
+    area?: string[];
+    /** First week to include, as any date within it */
+    week_from?: string;
+    /** Last week to include, as any date within it */
+    week_to?: string;
+}
+
+/**
+ * One group of a roll-up: the grouped dimension values and their count
+ * @interface CubeGroup
+ */
+export interface CubeGroup {
+    [dimension: string]: string | number | null;
+    count: number;
+}
+
+/*
+ * Cells are keyed by one number packing every dimension's code, lowest bits
+ * first: type (10 bits), status (6), severity (4), area (16), week (16).
+ * That is 52 bits, within the 53 a double holds exactly.
+ */
+const TYPE_RADIX = 2 ** 10;
+const STATUS_RADIX = 2 ** 6;
+const SEVERITY_RADIX = 2 ** 4;
+const AREA_RADIX = 2 ** 16;
+const WEEK_RADIX = 2 ** 16;
+
+const WEEK_MS = 7 * 86_400_000;
+/** 1970-01-05 was the first Monday of the Unix epoch */
+const FIRST_MONDAY = Date.UTC(1970, 0, 5);
+
+/** Week number of a timestamp; 0 stands for an unknown date */
+function weekOf(ms: number): number {
+    if (isNaN(ms)) {
+        return 0;
+    }
+    return Math.min(WEEK_RADIX - 1, Math.max(1, Math.floor((ms - FIRST_MONDAY) / WEEK_MS) + 1));
+}
+
+function weekStart(week: number): string | null {
+    return week === 0 ? null : new Date(FIRST_MONDAY + (week - 1) * WEEK_MS).toISOString().slice(0, 10);
+}
+
+/**
+ * Hazard counts by type × status × severity × area × week of creation.
+ * Only combinations that occur get a cell, so the cube stays small (tens
+ * of thousands of cells for millions of hazards) and any roll-up or
+ * filter across the dimensions is a single pass over the cells. Counts are
+ * rebuilt from the store when it is replaced and adjusted as rows change.
+ * @class HazardCube
+ */
+export class HazardCube implements StoreObserver {
+    private readonly cells = new Map<number, number>();
+    private store?: HazardStore;
+    private overflow = 0;
+
+    /**
+     * Recounts every row of a store and follows its changes from then on
+     * @param {HazardStore} store - Store to count
+     */
+    attach(store: HazardStore): void {
+        this.cells.clear();
+        this.overflow = 0;
+        this.store = store;
+        for (let row = 0; row < store.count; row++) {
+            this.adjust(store, row, 1);
+        }
+        store.observe(this);
+    }
+
+    add(store: HazardStore, row: number): void {
+        if (store === this.store) {
+            this.adjust(store, row, 1);
+        }
+    }
+
+    remove(store: HazardStore, row: number): void {
+        if (store === this.store) {
+            this.adjust(store, row, -1);
+        }
+    }
+
+    /**
+     * Whether every hazard fits the cube's key layout. Dictionary codes past
+     * a dimension's range cannot be counted, so roll-ups would be incomplete.
+     * @returns {boolean} True if roll-ups are exact
+     */
+    isComplete(): boolean {
+        return this.overflow === 0;
+    }
+
+    /** Number of cells in use */
+    get size(): number {
+        return this.cells.size;
+    }
+
+    /**
+     * Counts hazards grouped by some dimensions, optionally filtered
+     * @param {CubeDimension[]} groupBy - Dimensions to group by; none gives a single total
+     * @param {CubeFilter} [filter] - Restrictions on any dimension
+     * @returns {{ total: number, groups: CubeGroup[] }} Matching hazards and their groups, largest first
+     */
+    rollup(groupBy: CubeDimension[], filter: CubeFilter = {}): { total: number, groups: CubeGroup[] } {
+        const store = this.store;
+        if (!store) {
+            return { total: 0, groups: [] };
+        }
+
+        const codes = (values: string[] | undefined, lookup: (value: string) => number | undefined) =>
+            values && new Set(values.map(lookup).filter((code): code is number => code !== undefined));
+        const types = codes(filter.type, (value) => store.types.lookup(value));
+        const statuses = codes(filter.status, (value) => store.statuses.lookup(value));
+        const areas = codes(filter.area, (value) => store.areas.lookup(value));
+        const severities = filter.severity && new Set(filter.severity);
+        const weekFrom = filter.week_from ? weekOf(Date.parse(filter.week_from)) : 0;
+        const weekTo = filter.week_to ? weekOf(Date.parse(filter.week_to)) : WEEK_RADIX;
+
+        const byType = groupBy.includes('type');
+        const byStatus = groupBy.includes('status');
+        const bySeverity = groupBy.includes('severity');
+        const byArea = groupBy.includes('area');
+        const byWeek = groupBy.includes('week');
+
+        const groups = new Map<number, number>();
+        let total = 0;
+        for (const [key, count] of this.cells) {
+            let rest = key;
+            const type = rest % TYPE_RADIX;
+            rest = Math.floor(rest / TYPE_RADIX);
+            const status = rest % STATUS_RADIX;
+            rest = Math.floor(rest / STATUS_RADIX);
+            const severity = rest % SEVERITY_RADIX;
+            rest = Math.floor(rest / SEVERITY_RADIX);
+            const area = rest % AREA_RADIX;
+            const week = Math.floor(rest / AREA_RADIX);
+
+            if ((types && !types.has(type))
+                || (statuses && !statuses.has(status))
+                || (severities && !severities.has(severity))
+                || (areas && !areas.has(area))
+                || ((filter.week_from || filter.week_to) && (week === 0 || week < weekFrom || week > weekTo))) {
+                continue;
+            }
+
+            // Zero the dimensions not grouped by, so their cells merge
+            const group = pack(
+                byType ? type : 0,
+                byStatus ? status : 0,
+                bySeverity ? severity : 0,
+                byArea ? area : 0,
+                byWeek ? week : 0
+            );
+            groups.set(group, (groups.get(group) || 0) + count);
+            total += count;
+        }
+
+        const result: CubeGroup[] = [];
+        for (const [key, count] of groups) {
+            let rest = key;
+            const values: { [dimension in CubeDimension]: string | number | null } = {
+                type: store.types.decode(rest % TYPE_RADIX),
+                status: store.statuses.decode((rest = Math.floor(rest / TYPE_RADIX)) % STATUS_RADIX),
+                severity: (rest = Math.floor(rest / STATUS_RADIX)) % SEVERITY_RADIX,
+                area: store.areas.decode((rest = Math.floor(rest / SEVERITY_RADIX)) % AREA_RADIX),
+                week: weekStart(Math.floor(rest / AREA_RADIX)),
+            };
+            const group = {} as CubeGroup;
+            for (const dimension of groupBy) {
+                group[dimension] = values[dimension];
+            }
+            group.count = count;
+            result.push(group);
+        }
+        result.sort((a, b) => b.count - a.count);
+        return { total, groups: result };
+    }
+
+    /**
+     * Hazards by type, as the counts_by_type RPC returns them
+     * @returns {AnalyticsRpcResults['counts_by_type']} Groups, largest first
+     */
+    countsByType(): AnalyticsRpcResults['counts_by_type'] {
+        return this.rollup(['type']).groups.map((group) => ({ type: group.type as string | null, count: group.count }));
+    }
+
+    /**
+     * Hazards resolved and not, as the open_vs_resolved RPC returns them
+     * @returns {AnalyticsRpcResults['open_vs_resolved']} Open and resolved totals with counts by status
+     */
+    openVsResolved(): AnalyticsRpcResults['open_vs_resolved'] {
+        const { total, groups } = this.rollup(['status']);
+        const byStatus = groups.map((group) => ({ status: group.status as string | null, count: group.count }));
+        const resolved = byStatus.find((group) => group.status === 'resolved')?.count ?? 0;
+        return { open: total - resolved, resolved, by_status: byStatus };
+    }
+
+    private adjust(store: HazardStore, row: number, delta: number): void {
+        const type = store.type[row];
+        const status = store.status[row];
+        const severity = store.severity[row];
+        const area = store.area[row];
+        if (type >= TYPE_RADIX || status >= STATUS_RADIX || severity >= SEVERITY_RADIX) {
+            this.overflow += delta;
+            return;
+        }
+
+        const key = pack(type, status, severity, area, weekOf(store.createdAt[row]));
+        const count = (this.cells.get(key) || 0) + delta;
+        if (count > 0) {
+            this.cells.set(key, count);
+        } else {
+            this.cells.delete(key);
+        }
+    }
+}
+
+function pack(type: number, status: number, severity: number, area: number, week: number): number {
+    return (((week * AREA_RADIX + area) * SEVERITY_RADIX + severity) * STATUS_RADIX + status) * TYPE_RADIX + type;
+}
+
+/** One cube per backend */
+const registry = new WeakMap<HazardBackend, HazardCube>();
+
+/**
+ * Returns the shared cube for a backend, kept in step with its hazard
+ * mirror. Callers decide whether the mirror is fresh enough to use it.
+ * @param {HazardBackend} backend - Hazard backend
+ * @returns {HazardCube} Cube counting the backend's mirrored hazards
+ */
+export function getHazardCube(backend: HazardBackend): HazardCube {
+    let cube = registry.get(backend);
+    if (!cube) {
+        const created = new HazardCube();
+        getHazardMirror(backend).watchStore((store) => created.attach(store));
+        registry.set(backend, created);
+        cube = created;
+    }
+    return cube;
+}
@@ -0,0 +1,14 @@
+export { HazardMirror, configureHazardMirror, getHazardMirror, getHazardMirrorStats, DEFAULT_MIRROR_OPTIONS } from './mirror.js';
+export type { MirrorOptions, MirrorStats } from './mirror.js';
+export { compareIds, Dictionary, HazardStore } from './store.js';
+export type { HazardRecord, StoreColumns, StoreObserver } from './store.js';
+export { readSnapshot, writeSnapshot, SNAPSHOT_FORMAT_VERSION } from './snapshot.js';
+export type { SnapshotMeta } from './snapshot.js';
+export { HazardCube, getHazardCube, CUBE_DIMENSIONS } from './cube.js';
+export type { CubeDimension, CubeFilter, CubeGroup } from './cube.js';
+export { RoaringBitmap } from './roaring.js';
+export { HazardBitmaps, getHazardBitmaps } from './bitmaps.js';
+export type { FilterOrder, HazardFilter } from './bitmaps.js';
+export { SupabaseBackend, getHazardBackend } from './backend.js';
+export type { AnalyticsRpc, AnalyticsRpcResults, BackendOptions, BackendResult, DataBackend, HazardBackend, UpdateCursor } from './backend.js';
+export { MemoryBackend } from './memory.js';
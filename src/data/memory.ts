@@ -0,0 +1,275 @@
+import { extname } from 'path';
+import { readFile } from 'fs/promises';
+import { compareIds, HazardRecord, HazardStore } from './store.js';
+import { readSnapshot } from './snapshot.js';
+import { selectTop } from '../topk.js';
+import type { AnalyticsRpc, AnalyticsRpcResults, BackendResult, HazardBackend, UpdateCursor } from './backend.js';
+
+/** Rows returned by top_severe_in_area */
+const TOP_SEVERE_LIMIT = 10;
+
+/**
+ * Result of a read abandoned before it started, shaped like the error
+ * PostgREST returns when its fetch is aborted
+ */
+function aborted(signal: AbortSignal): BackendResult<any> {
+    const reason = signal.reason;
+    return { data: null, error: { message: reason instanceof Error ? `${reason.name}: ${reason.message}` : String(reason) } };
+}
+
+/**
+ * Counts rows per dictionary code
+ * @param {Uint16Array} codes - Dictionary-encoded column
+ * @param {number} count - Number of rows
+ * @param {number} size - Number of codes
+ * @returns {Uint32Array} Rows by code
+ */
+function countCodes(codes: Uint16Array, count: number, size: number): Uint32Array {
+    const counts = new Uint32Array(size);
+    for (let row = 0; row < count; row++) {
+        counts[codes[row]]++;
+    }
+    return counts;
+}
+
+/**
+ * Hazards held in process, answering the analytics RPCs with scans over
+ * the store's columns instead of calls to Supabase, in the shapes
+ * AnalyticsRpcResults sets out. Loads a hazard mirror
+ * snapshot, such as one written by the mirror or by bench/generate.ts, or
+ * a JSON array of hazard rows when the file name ends in .json. The rows
+ * are read once and not reloaded, so this suits offline benchmarks and
+ * single-node deployments over a fixed dataset.
+ * @class MemoryBackend
+ */
+export class MemoryBackend implements HazardBackend {
+    readonly kind = 'memory';
+    private loaded?: Promise<HazardStore>;
+    /** Rows sorted by id, built on the first bulk load page or box read */
+    private byId?: Uint32Array;
+    /** Rows with an updated_at, sorted by (updated_at, id), built on the first delta sync page */
+    private byUpdate?: Uint32Array;
+
+    /**
+     * Creates a new MemoryBackend
+     * @param {string} path - Snapshot or JSON file holding the hazards
+     */
+    constructor(private readonly path: string) {}
+
+    /**
+     * Reads the hazards file the first time it is called
+     * @returns {Promise<HazardStore>} Store holding every hazard
+     */
+    localStore(): Promise<HazardStore> {
+        if (!this.loaded) {
+            this.loaded = this.load();
+            // A failed load is retried on the next call
+            this.loaded.catch(() => {
+                this.loaded = undefined;
+            });
+        }
+        return this.loaded;
+    }
+
+    async rpc(kind: AnalyticsRpc, area?: string, signal?: AbortSignal): Promise<BackendResult<any>> {
+        const store = await this.localStore();
+        if (signal?.aborted) {
+            return aborted(signal);
+        }
+        switch (kind) {
+            case 'area_with_most_hazards': {
+                const data: AnalyticsRpcResults['area_with_most_hazards'] = this.countBy(store, 'area').slice(0, 1);
+                return { data, error: null };
+            }
+            case 'counts_by_type': {
+                const data: AnalyticsRpcResults['counts_by_type'] = this.countBy(store, 'type');
+                return { data, error: null };
+            }
+            case 'open_vs_resolved': {
+                const byStatus = this.countBy(store, 'status');
+                const resolved = byStatus.find((group) => group.status === 'resolved')?.count ?? 0;
+                const data: AnalyticsRpcResults['open_vs_resolved'] = { open: store.count - resolved, resolved, by_status: byStatus };
+                return { data, error: null };
+            }
+            case 'top_severe_in_area': {
+                const data: AnalyticsRpcResults['top_severe_in_area'] = this.topSevere(store, area);
+                return { data, error: null };
+            }
+            default:
+                return { data: null, error: { message: `Unknown RPC: ${kind}` } };
+        }
+    }
+
+    async hazard(id: any, signal?: AbortSignal): Promise<BackendResult<any>> {
+        const store = await this.localStore();
+        if (signal?.aborted) {
+            return aborted(signal);
+        }
+        const row = store.rowOf(id);
+        return { data: row < 0 ? null : store.record(row), error: null };
+    }
+
+    async hazards(ids: any[], signal?: AbortSignal): Promise<BackendResult<any[]>> {
+        const store = await this.localStore();
+        if (signal?.aborted) {
+            return aborted(signal);
+        }
+        const data = [];
+        for (const id of ids) {
+            const row = store.rowOf(id);
+            if (row >= 0) {
+                data.push(store.record(row));
+            }
+        }
+        return { data, error: null };
+    }
+
+    async hazardsInBox(
+        minLat: number,
+        minLng: number,
+        maxLat: number,
+        maxLng: number,
+        afterId: any,
+        limit: number,
+        signal?: AbortSignal
+    ): Promise<BackendResult<any[]>> {
+        const store = await this.localStore();
+        if (signal?.aborted) {
+            return aborted(signal);
+        }
+        const order = this.idOrder(store);
+        const start = afterId === undefined ? 0 : this.search(order, (row) => compareIds(store.ids[row], afterId) <= 0);
+        const data = [];
+        for (let i = start; i < order.length && data.length < limit; i++) {
+            const row = order[i];
+            const lat = store.lat[row];
+            const lng = store.lng[row];
+            if (lat >= minLat && lat <= maxLat && lng >= minLng && lng <= maxLng) {
+                data.push(store.record(row));
+            }
+        }
+        return { data, error: null };
+    }
+
+    async pageById(afterId: any, limit: number): Promise<BackendResult<any[]>> {
+        const store = await this.localStore();
+        const order = this.idOrder(store);
+
+        let start = 0;
+        if (afterId !== undefined) {
+            start = this.search(order, (row) => compareIds(store.ids[row], afterId) <= 0);
+        }
+        return { data: Array.from(order.subarray(start, start + limit), (row) => store.record(row)), error: null };
+    }
+
+    async pageByUpdate(since: string, after: UpdateCursor | undefined, limit: number): Promise<BackendResult<any[]>> {
+        const store = await this.localStore();
+        const compare = (a: number, b: number) => store.updatedAt[a] - store.updatedAt[b] || compareIds(store.ids[a], store.ids[b]);
+        if (!this.byUpdate) {
+            const rows: number[] = [];
+            for (let row = 0; row < store.count; row++) {
+                if (!isNaN(store.updatedAt[row])) {
+                    rows.push(row);
+                }
+            }
+            this.byUpdate = Uint32Array.from(rows).sort(compare);
+        }
+
+        const order = this.byUpdate;
+        let start: number;
+        if (after) {
+            const updatedAt = Date.parse(after.updatedAt);
+            start = this.search(order, (row) => store.updatedAt[row] < updatedAt
+                || (store.updatedAt[row] === updatedAt && compareIds(store.ids[row], after.id) <= 0));
+        } else {
+            const from = Date.parse(since);
+            start = this.search(order, (row) => store.updatedAt[row] < from);
+        }
+        return { data: Array.from(order.subarray(start, start + limit), (row) => store.record(row)), error: null };
+    }
+
+    /**
+     * Rows sorted by id, built on first use
+     * @private
+     */
+    private idOrder(store: HazardStore): Uint32Array {
+        return this.byId ??= Uint32Array.from({ length: store.count }, (_, row) => row)
+            .sort((a, b) => compareIds(store.ids[a], store.ids[b]));
+    }
+
+    /**
+     * Counts hazards per value of a dictionary column, most common first
+     * @private
+     */
+    private countBy<C extends 'area' | 'type' | 'status'>(store: HazardStore, column: C): Array<{ [key in C]: string | null } & { count: number }> {
+        const dictionary = column === 'area' ? store.areas : column === 'type' ? store.types : store.statuses;
+        const counts = countCodes(store[column], store.count, dictionary.size);
+        const groups = [];
+        for (let code = 0; code < counts.length; code++) {
+            if (counts[code] > 0) {
+                groups.push({ [column]: dictionary.decode(code), count: counts[code] } as { [key in C]: string | null } & { count: number });
+            }
+        }
+        return groups.sort((a, b) => b.count - a.count);
+    }
+
+    /**
+     * Unresolved hazards of an area, most severe first, ties broken by newest id
+     * @private
+     */
+    private topSevere(store: HazardStore, area: string | undefined): HazardRecord[] {
+        const areaCode = area === undefined ? undefined : store.areas.lookup(area);
+        if (areaCode === undefined) {
+            return [];
+        }
+        const resolvedCode = store.statuses.lookup('resolved');
+
+        const candidates: number[] = [];
+        for (let row = 0; row < store.count; row++) {
+            if (store.area[row] === areaCode && store.status[row] !== resolvedCode) {
+                candidates.push(row);
+            }
+        }
+        const top = selectTop(candidates.length, TOP_SEVERE_LIMIT, (a, b) => {
+            const left = candidates[a];
+            const right = candidates[b];
+            return store.severity[right] - store.severity[left] || compareIds(store.ids[right], store.ids[left]);
+        });
+        return top.map((index) => store.record(candidates[index]));
+    }
+
+    /**
+     * Returns the number of leading rows of a sorted order that satisfy a
+     * predicate holding for a prefix of the order
+     * @private
+     */
+    private search(order: Uint32Array, before: (row: number) => boolean): number {
+        let low = 0;
+        let high = order.length;
+        while (low < high) {
+            const mid = (low + high) >>> 1;
+            if (before(order[mid])) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        return low;
+    }
+
+    private async load(): Promise<HazardStore> {
+        if (extname(this.path).toLowerCase() !== '.json') {
+            return (await readSnapshot(this.path)).store;
+        }
+
+        const rows = JSON.parse(await readFile(this.path, 'utf8'));
+        if (!Array.isArray(rows)) {
+            throw new Error(`${this.path} does not hold an array of hazards`);
+        }
+        const store = new HazardStore(rows.length || undefined);
+        for (const hazard of rows) {
+            store.upsert(hazard);
+        }
+        return store;
+    }
+}
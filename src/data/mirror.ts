@@ -0,0 +1,425 @@
+import { HazardRecord, HazardStore } from './store.js';
+import type { HazardBackend, UpdateCursor } from './backend.js';
+import { readSnapshot, writeSnapshot } from './snapshot.js';
+
+/** Rows fetched per page during bulk loads and delta syncs */
+const PAGE_SIZE = 1000;
+
+/**
+ * Delta syncs re-read this much history before the watermark, so rows
+ * whose transactions committed late with an older updated_at are not missed
+ */
+const SYNC_OVERLAP_MS = 5_000;
+
+/**
+ * Tuning for hazard mirrors
+ * @interface MirrorOptions
+ */
+export interface MirrorOptions {
+    /** Interval between delta syncs */
+    syncIntervalMs: number;
+    /** Age of the last successful sync beyond which reads fall back to the backend */
+    maxLagMs: number;
+    /**
+     * Interval between full reloads. Delta syncs cannot see hard deletes,
+     * so the mirror is rebuilt from scratch now and then.
+     */
+    fullReloadIntervalMs: number;
+    /**
+     * File the mirror is saved to and warm-started from. Unset disables
+     * snapshots.
+     */
+    snapshotPath?: string;
+    /** Minimum interval between snapshot writes while rows keep changing */
+    snapshotIntervalMs: number;
+}
+
+export const DEFAULT_MIRROR_OPTIONS: MirrorOptions = {
+    syncIntervalMs: 5_000,
+    maxLagMs: 60_000,
+    fullReloadIntervalMs: 30 * 60_000,
+    snapshotIntervalMs: 5 * 60_000,
+};
+
+/**
+ * Mirror state exposed for monitoring
+ * @interface MirrorStats
+ */
+export interface MirrorStats {
+    rows: number;
+    /** Approximate bytes held by the column arrays */
+    bytes: number;
+    ready: boolean;
+    fresh: boolean;
+    /** Time since the last successful sync, in milliseconds */
+    lagMs: number;
+    /** Highest updated_at seen */
+    watermark?: string;
+    syncs: number;
+    syncErrors: number;
+    fullLoads: number;
+    /** Whether the current rows started from a snapshot */
+    restored: boolean;
+    snapshotsWritten: number;
+}
+
+/**
+ * In-memory copy of the hazards table, held in a column-oriented HazardStore.
+ * Starts with a bulk load paged by id, then stays current with delta syncs
+ * that page through rows by (updated_at, id) from the last watermark. Reads
+ * are synchronous lookups; callers check isFresh() and go to the backend
+ * when the mirror has fallen too far behind. A backend that already holds
+ * the hazards in process hands over its store instead, which the mirror
+ * serves as is without syncing.
+ * @class HazardMirror
+ */
+export class HazardMirror {
+    private current = new HazardStore();
+    private watermark?: string;
+    private lastSyncAt = 0;
+    private lastFullLoadAt = 0;
+    private initial?: Promise<void>;
+    private syncing = false;
+    private timer?: NodeJS.Timeout;
+    private syncs = 0;
+    private syncErrors = 0;
+    private fullLoads = 0;
+    private restored = false;
+    private snapshotVersion = -1;
+    private lastSnapshotAt = 0;
+    private snapshotsWritten = 0;
+    private readonly storeListeners: Array<(store: HazardStore) => void> = [];
+
+    /** Incremented whenever rows change, so derived indexes know to rebuild */
+    version = 0;
+
+    /**
+     * Creates a new HazardMirror
+     * @param {HazardBackend} backend - Backend the hazards are loaded from
+     * @param {MirrorOptions} options - Sync tuning
+     */
+    constructor(private readonly backend: HazardBackend, private readonly options: MirrorOptions) {}
+
+    /**
+     * Starts the initial load if it has not started yet
+     * @returns {Promise<void>} Resolves once the initial load has finished
+     */
+    ready(): Promise<void> {
+        if (!this.initial) {
+            this.initial = this.warmStart().then(() => this.schedule());
+            // A failed first load is retried on the next call
+            this.initial.catch(() => {
+                this.initial = undefined;
+            });
+        }
+        return this.initial;
+    }
+
+    /**
+     * Whether the mirror is loaded and synced within the configured lag
+     * @returns {boolean} True if reads may be served locally
+     */
+    isFresh(): boolean {
+        if (this.backend.localStore) {
+            return this.lastSyncAt > 0;
+        }
+        return this.lastSyncAt > 0 && Date.now() - this.lastSyncAt <= this.options.maxLagMs;
+    }
+
+    /**
+     * Looks up a hazard by id
+     * @param {any} id - Hazard id
+     * @returns {HazardRecord | undefined} The hazard, or undefined if it is not mirrored
+     */
+    get(id: any): HazardRecord | undefined {
+        const row = this.current.rowOf(id);
+        return row < 0 ? undefined : this.current.record(row);
+    }
+
+    /** Number of mirrored hazards */
+    get size(): number {
+        return this.current.count;
+    }
+
+    /**
+     * The store holding the mirrored hazards. A full reload swaps in a new
+     * store, so callers that scan it should hold on to the instance they read.
+     */
+    get store(): HazardStore {
+        return this.current;
+    }
+
+    /**
+     * Calls a listener with the current store and again whenever a full
+     * reload or snapshot restore swaps in a new one. Listeners typically
+     * rebuild derived data from the store and observe it for changes.
+     * @param {(store: HazardStore) => void} listener - Called with each store
+     */
+    watchStore(listener: (store: HazardStore) => void): void {
+        this.storeListeners.push(listener);
+        listener(this.current);
+    }
+
+    /**
+     * Returns mirror state
+     * @returns {MirrorStats} Mirror state
+     */
+    stats(): MirrorStats {
+        return {
+            rows: this.current.count,
+            bytes: this.current.byteLength,
+            ready: this.lastSyncAt > 0,
+            fresh: this.isFresh(),
+            lagMs: this.lastSyncAt <= 0 ? -1 : this.backend.localStore ? 0 : Date.now() - this.lastSyncAt,
+            watermark: this.watermark,
+            syncs: this.syncs,
+            syncErrors: this.syncErrors,
+            fullLoads: this.fullLoads,
+            restored: this.restored,
+            snapshotsWritten: this.snapshotsWritten,
+        };
+    }
+
+    private schedule(): void {
+        if (this.timer || this.backend.localStore) {
+            return;
+        }
+        this.timer = setInterval(() => {
+            this.tick().catch((error) => {
+                this.syncErrors++;
+                console.error('Error syncing hazard mirror:', error);
+            });
+        }, this.options.syncIntervalMs);
+        this.timer.unref();
+    }
+
+    private async tick(): Promise<void> {
+        if (this.syncing) {
+            return;
+        }
+        this.syncing = true;
+        try {
+            if (Date.now() - this.lastFullLoadAt >= this.options.fullReloadIntervalMs) {
+                await this.fullLoad();
+                await this.persist();
+            } else {
+                await this.deltaSync();
+                if (Date.now() - this.lastSnapshotAt >= this.options.snapshotIntervalMs) {
+                    await this.persist();
+                }
+            }
+        } finally {
+            this.syncing = false;
+        }
+    }
+
+    /**
+     * Loads the rows for the first time: from the snapshot plus a delta
+     * sync when there is a usable one, otherwise with a full load
+     */
+    private async warmStart(): Promise<void> {
+        if (this.backend.localStore) {
+            await this.adopt();
+            return;
+        }
+        if (await this.restore()) {
+            await this.deltaSync();
+            return;
+        }
+        await this.fullLoad();
+        // Readiness does not wait for the write; syncs hold off until it is done
+        this.syncing = true;
+        this.persist().finally(() => {
+            this.syncing = false;
+        });
+    }
+
+    /**
+     * Serves the store of a backend that holds the hazards in process
+     */
+    private async adopt(): Promise<void> {
+        const startedAt = Date.now();
+        this.replaceStore(await this.backend.localStore!());
+        this.lastSyncAt = startedAt;
+        this.lastFullLoadAt = startedAt;
+        this.fullLoads++;
+        this.version++;
+    }
+
+    /**
+     * Replaces the rows with the snapshot, unless it is missing, unreadable,
+     * or older than a full reload interval (it may still hold hard-deleted rows)
+     * @returns {Promise<boolean>} True if the snapshot was loaded
+     */
+    private async restore(): Promise<boolean> {
+        const path = this.options.snapshotPath;
+        if (!path) {
+            return false;
+        }
+
+        let snapshot;
+        try {
+            snapshot = await readSnapshot(path);
+        } catch (error: any) {
+            if (error.code !== 'ENOENT') {
+                console.error('Ignoring hazard snapshot:', error.message);
+            }
+            return false;
+        }
+        if (Date.now() - snapshot.meta.fullLoadAt >= this.options.fullReloadIntervalMs) {
+            return false;
+        }
+
+        this.replaceStore(snapshot.store);
+        this.watermark = snapshot.meta.watermark;
+        this.lastFullLoadAt = snapshot.meta.fullLoadAt;
+        this.restored = true;
+        this.version++;
+        this.snapshotVersion = this.version;
+        this.lastSnapshotAt = snapshot.savedAt;
+        return true;
+    }
+
+    /**
+     * Saves the rows to the snapshot file if they changed since the last
+     * save. Failures are logged; the mirror keeps working without snapshots.
+     */
+    private async persist(): Promise<void> {
+        const path = this.options.snapshotPath;
+        if (!path || this.snapshotVersion === this.version) {
+            return;
+        }
+
+        const version = this.version;
+        try {
+            await writeSnapshot(path, this.current, { watermark: this.watermark, fullLoadAt: this.lastFullLoadAt });
+            this.snapshotVersion = version;
+            this.lastSnapshotAt = Date.now();
+            this.snapshotsWritten++;
+        } catch (error) {
+            console.error('Error writing hazard snapshot:', error);
+        }
+    }
+
+    private replaceStore(store: HazardStore): void {
+        this.current = store;
+        for (const listener of this.storeListeners) {
+            listener(store);
+        }
+    }
+
+    /**
+     * Pages through the whole table by id and swaps in the result
+     */
+    private async fullLoad(): Promise<void> {
+        const startedAt = Date.now();
+        // Size the new store from the old one to avoid regrowing on reloads
+        const store = new HazardStore(this.current.count || undefined);
+        let watermark: string | undefined;
+
+        let lastId: any = undefined;
+        for (;;) {
+            const { data, error } = await this.backend.pageById(lastId, PAGE_SIZE);
+            if (error) {
+                throw new Error(error.message);
+            }
+
+            for (const hazard of data ?? []) {
+                store.upsert(hazard);
+                if (hazard.updated_at && (!watermark || hazard.updated_at > watermark)) {
+                    watermark = hazard.updated_at;
+                }
+            }
+
+            if (!data || data.length < PAGE_SIZE) {
+                break;
+            }
+            lastId = data[data.length - 1].id;
+        }
+
+        this.replaceStore(store);
+        // Rows updated while the load was paging may have been read before
+        // their update; the first delta sync re-reads from the load's start
+        const loadStart = new Date(startedAt).toISOString();
+        this.watermark = watermark && watermark < loadStart ? watermark : loadStart;
+        this.lastSyncAt = startedAt;
+        this.lastFullLoadAt = startedAt;
+        this.fullLoads++;
+        this.restored = false;
+        this.version++;
+    }
+
+    /**
+     * Applies every row changed since the watermark
+     */
+    private async deltaSync(): Promise<void> {
+        const startedAt = Date.now();
+        const since = new Date(Date.parse(this.watermark ?? new Date(0).toISOString()) - SYNC_OVERLAP_MS).toISOString();
+
+        let cursor: UpdateCursor | undefined;
+        let changed = 0;
+        for (;;) {
+            const { data, error } = await this.backend.pageByUpdate(since, cursor, PAGE_SIZE);
+            if (error) {
+                throw new Error(error.message);
+            }
+
+            for (const hazard of data ?? []) {
+                if (this.current.upsert(hazard)) {
+                    changed++;
+                }
+                if (hazard.updated_at && (!this.watermark || hazard.updated_at > this.watermark)) {
+                    this.watermark = hazard.updated_at;
+                }
+            }
+
+            if (!data || data.length < PAGE_SIZE) {
+                break;
+            }
+            const last = data[data.length - 1];
+            cursor = { updatedAt: last.updated_at, id: last.id };
+        }
+
+        if (changed > 0) {
+            this.version++;
+        }
+        this.lastSyncAt = startedAt;
+        this.syncs++;
+    }
+}
+
+let mirrorOptions: MirrorOptions = DEFAULT_MIRROR_OPTIONS;
+
+/** One mirror per backend */
+const mirrors = new Map<HazardBackend, HazardMirror>();
+
+/**
+ * Sets the tuning used by mirrors created from now on
+ * @param {Partial<MirrorOptions>} options - Options to override
+ */
+export function configureHazardMirror(options: Partial<MirrorOptions>): void {
+    mirrorOptions = { ...mirrorOptions, ...options };
+}
+
+/**
+ * Returns the shared hazard mirror for a backend, creating it on first use.
+ * The mirror starts loading the first time ready() is called.
+ * @param {HazardBackend} backend - Backend to mirror
+ * @returns {HazardMirror} Mirror for the backend
+ */
+export function getHazardMirror(backend: HazardBackend): HazardMirror {
+    let mirror = mirrors.get(backend);
+    if (!mirror) {
+        mirror = new HazardMirror(backend, mirrorOptions);
+        mirrors.set(backend, mirror);
+    }
+    return mirror;
+}
+
+/**
+ * Returns the state of every mirror
+ * @returns {MirrorStats[]} One entry per mirror
+ */
+export function getHazardMirrorStats(): MirrorStats[] {
+    return Array.from(mirrors.values(), (mirror) => mirror.stats());
+}
@@ -0,0 +1,375 @@
+/** Array containers convert to bitmaps beyond this many values */
+const ARRAY_MAX = 4096;
+
+/** 65536 bits */
+const BITMAP_WORDS = 2048;
+
+/**
+ * The low 16 bits of the values sharing one high 16-bit key. Sparse chunks
+ * are sorted arrays; dense ones are plain bitmaps.
+ */
+type Container = ArrayContainer | BitmapContainer;
+
+class ArrayContainer {
+    values: Uint16Array;
+    size = 0;
+
+    constructor(capacity: number = 4) {
+        this.values = new Uint16Array(capacity);
+    }
+
+    private search(low: number): number {
+        // Values usually arrive in order, so check the end first
+        if (this.size === 0 || this.values[this.size - 1] < low) {
+            return -(this.size + 1);
+        }
+        let lo = 0;
+        let hi = this.size - 1;
+        while (lo <= hi) {
+            const mid = (lo + hi) >>> 1;
+            const value = this.values[mid];
+            if (value < low) {
+                lo = mid + 1;
+            } else if (value > low) {
+                hi = mid - 1;
+            } else {
+                return mid;
+            }
+        }
+        return -(lo + 1);
+    }
+
+    has(low: number): boolean {
+        return this.search(low) >= 0;
+    }
+
+    /** Adds a value; returns a bitmap container instead once it outgrows arrays */
+    add(low: number): Container {
+        const at = this.search(low);
+        if (at >= 0) {
+            return this;
+        }
+        if (this.size >= ARRAY_MAX) {
+            return this.toBitmap().add(low);
+        }
+        const index = -at - 1;
+        if (this.size === this.values.length) {
+            const grown = new Uint16Array(Math.min(ARRAY_MAX, this.values.length * 2));
+            grown.set(this.values);
+            this.values = grown;
+        }
+        this.values.copyWithin(index + 1, index, this.size);
+        this.values[index] = low;
+        this.size++;
+        return this;
+    }
+
+    remove(low: number): Container {
+        const at = this.search(low);
+        if (at >= 0) {
+            this.values.copyWithin(at, at + 1, this.size);
+            this.size--;
+        }
+        return this;
+    }
+
+    forEach(fn: (low: number) => void): void {
+        for (let i = 0; i < this.size; i++) {
+            fn(this.values[i]);
+        }
+    }
+
+    toBitmap(): BitmapContainer {
+        const bitmap = new BitmapContainer();
+        for (let i = 0; i < this.size; i++) {
+            const low = this.values[i];
+            bitmap.words[low >>> 5] |= 1 << (low & 31);
+        }
+        bitmap.size = this.size;
+        return bitmap;
+    }
+}
+
+class BitmapContainer {
+    readonly words = new Uint32Array(BITMAP_WORDS);
+    size = 0;
+
+    has(low: number): boolean {
+        return (this.words[low >>> 5] & (1 << (low & 31))) !== 0;
+    }
+
+    add(low: number): Container {
+        const mask = 1 << (low & 31);
+        if ((this.words[low >>> 5] & mask) === 0) {
+            this.words[low >>> 5] |= mask;
+            this.size++;
+        }
+        return this;
+    }
+
+    /** Removes a value; returns an array container once the bitmap is sparse */
+    remove(low: number): Container {
+        const mask = 1 << (low & 31);
+        if ((this.words[low >>> 5] & mask) !== 0) {
+            this.words[low >>> 5] &= ~mask;
+            this.size--;
+        }
+        // Convert with some slack so add/remove at the boundary does not thrash
+        return this.size < ARRAY_MAX / 2 ? this.toArray() : this;
+    }
+
+    forEach(fn: (low: number) => void): void {
+        for (let word = 0; word < BITMAP_WORDS; word++) {
+            let bits = this.words[word];
+            while (bits !== 0) {
+                const lowest = bits & -bits;
+                fn(word * 32 + 31 - Math.clz32(lowest));
+                bits ^= lowest;
+            }
+        }
+    }
+
+    toArray(): ArrayContainer {
+        const array = new ArrayContainer(Math.max(4, this.size));
+        this.forEach((low) => {
+            array.values[array.size++] = low;
+        });
+        return array;
+    }
+}
+
+function popcount(word: number): number {
+    word -= (word >>> 1) & 0x55555555;
+    word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+    return (((word + (word >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+}
+
+function andContainers(a: Container, b: Container): Container | undefined {
+    if (a instanceof BitmapContainer && b instanceof BitmapContainer) {
+        const result = new BitmapContainer();
+        let size = 0;
+        for (let word = 0; word < BITMAP_WORDS; word++) {
+            const bits = a.words[word] & b.words[word];
+            result.words[word] = bits;
+            size += popcount(bits);
+        }
+        result.size = size;
+        return size === 0 ? undefined : size <= ARRAY_MAX ? result.toArray() : result;
+    }
+
+    const [small, other] = a instanceof ArrayContainer ? [a, b] : [b as ArrayContainer, a];
+    const result = new ArrayContainer(Math.max(4, small.size));
+    if (other instanceof BitmapContainer) {
+        for (let i = 0; i < small.size; i++) {
+            if (other.has(small.values[i])) {
+                result.values[result.size++] = small.values[i];
+            }
+        }
+    } else {
+        let i = 0;
+        let j = 0;
+        while (i < small.size && j < other.size) {
+            const x = small.values[i];
+            const y = other.values[j];
+            if (x === y) {
+                result.values[result.size++] = x;
+                i++;
+                j++;
+            } else if (x < y) {
+                i++;
+            } else {
+                j++;
+            }
+        }
+    }
+    return result.size === 0 ? undefined : result;
+}
+
+function orContainers(a: Container, b: Container): Container {
+    if (a instanceof ArrayContainer && b instanceof ArrayContainer && a.size + b.size <= ARRAY_MAX) {
+        const result = new ArrayContainer(Math.max(4, a.size + b.size));
+        let i = 0;
+        let j = 0;
+        while (i < a.size || j < b.size) {
+            const x = i < a.size ? a.values[i] : Infinity;
+            const y = j < b.size ? b.values[j] : Infinity;
+            result.values[result.size++] = x <= y ? x : y;
+            if (x <= y) {
+                i++;
+            }
+            if (y <= x) {
+                j++;
+            }
+        }
+        return result;
+    }
+
+    const result = new BitmapContainer();
+    for (const container of [a, b]) {
+        if (container instanceof BitmapContainer) {
+            for (let word = 0; word < BITMAP_WORDS; word++) {
+                result.words[word] |= container.words[word];
+            }
+        } else {
+            container.forEach((low) => {
+                result.words[low >>> 5] |= 1 << (low & 31);
+            });
+        }
+    }
+    let size = 0;
+    for (let word = 0; word < BITMAP_WORDS; word++) {
+        size += popcount(result.words[word]);
+    }
+    result.size = size;
+    return result;
+}
+
+/**
+ * Compressed set of non-negative 32-bit integers in the style of Roaring
+ * bitmaps. Values are split by their high 16 bits into chunks; each chunk
+ * holds its low 16 bits in a sorted array while it has at most 4096
+ * values and in a 65536-bit bitmap beyond that. Sets of row numbers cost
+ * at most about two bytes per member, and intersections and unions work
+ * chunk by chunk, a machine word at a time for dense chunks.
+ * @class RoaringBitmap
+ */
+export class RoaringBitmap {
+    private keys: number[] = [];
+    private containers: Container[] = [];
+
+    /**
+     * Adds a value
+     * @param {number} value - Integer from 0 to 2^32 - 1
+     */
+    add(value: number): void {
+        const high = value >>> 16;
+        let at = this.find(high);
+        if (at < 0) {
+            at = -at - 1;
+            this.keys.splice(at, 0, high);
+            this.containers.splice(at, 0, new ArrayContainer());
+        }
+        this.containers[at] = this.containers[at].add(value & 0xffff);
+    }
+
+    /**
+     * Removes a value if present
+     * @param {number} value - Integer from 0 to 2^32 - 1
+     */
+    remove(value: number): void {
+        const at = this.find(value >>> 16);
+        if (at < 0) {
+            return;
+        }
+        const container = this.containers[at].remove(value & 0xffff);
+        if (container.size === 0) {
+            this.keys.splice(at, 1);
+            this.containers.splice(at, 1);
+        } else {
+            this.containers[at] = container;
+        }
+    }
+
+    /**
+     * Whether a value is present
+     * @param {number} value - Integer from 0 to 2^32 - 1
+     * @returns {boolean} True if present
+     */
+    has(value: number): boolean {
+        const at = this.find(value >>> 16);
+        return at >= 0 && this.containers[at].has(value & 0xffff);
+    }
+
+    /** Number of values */
+    get size(): number {
+        let size = 0;
+        for (const container of this.containers) {
+            size += container.size;
+        }
+        return size;
+    }
+
+    /**
+     * Returns the values present in both bitmaps
+     * @param {RoaringBitmap} other - Bitmap to intersect with
+     * @returns {RoaringBitmap} New bitmap
+     */
+    and(other: RoaringBitmap): RoaringBitmap {
+        const result = new RoaringBitmap();
+        let i = 0;
+        let j = 0;
+        while (i < this.keys.length && j < other.keys.length) {
+            if (this.keys[i] === other.keys[j]) {
+                const container = andContainers(this.containers[i], other.containers[j]);
+                if (container) {
+                    result.keys.push(this.keys[i]);
+                    result.containers.push(container);
+                }
+                i++;
+                j++;
+            } else if (this.keys[i] < other.keys[j]) {
+                i++;
+            } else {
+                j++;
+            }
+        }
+        return result;
+    }
+
+    /**
+     * Returns the values present in either bitmap
+     * @param {RoaringBitmap} other - Bitmap to unite with
+     * @returns {RoaringBitmap} New bitmap
+     */
+    or(other: RoaringBitmap): RoaringBitmap {
+        const result = new RoaringBitmap();
+        let i = 0;
+        let j = 0;
+        while (i < this.keys.length || j < other.keys.length) {
+            const x = i < this.keys.length ? this.keys[i] : Infinity;
+            const y = j < other.keys.length ? other.keys[j] : Infinity;
+            if (x === y) {
+                result.keys.push(x);
+                result.containers.push(orContainers(this.containers[i++], other.containers[j++]));
+            } else if (x < y) {
+                result.keys.push(x);
+                result.containers.push(orContainers(this.containers[i++], new ArrayContainer()));
+            } else {
+                result.keys.push(y);
+                result.containers.push(orContainers(other.containers[j++], new ArrayContainer()));
+            }
+        }
+        return result;
+    }
+
+    /**
+     * Calls a function with every value in ascending order
+     * @param {(value: number) => void} fn - Called with each value
+     */
+    forEach(fn: (value: number) => void): void {
+        for (let i = 0; i < this.keys.length; i++) {
+            const base = this.keys[i] * 65536;
+            this.containers[i].forEach((low) => fn(base + low));
+        }
+    }
+
+    private find(high: number): number {
+        let lo = 0;
+        let hi = this.keys.length - 1;
+        // Rows are appended in order, so the last chunk is the common case
+        if (hi >= 0 && this.keys[hi] === high) {
+            return hi;
+        }
+        while (lo <= hi) {
+            const mid = (lo + hi) >>> 1;
+            if (this.keys[mid] < high) {
+                lo = mid + 1;
+            } else if (this.keys[mid] > high) {
+                hi = mid - 1;
+            } else {
+                return mid;
+            }
+        }
+        return -(lo + 1);
+    }
+}
@@ -0,0 +1,202 @@
+import { open, readFile, rename, unlink } from 'fs/promises';
+import { HazardStore, StoreColumns } from './store.js';
+
+/** File signature, padded to eight bytes */
+const MAGIC = Buffer.from('PHZSNAP\0', 'latin1');
+
+/** Bumped whenever the layout changes; other versions are not loaded */
+export const SNAPSHOT_FORMAT_VERSION = 1;
+
+/** Magic, format version and header length */
+const PREAMBLE_BYTES = MAGIC.length + 8;
+
+/**
+ * Sync state saved alongside the rows
+ * @interface SnapshotMeta
+ */
+export interface SnapshotMeta {
+    /** Delta sync watermark at the time of the snapshot */
+    watermark?: string;
+    /** When the rows were last fully reloaded, in epoch milliseconds */
+    fullLoadAt: number;
+}
+
+/**
+ * Where one column lives in the data section
+ * @interface ColumnEntry
+ */
+interface ColumnEntry {
+    name: keyof StoreColumns;
+    kind: 'f64' | 'u16' | 'u8';
+    /** Byte offset from the start of the data section */
+    offset: number;
+}
+
+/**
+ * JSON header following the preamble
+ * @interface SnapshotHeader
+ */
+interface SnapshotHeader {
+    count: number;
+    savedAt: number;
+    meta: SnapshotMeta;
+    /** Numeric ids are stored as a column; other ids are listed here */
+    ids: 'column' | any[];
+    dictionaries: { types: Array<string | null>, statuses: Array<string | null>, areas: Array<string | null> };
+    columns: ColumnEntry[];
+}
+
+const ELEMENT_BYTES = { f64: 8, u16: 2, u8: 1 };
+
+const align8 = (offset: number) => (offset + 7) & ~7;
+
+/**
+ * Writes a store to disk.
+ * Layout: an 8-byte magic, the format version and header length as
+ * little-endian uint32s, a JSON header with the row count, dictionaries
+ * and sync state, then each column's raw bytes at 8-byte aligned offsets
+ * so a reader can view them in place. The file is written next to its
+ * destination and renamed over it, so readers never see a partial file.
+ * @param {string} path - Destination file
+ * @param {HazardStore} store - Store to save
+ * @param {SnapshotMeta} meta - Sync state to save with it
+ * @returns {Promise<number>} Bytes written
+ */
+export async function writeSnapshot(path: string, store: HazardStore, meta: SnapshotMeta): Promise<number> {
+    const columns = store.columns();
+    const numericIds = columns.ids.every((id) => typeof id === 'number');
+
+    const arrays: Array<[ColumnEntry['name'], ColumnEntry['kind'], ArrayBufferView]> = [
+        ['lat', 'f64', columns.lat],
+        ['lng', 'f64', columns.lng],
+        ['createdAt', 'f64', columns.createdAt],
+        ['updatedAt', 'f64', columns.updatedAt],
+        ...(numericIds ? [['ids', 'f64', Float64Array.from(columns.ids)] as [ColumnEntry['name'], ColumnEntry['kind'], ArrayBufferView]] : []),
+        ['type', 'u16', columns.type],
+        ['status', 'u16', columns.status],
+        ['area', 'u16', columns.area],
+        ['severity', 'u8', columns.severity],
+    ];
+
+    const entries: ColumnEntry[] = [];
+    let offset = 0;
+    for (const [name, kind, array] of arrays) {
+        entries.push({ name, kind, offset });
+        offset = align8(offset + array.byteLength);
+    }
+
+    const header: SnapshotHeader = {
+        count: columns.ids.length,
+        savedAt: Date.now(),
+        meta,
+        ids: numericIds ? 'column' : columns.ids,
+        dictionaries: { types: columns.types, statuses: columns.statuses, areas: columns.areas },
+        columns: entries,
+    };
+    const headerBytes = Buffer.from(JSON.stringify(header), 'utf8');
+    const preamble = Buffer.alloc(PREAMBLE_BYTES);
+    MAGIC.copy(preamble, 0);
+    preamble.writeUInt32LE(SNAPSHOT_FORMAT_VERSION, MAGIC.length);
+    preamble.writeUInt32LE(headerBytes.length, MAGIC.length + 4);
+
+    const parts: Buffer[] = [preamble, headerBytes];
+    let written = PREAMBLE_BYTES + headerBytes.length;
+    const pad = (to: number) => {
+        if (to > written) {
+            parts.push(Buffer.alloc(to - written));
+            written = to;
+        }
+    };
+    const dataStart = align8(written);
+    pad(dataStart);
+    arrays.forEach(([, , array], i) => {
+        pad(dataStart + entries[i].offset);
+        parts.push(Buffer.from(array.buffer, array.byteOffset, array.byteLength));
+        written += array.byteLength;
+    });
+
+    const temporary = `${path}.${process.pid}.tmp`;
+    const handle = await open(temporary, 'w');
+    try {
+        await handle.writev(parts);
+        await handle.sync();
+    } catch (error) {
+        await handle.close();
+        await unlink(temporary).catch(() => {});
+        throw error;
+    }
+    await handle.close();
+    await rename(temporary, path);
+    return written;
+}
+
+/**
+ * Reads a store written by writeSnapshot with a single bulk read. Columns
+ * are viewed in place over the file's buffer rather than copied.
+ * @param {string} path - Snapshot file
+ * @returns {Promise<{ store: HazardStore, meta: SnapshotMeta, savedAt: number }>} Restored store and its sync state
+ * @throws {Error} If the file is not a snapshot of the supported version or is truncated
+ */
+export async function readSnapshot(path: string): Promise<{ store: HazardStore, meta: SnapshotMeta, savedAt: number }> {
+    const file = await readFile(path);
+
+    if (file.length < PREAMBLE_BYTES || !file.subarray(0, MAGIC.length).equals(MAGIC)) {
+        throw new Error(`${path} is not a hazard snapshot`);
+    }
+    const version = file.readUInt32LE(MAGIC.length);
+    if (version !== SNAPSHOT_FORMAT_VERSION) {
+        throw new Error(`${path} has snapshot format ${version}, expected ${SNAPSHOT_FORMAT_VERSION}`);
+    }
+    const headerLength = file.readUInt32LE(MAGIC.length + 4);
+    const header: SnapshotHeader = JSON.parse(file.toString('utf8', PREAMBLE_BYTES, PREAMBLE_BYTES + headerLength));
+    const dataStart = align8(PREAMBLE_BYTES + headerLength);
+    const count = header.count;
+
+    const views = new Map<string, ArrayBufferView>();
+    for (const entry of header.columns) {
+        const start = dataStart + entry.offset;
+        const bytes = count * ELEMENT_BYTES[entry.kind];
+        if (start + bytes > file.length) {
+            throw new Error(`${path} is truncated`);
+        }
+        views.set(entry.name, view(file, entry.kind, start, count));
+    }
+
+    const column = <T extends ArrayBufferView>(name: keyof StoreColumns): T => {
+        const found = views.get(name);
+        if (!found) {
+            throw new Error(`${path} has no ${name} column`);
+        }
+        return found as T;
+    };
+
+    const columns: StoreColumns = {
+        ids: header.ids === 'column' ? Array.from(column<Float64Array>('ids')) : header.ids,
+        lat: column('lat'),
+        lng: column('lng'),
+        severity: column('severity'),
+        type: column('type'),
+        status: column('status'),
+        area: column('area'),
+        createdAt: column('createdAt'),
+        updatedAt: column('updatedAt'),
+        types: header.dictionaries.types,
+        statuses: header.dictionaries.statuses,
+        areas: header.dictionaries.areas,
+    };
+    return { store: HazardStore.fromColumns(columns), meta: header.meta, savedAt: header.savedAt };
+}
+
+/**
+ * Views a column over the file buffer, copying only if the buffer itself
+ * is not suitably aligned
+ * @private
+ */
+function view(file: Buffer, kind: ColumnEntry['kind'], start: number, count: number): ArrayBufferView {
+    const type = kind === 'f64' ? Float64Array : kind === 'u16' ? Uint16Array : Uint8Array;
+    const byteOffset = file.byteOffset + start;
+    if (byteOffset % type.BYTES_PER_ELEMENT === 0) {
+        return new type(file.buffer, byteOffset, count);
+    }
+    return new type(file.buffer.slice(byteOffset, byteOffset + count * type.BYTES_PER_ELEMENT));
+}
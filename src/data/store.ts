@@ -0,0 +1,395 @@
+/** Rows allocated by an empty store */
+const INITIAL_CAPACITY = 1024;
+
+/**
+ * Orders hazard ids the way the database does: numerically for numeric
+ * ids, by text otherwise
+ * @param {any} a - Hazard id
+ * @param {any} b - Hazard id
+ * @returns {number} Negative, zero or positive as a sorts before, with or after b
+ */
+export function compareIds(a: any, b: any): number {
+    if (typeof a === 'number' && typeof b === 'number') {
+        return a - b;
+    }
+    const left = String(a);
+    const right = String(b);
+    return left < right ? -1 : left > right ? 1 : 0;
+}
+
+/**
+ * A hazard materialized from the store
+ * @interface HazardRecord
+ */
+export interface HazardRecord {
+    id: any;
+    lat: number | null;
+    lng: number | null;
+    severity: number;
+    type: string | null;
+    status: string | null;
+    area: string | null;
+    created_at: string | null;
+    updated_at: string | null;
+}
+
+/**
+ * Keeps derived data, such as aggregates or indexes, in step with a store.
+ * An update to a stored row is reported as a removal of its old values
+ * followed by an addition of its new ones.
+ * @interface StoreObserver
+ */
+export interface StoreObserver {
+    /** Called after a row is inserted or overwritten */
+    add(store: HazardStore, row: number): void;
+    /** Called before a row is overwritten, while it still holds its old values */
+    remove(store: HazardStore, row: number): void;
+}
+
+/**
+ * The columns of a store, trimmed to its row count
+ * @interface StoreColumns
+ */
+export interface StoreColumns {
+    ids: any[];
+    lat: Float64Array;
+    lng: Float64Array;
+    severity: Uint8Array;
+    type: Uint16Array;
+    status: Uint16Array;
+    area: Uint16Array;
+    createdAt: Float64Array;
+    updatedAt: Float64Array;
+    /** Dictionary values by code, starting with null */
+    types: Array<string | null>;
+    statuses: Array<string | null>;
+    areas: Array<string | null>;
+}
+
+/**
+ * Maps the distinct values of a low-cardinality string column to small
+ * integer codes. Code 0 stands for null.
+ * @class Dictionary
+ */
+export class Dictionary {
+    /** Values by code; values[0] is null */
+    readonly values: Array<string | null> = [null];
+    private readonly codes = new Map<string, number>();
+
+    /**
+     * Rebuilds a dictionary from its values
+     * @param {Array<string | null>} values - Values by code, starting with null
+     * @returns {Dictionary} Dictionary assigning the same codes
+     */
+    static from(values: Array<string | null>): Dictionary {
+        const dictionary = new Dictionary();
+        for (let code = 1; code < values.length; code++) {
+            dictionary.values.push(values[code]);
+            dictionary.codes.set(values[code]!, code);
+        }
+        return dictionary;
+    }
+
+    /**
+     * Returns the code of a value, assigning the next free code if it is new
+     * @param {unknown} value - Column value
+     * @returns {number} Code of the value
+     */
+    encode(value: unknown): number {
+        if (value === null || value === undefined) {
+            return 0;
+        }
+        const key = String(value);
+        let code = this.codes.get(key);
+        if (code === undefined) {
+            code = this.values.length;
+            if (code > 0xffff) {
+                throw new Error('Dictionary column has more than 65535 distinct values');
+            }
+            this.values.push(key);
+            this.codes.set(key, code);
+        }
+        return code;
+    }
+
+    /**
+     * Returns the code of a value without assigning one
+     * @param {string} value - Column value
+     * @returns {number | undefined} Code of the value, or undefined if it never occurs
+     */
+    lookup(value: string): number | undefined {
+        return this.codes.get(value);
+    }
+
+    /**
+     * Returns the value of a code
+     * @param {number} code - Column code
+     * @returns {string | null} Value of the code
+     */
+    decode(code: number): string | null {
+        return this.values[code] ?? null;
+    }
+
+    /** Number of distinct values, including null */
+    get size(): number {
+        return this.values.length;
+    }
+}
+
+/**
+ * Column-oriented store of hazards.
+ * Every attribute lives in its own typed array indexed by row, with
+ * low-cardinality strings dictionary-encoded and timestamps kept as epoch
+ * milliseconds, so a hazard costs a few dozen bytes instead of a full JS
+ * object and scans over one attribute read contiguous memory. Rows are
+ * append-only and keep their number for the life of the store; a hazard
+ * that changes is overwritten in place.
+ * @class HazardStore
+ */
+export class HazardStore {
+    ids: any[] = [];
+    lat: Float64Array;
+    lng: Float64Array;
+    severity: Uint8Array;
+    type: Uint16Array;
+    status: Uint16Array;
+    area: Uint16Array;
+    createdAt: Float64Array;
+    updatedAt: Float64Array;
+
+    types = new Dictionary();
+    statuses = new Dictionary();
+    areas = new Dictionary();
+
+    /** Row by normalized id; unset until first needed on stores adopted from columns */
+    private rowsById: Map<any, number> | undefined = new Map<any, number>();
+    private readonly observers: StoreObserver[] = [];
+    private capacity: number;
+    private rowCount = 0;
+
+    /**
+     * Creates a new HazardStore
+     * @param {number} [capacity] - Rows to allocate up front
+     */
+    constructor(capacity: number = INITIAL_CAPACITY) {
+        this.capacity = Math.max(1, capacity);
+        this.lat = new Float64Array(this.capacity);
+        this.lng = new Float64Array(this.capacity);
+        this.severity = new Uint8Array(this.capacity);
+        this.type = new Uint16Array(this.capacity);
+        this.status = new Uint16Array(this.capacity);
+        this.area = new Uint16Array(this.capacity);
+        this.createdAt = new Float64Array(this.capacity);
+        this.updatedAt = new Float64Array(this.capacity);
+    }
+
+    /**
+     * Builds a store around existing columns, such as ones read from a
+     * snapshot. The arrays are adopted rather than copied, and the id
+     * index is built on the first lookup by id rather than up front.
+     * @param {StoreColumns} columns - Columns of equal length
+     * @returns {HazardStore} Store holding the rows
+     */
+    static fromColumns(columns: StoreColumns): HazardStore {
+        const store = new HazardStore(1);
+        const count = columns.ids.length;
+        // The adopted arrays hold exactly count rows; the first insert grows them
+        store.capacity = count;
+        store.rowCount = count;
+        store.ids = columns.ids;
+        store.lat = columns.lat;
+        store.lng = columns.lng;
+        store.severity = columns.severity;
+        store.type = columns.type;
+        store.status = columns.status;
+        store.area = columns.area;
+        store.createdAt = columns.createdAt;
+        store.updatedAt = columns.updatedAt;
+        store.types = Dictionary.from(columns.types);
+        store.statuses = Dictionary.from(columns.statuses);
+        store.areas = Dictionary.from(columns.areas);
+        store.rowsById = undefined;
+        return store;
+    }
+
+    /**
+     * Returns views of the columns covering the stored rows
+     * @returns {StoreColumns} Column views
+     */
+    columns(): StoreColumns {
+        const count = this.rowCount;
+        return {
+            ids: this.ids.slice(0, count),
+            lat: this.lat.subarray(0, count),
+            lng: this.lng.subarray(0, count),
+            severity: this.severity.subarray(0, count),
+            type: this.type.subarray(0, count),
+            status: this.status.subarray(0, count),
+            area: this.area.subarray(0, count),
+            createdAt: this.createdAt.subarray(0, count),
+            updatedAt: this.updatedAt.subarray(0, count),
+            types: this.types.values,
+            statuses: this.statuses.values,
+            areas: this.areas.values,
+        };
+    }
+
+    /** Number of rows */
+    get count(): number {
+        return this.rowCount;
+    }
+
+    /** Approximate bytes held by the columns, excluding ids */
+    get byteLength(): number {
+        return this.capacity * (8 + 8 + 1 + 2 + 2 + 2 + 8 + 8);
+    }
+
+    /**
+     * Returns the row holding a hazard
+     * @param {any} id - Hazard id
+     * @returns {number} Row number, or -1 if the hazard is not stored
+     */
+    rowOf(id: any): number {
+        return this.index().get(HazardStore.key(id)) ?? -1;
+    }
+
+    /**
+     * Inserts a hazard row from Supabase, or overwrites the stored copy
+     * @param {any} hazard - Hazard row as returned by PostgREST
+     * @returns {boolean} True if the store changed
+     */
+    upsert(hazard: any): boolean {
+        const key = HazardStore.key(hazard.id);
+        const rowsById = this.index();
+        let row = rowsById.get(key);
+        const inserted = row === undefined;
+        if (row === undefined) {
+            if (this.rowCount === this.capacity) {
+                this.grow();
+            }
+            row = this.rowCount++;
+            rowsById.set(key, row);
+            this.ids[row] = hazard.id;
+        }
+
+        const lat = typeof hazard.lat === 'number' ? hazard.lat : NaN;
+        const lng = typeof hazard.lng === 'number' ? hazard.lng : NaN;
+        const severity = typeof hazard.severity === 'number' ? hazard.severity : 0;
+        const type = this.types.encode(hazard.type);
+        const status = this.statuses.encode(hazard.status);
+        const area = this.areas.encode(hazard.area);
+        const createdAt = hazard.created_at ? Date.parse(hazard.created_at) : NaN;
+        const updatedAt = hazard.updated_at ? Date.parse(hazard.updated_at) : NaN;
+
+        const changed = inserted
+            || !Object.is(this.lat[row], lat)
+            || !Object.is(this.lng[row], lng)
+            || this.severity[row] !== severity
+            || this.type[row] !== type
+            || this.status[row] !== status
+            || this.area[row] !== area
+            || !Object.is(this.createdAt[row], createdAt)
+            || !Object.is(this.updatedAt[row], updatedAt);
+        if (!changed) {
+            return false;
+        }
+        if (!inserted) {
+            for (const observer of this.observers) {
+                observer.remove(this, row);
+            }
+        }
+
+        this.lat[row] = lat;
+        this.lng[row] = lng;
+        this.severity[row] = severity;
+        this.type[row] = type;
+        this.status[row] = status;
+        this.area[row] = area;
+        this.createdAt[row] = createdAt;
+        this.updatedAt[row] = updatedAt;
+
+        for (const observer of this.observers) {
+            observer.add(this, row);
+        }
+        return true;
+    }
+
+    /**
+     * Registers an observer for rows changed from now on. Observers that
+     * need the existing rows scan the store first.
+     * @param {StoreObserver} observer - Observer to notify
+     */
+    observe(observer: StoreObserver): void {
+        this.observers.push(observer);
+    }
+
+    /**
+     * Materializes a row as a plain object
+     * @param {number} row - Row number
+     * @returns {HazardRecord} The hazard
+     */
+    record(row: number): HazardRecord {
+        return {
+            id: this.ids[row],
+            lat: isNaN(this.lat[row]) ? null : this.lat[row],
+            lng: isNaN(this.lng[row]) ? null : this.lng[row],
+            severity: this.severity[row],
+            type: this.types.decode(this.type[row]),
+            status: this.statuses.decode(this.status[row]),
+            area: this.areas.decode(this.area[row]),
+            created_at: isNaN(this.createdAt[row]) ? null : new Date(this.createdAt[row]).toISOString(),
+            updated_at: isNaN(this.updatedAt[row]) ? null : new Date(this.updatedAt[row]).toISOString(),
+        };
+    }
+
+    /**
+     * Whether a row has usable coordinates
+     * @param {number} row - Row number
+     * @returns {boolean} True if both lat and lng are set
+     */
+    hasLocation(row: number): boolean {
+        return !isNaN(this.lat[row]) && !isNaN(this.lng[row]);
+    }
+
+    private index(): Map<any, number> {
+        if (!this.rowsById) {
+            const rowsById = new Map<any, number>();
+            for (let row = 0; row < this.rowCount; row++) {
+                rowsById.set(HazardStore.key(this.ids[row]), row);
+            }
+            this.rowsById = rowsById;
+        }
+        return this.rowsById;
+    }
+
+    private grow(): void {
+        this.capacity = Math.max(1, this.capacity * 2);
+        this.lat = resize(this.lat, new Float64Array(this.capacity));
+        this.lng = resize(this.lng, new Float64Array(this.capacity));
+        this.severity = resize(this.severity, new Uint8Array(this.capacity));
+        this.type = resize(this.type, new Uint16Array(this.capacity));
+        this.status = resize(this.status, new Uint16Array(this.capacity));
+        this.area = resize(this.area, new Uint16Array(this.capacity));
+        this.createdAt = resize(this.createdAt, new Float64Array(this.capacity));
+        this.updatedAt = resize(this.updatedAt, new Float64Array(this.capacity));
+    }
+
+    /**
+     * Normalizes an id so 42 and "42" find the same row without keeping a
+     * string per numeric id
+     * @param {any} id - Hazard id
+     * @returns {any} Map key for the id
+     * @private
+     */
+    private static key(id: any): any {
+        if (typeof id === 'string' && id !== '' && String(Number(id)) === id) {
+            return Number(id);
+        }
+        return id;
+    }
+}
+
+function resize<T extends Float64Array | Uint8Array | Uint16Array>(from: T, to: T): T {
+    to.set(from as any);
+    return to;
+}
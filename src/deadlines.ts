@@ -0,0 +1,133 @@
+import { AsyncLocalStorage } from 'async_hooks';
+
+/**
+ * Time limits for tool calls
+ * @interface DeadlineOptions
+ */
+export interface DeadlineOptions {
+    /** Deadline of tools without one of their own, in milliseconds; 0 disables */
+    defaultMs: number;
+    /** Deadlines by tool name, in milliseconds; 0 disables */
+    tools: { [tool: string]: number };
+}
+
+export const DEFAULT_DEADLINE_OPTIONS: DeadlineOptions = {
+    defaultMs: 30_000,
+    tools: {},
+};
+
+let deadlineOptions: DeadlineOptions = DEFAULT_DEADLINE_OPTIONS;
+
+/** Abort signal of the HTTP request being served, if any */
+const requestSignals = new AsyncLocalStorage<AbortSignal>();
+
+/**
+ * Sets the deadlines applied to tool calls from now on
+ * @param {Partial<DeadlineOptions>} options - Options to override
+ */
+export function configureDeadlines(options: Partial<DeadlineOptions>): void {
+    deadlineOptions = { ...deadlineOptions, ...options };
+}
+
+/**
+ * Parses per-tool deadlines written as `tool=ms,tool=ms`
+ * @param {string} value - Deadline list
+ * @returns {{ [tool: string]: number }} Deadlines by tool name
+ * @throws {Error} If an entry is not a tool name and a non-negative number
+ */
+export function parseToolDeadlines(value: string): { [tool: string]: number } {
+    const tools: { [tool: string]: number } = {};
+    for (const entry of value.split(',')) {
+        if (!entry.trim()) {
+            continue;
+        }
+        const [tool, ms] = entry.split('=').map((part) => part.trim());
+        const parsed = Number(ms);
+        if (!tool || !(parsed >= 0)) {
+            throw new Error(`Invalid tool deadline: ${entry}`);
+        }
+        tools[tool] = parsed;
+    }
+    return tools;
+}
+
+/**
+ * Returns the deadline of a tool
+ * @param {string} tool - Tool name
+ * @returns {number} Deadline in milliseconds, or 0 for none
+ */
+export function toolDeadlineMs(tool: string): number {
+    return deadlineOptions.tools[tool] ?? deadlineOptions.defaultMs;
+}
+
+/**
+ * Runs fn with a signal that aborts when the client of the HTTP request
+ * being served goes away; tool calls made within it stop with the request
+ * @param {AbortSignal} signal - Request signal
+ * @param {() => T} fn - Request handling
+ * @returns {T} Result of fn
+ */
+export function withRequestSignal<T>(signal: AbortSignal, fn: () => T): T {
+    return requestSignals.run(signal, fn);
+}
+
+/**
+ * Builds the signal a tool call runs under. It aborts when the MCP client
+ * cancels the call, when the HTTP request carrying it is closed, or when
+ * the tool's deadline passes, whichever comes first.
+ * @param {string} tool - Tool name
+ * @param {AbortSignal} [callSignal] - Cancellation signal of the MCP request
+ * @returns {AbortSignal} Combined signal
+ */
+export function toolSignal(tool: string, callSignal?: AbortSignal): AbortSignal {
+    const signals: AbortSignal[] = [];
+    if (callSignal) {
+        signals.push(callSignal);
+    }
+    const requestSignal = requestSignals.getStore();
+    if (requestSignal) {
+        signals.push(requestSignal);
+    }
+    const deadlineMs = toolDeadlineMs(tool);
+    if (deadlineMs > 0) {
+        signals.push(AbortSignal.timeout(deadlineMs));
+    }
+    return AbortSignal.any(signals);
+}
+
+/**
+ * Whether a signal was aborted by its deadline rather than by a client
+ * @param {AbortSignal} signal - Aborted signal
+ * @returns {boolean} True if the deadline passed
+ */
+export function isDeadlineExceeded(signal: AbortSignal): boolean {
+    return signal.reason instanceof Error && signal.reason.name === 'TimeoutError';
+}
+
+/**
+ * Settles with a promise, or rejects with the signal's reason as soon as
+ * it aborts. The promise keeps running; abort it through the signal.
+ * @param {Promise<T>} promise - Work to wait for
+ * @param {AbortSignal} signal - Signal to give up on
+ * @returns {Promise<T>} Result of the promise
+ */
+export function abortable<T>(promise: Promise<T>, signal: AbortSignal): Promise<T> {
+    if (signal.aborted) {
+        promise.catch(() => {});
+        return Promise.reject(signal.reason);
+    }
+    return new Promise((resolve, reject) => {
+        const onAbort = () => reject(signal.reason);
+        signal.addEventListener('abort', onAbort, { once: true });
+        promise.then(
+            (value) => {
+                signal.removeEventListener('abort', onAbort);
+                resolve(value);
+            },
+            (error) => {
+                signal.removeEventListener('abort', onAbort);
+                reject(error);
+            }
+        );
+    });
+}
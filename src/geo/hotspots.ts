@@ -0,0 +1,275 @@
+import { getHazardMirror, HazardBackend, HazardMirror, HazardStore, StoreObserver } from '../data/index.js';
+
+/** Finest resolution kept; zoom 20 tiles are roughly 38 m across at the equator */
+export const MAX_HOTSPOT_RESOLUTION = 20;
+
+/** Web Mercator cuts off at this latitude */
+const MAX_LATITUDE = 85.05112878;
+
+/** Bounding box as [west, south, east, north] in degrees */
+export type BoundingBox = [number, number, number, number];
+
+/**
+ * A grid cell ranked by the number of hazards in it
+ * @interface Hotspot
+ */
+export interface Hotspot {
+    /** Quadkey of the cell; its length is the resolution */
+    quadkey: string;
+    count: number;
+    /** Cell bounds as [west, south, east, north] */
+    bbox: BoundingBox;
+    center: { lat: number, lng: number };
+}
+
+/**
+ * Candidate cell in the best-first search
+ * @interface Candidate
+ */
+interface Candidate {
+    level: number;
+    x: number;
+    y: number;
+    count: number;
+}
+
+/**
+ * Hazard counts over a pyramid of Web Mercator tiles (quadkeys), from the
+ * whole world at resolution 0 down to MAX_HOTSPOT_RESOLUTION. Each level
+ * maps a cell key to its count and is kept current as rows change.
+ *
+ * Because a cell's count bounds the count of every cell inside it, the top
+ * cells at any resolution are found best-first: starting from the root,
+ * the heaviest candidate is expanded into its four children until cells of
+ * the requested resolution come off the heap, in order. Only a few cells
+ * per level are touched, whatever the number of hazards.
+ * @class HotspotGrid
+ */
+export class HotspotGrid implements StoreObserver {
+    private readonly levels: Array<Map<number, number>> = Array.from(
+        { length: MAX_HOTSPOT_RESOLUTION + 1 },
+        () => new Map<number, number>()
+    );
+
+    /**
+     * Recounts every row of a store and follows its changes from then on
+     * @param {HazardStore} store - Store to count
+     */
+    attach(store: HazardStore): void {
+        for (const level of this.levels) {
+            level.clear();
+        }
+
+        const finest = this.levels[MAX_HOTSPOT_RESOLUTION];
+        for (let row = 0; row < store.count; row++) {
+            if (store.hasLocation(row)) {
+                const key = cellKey(MAX_HOTSPOT_RESOLUTION, tileX(store.lng[row]), tileY(store.lat[row]));
+                finest.set(key, (finest.get(key) || 0) + 1);
+            }
+        }
+
+        // Coarser levels are summed from the level below rather than from rows
+        for (let level = MAX_HOTSPOT_RESOLUTION; level > 0; level--) {
+            const size = 2 ** level;
+            const parents = this.levels[level - 1];
+            for (const [key, count] of this.levels[level]) {
+                const parent = cellKey(level - 1, (key % size) >>> 1, Math.floor(key / size) >>> 1);
+                parents.set(parent, (parents.get(parent) || 0) + count);
+            }
+        }
+
+        store.observe(this);
+    }
+
+    add(store: HazardStore, row: number): void {
+        this.adjust(store, row, 1);
+    }
+
+    remove(store: HazardStore, row: number): void {
+        this.adjust(store, row, -1);
+    }
+
+    /**
+     * Returns the cells with the most hazards
+     * @param {number} resolution - Grid resolution, 0 to MAX_HOTSPOT_RESOLUTION
+     * @param {number} limit - Maximum number of cells
+     * @param {BoundingBox} [bbox] - Only cells intersecting this box
+     * @returns {Hotspot[]} Cells, heaviest first
+     */
+    top(resolution: number, limit: number, bbox?: BoundingBox): Hotspot[] {
+        const hotspots: Hotspot[] = [];
+        const heap: Candidate[] = [];
+        const root = this.levels[0].get(0);
+        if (root) {
+            push(heap, { level: 0, x: 0, y: 0, count: root });
+        }
+
+        while (heap.length > 0 && hotspots.length < limit) {
+            const cell = pop(heap);
+            if (cell.level === resolution) {
+                const bounds = tileBounds(cell.level, cell.x, cell.y);
+                hotspots.push({
+                    quadkey: quadkey(cell.level, cell.x, cell.y),
+                    count: cell.count,
+                    bbox: bounds,
+                    center: { lat: (bounds[1] + bounds[3]) / 2, lng: (bounds[0] + bounds[2]) / 2 },
+                });
+                continue;
+            }
+
+            const level = cell.level + 1;
+            const children = this.levels[level];
+            for (let dy = 0; dy < 2; dy++) {
+                for (let dx = 0; dx < 2; dx++) {
+                    const x = cell.x * 2 + dx;
+                    const y = cell.y * 2 + dy;
+                    const count = children.get(cellKey(level, x, y));
+                    if (count && (!bbox || intersects(tileBounds(level, x, y), bbox))) {
+                        push(heap, { level, x, y, count });
+                    }
+                }
+            }
+        }
+        return hotspots;
+    }
+
+    private adjust(store: HazardStore, row: number, delta: number): void {
+        if (!store.hasLocation(row)) {
+            return;
+        }
+        const x = tileX(store.lng[row]);
+        const y = tileY(store.lat[row]);
+        for (let level = MAX_HOTSPOT_RESOLUTION; level >= 0; level--) {
+            const shift = MAX_HOTSPOT_RESOLUTION - level;
+            const key = cellKey(level, x >>> shift, y >>> shift);
+            const cells = this.levels[level];
+            const count = (cells.get(key) || 0) + delta;
+            if (count > 0) {
+                cells.set(key, count);
+            } else {
+                cells.delete(key);
+            }
+        }
+    }
+}
+
+function cellKey(level: number, x: number, y: number): number {
+    return y * 2 ** level + x;
+}
+
+/** Tile column at the finest resolution */
+function tileX(lng: number): number {
+    const size = 2 ** MAX_HOTSPOT_RESOLUTION;
+    return Math.min(size - 1, Math.max(0, Math.floor(((lng + 180) / 360) * size)));
+}
+
+/** Tile row at the finest resolution */
+function tileY(lat: number): number {
+    const size = 2 ** MAX_HOTSPOT_RESOLUTION;
+    const clamped = Math.max(-MAX_LATITUDE, Math.min(MAX_LATITUDE, lat)) * Math.PI / 180;
+    const y = (1 - Math.log(Math.tan(clamped) + 1 / Math.cos(clamped)) / Math.PI) / 2;
+    return Math.min(size - 1, Math.max(0, Math.floor(y * size)));
+}
+
+function tileBounds(level: number, x: number, y: number): BoundingBox {
+    const size = 2 ** level;
+    const lngAt = (column: number) => (column / size) * 360 - 180;
+    const latAt = (row: number) => Math.atan(Math.sinh(Math.PI * (1 - (2 * row) / size))) * 180 / Math.PI;
+    return [lngAt(x), latAt(y + 1), lngAt(x + 1), latAt(y)];
+}
+
+function intersects(a: BoundingBox, b: BoundingBox): boolean {
+    return a[0] <= b[2] && a[2] >= b[0] && a[1] <= b[3] && a[3] >= b[1];
+}
+
+function quadkey(level: number, x: number, y: number): string {
+    let key = '';
+    for (let bit = level - 1; bit >= 0; bit--) {
+        key += ((x >>> bit) & 1) + 2 * ((y >>> bit) & 1);
+    }
+    return key;
+}
+
+function push(heap: Candidate[], candidate: Candidate): void {
+    heap.push(candidate);
+    let i = heap.length - 1;
+    while (i > 0) {
+        const parent = (i - 1) >> 1;
+        if (heap[parent].count >= heap[i].count) {
+            break;
+        }
+        [heap[parent], heap[i]] = [heap[i], heap[parent]];
+        i = parent;
+    }
+}
+
+function pop(heap: Candidate[]): Candidate {
+    const top = heap[0];
+    const last = heap.pop()!;
+    if (heap.length > 0) {
+        heap[0] = last;
+        let i = 0;
+        for (;;) {
+            const left = 2 * i + 1;
+            const right = left + 1;
+            let largest = i;
+            if (left < heap.length && heap[left].count > heap[largest].count) {
+                largest = left;
+            }
+            if (right < heap.length && heap[right].count > heap[largest].count) {
+                largest = right;
+            }
+            if (largest === i) {
+                break;
+            }
+            [heap[largest], heap[i]] = [heap[i], heap[largest]];
+            i = largest;
+        }
+    }
+    return top;
+}
+
+/**
+ * Hotspot grid kept in step with the hazard mirror
+ * @class HazardHotspots
+ */
+export class HazardHotspots {
+    private readonly grid = new HotspotGrid();
+
+    /**
+     * Creates a new HazardHotspots
+     * @param {HazardMirror} mirror - Mirror whose hazards are counted
+     */
+    constructor(private readonly mirror: HazardMirror) {
+        mirror.watchStore((store) => this.grid.attach(store));
+    }
+
+    /**
+     * Returns the cells with the most hazards, loading the mirror first if needed
+     * @param {number} resolution - Grid resolution, 0 to MAX_HOTSPOT_RESOLUTION
+     * @param {number} limit - Maximum number of cells
+     * @param {BoundingBox} [bbox] - Only cells intersecting this box
+     * @returns {Promise<Hotspot[]>} Cells, heaviest first
+     */
+    async top(resolution: number, limit: number, bbox?: BoundingBox): Promise<Hotspot[]> {
+        await this.mirror.ready();
+        return this.grid.top(resolution, limit, bbox);
+    }
+}
+
+/** One hotspot grid per backend */
+const registry = new WeakMap<HazardBackend, HazardHotspots>();
+
+/**
+ * Returns the shared hotspot grid for a backend, creating it on first use
+ * @param {HazardBackend} backend - Hazard backend
+ * @returns {HazardHotspots} Hotspot grid for the backend
+ */
+export function getHazardHotspots(backend: HazardBackend): HazardHotspots {
+    let hotspots = registry.get(backend);
+    if (!hotspots) {
+        hotspots = new HazardHotspots(getHazardMirror(backend));
+        registry.set(backend, hotspots);
+    }
+    return hotspots;
+}
@@ -0,0 +1,6 @@
+export { haversineMeters, radiusBox, SpatialIndex } from './spatial.js';
+export type { NearestResult, RadiusResult } from './spatial.js';
+export { HazardLocations, getHazardLocations } from './locations.js';
+export type { LocatedHazard, RadiusOrder } from './locations.js';
+export { HotspotGrid, HazardHotspots, getHazardHotspots, MAX_HOTSPOT_RESOLUTION } from './hotspots.js';
+export type { BoundingBox, Hotspot } from './hotspots.js';
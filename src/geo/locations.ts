@@ -0,0 +1,277 @@
+import { getHazardMirror, HazardBackend, HazardMirror, HazardStore, StoreObserver } from '../data/index.js';
+import { haversineMeters, radiusBox, SpatialIndex } from './spatial.js';
+import { selectTop } from '../topk.js';
+
+/** Minimum time between index rebuilds while the mirror keeps changing */
+const REBUILD_INTERVAL_MS = 5_000;
+
+/** Rows per backend read while the mirror is stale, matching the mirror's bulk load pages */
+const UPSTREAM_PAGE_SIZE = 1000;
+
+/** First radius searched upstream for the nearest hazard; each miss widens it eightfold */
+const UPSTREAM_NEAREST_RADIUS_M = 1_000;
+
+/** Half the Earth's circumference: no two points are farther apart */
+const MAX_DISTANCE_M = 20_015_087;
+
+/**
+ * A hazard resolved from coordinates
+ * @interface LocatedHazard
+ */
+export interface LocatedHazard {
+    id: any;
+    lat: number;
+    lng: number;
+    severity: number;
+    /** Distance from the query point in meters */
+    distance: number;
+}
+
+/** Ordering of radius search results */
+export type RadiusOrder = 'distance' | 'severity';
+
+/**
+ * Spatial index over the rows of a hazard store. Row numbers are stable,
+ * so attributes are read from the store when results are materialized.
+ * @interface LocationSnapshot
+ */
+interface LocationSnapshot {
+    store: HazardStore;
+    index: SpatialIndex;
+    builtAt: number;
+}
+
+/**
+ * Spatial index over the hazard mirror. The index is built once when the
+ * mirror first serves a lookup, then rebuilt in the background when the
+ * mirror changes, at most once per REBUILD_INTERVAL_MS, and swapped in
+ * whole. Lookups keep using the previous index until the new one is
+ * ready. While the mirror is stale, lookups page through the hazards
+ * around the query point on the backend instead, widening the search for
+ * the nearest hazard until it finds one, so both paths give the same answers.
+ * @class HazardLocations
+ */
+export class HazardLocations implements StoreObserver {
+    private snapshot?: LocationSnapshot;
+    private store?: HazardStore;
+    private dirty = false;
+    private timer?: NodeJS.Timeout;
+
+    /**
+     * Creates a new HazardLocations
+     * @param {HazardMirror} mirror - Mirror the index is built from
+     * @param {HazardBackend} backend - Backend read while the mirror is stale
+     */
+    constructor(private readonly mirror: HazardMirror, private readonly backend: HazardBackend) {
+        mirror.watchStore((store) => this.attach(store));
+    }
+
+    /**
+     * Resolves a location to the nearest hazard
+     * @param {number} lat - Latitude in degrees
+     * @param {number} lng - Longitude in degrees
+     * @param {AbortSignal} [signal] - Abandons a backend read when aborted
+     * @returns {Promise<LocatedHazard | undefined>} Nearest hazard, or undefined if there are none
+     */
+    async nearest(lat: number, lng: number, signal?: AbortSignal): Promise<LocatedHazard | undefined> {
+        const snapshot = this.current();
+        if (!snapshot) {
+            // Widen the search until something is found or the whole globe is covered
+            for (let radius = UPSTREAM_NEAREST_RADIUS_M; ; radius *= 8) {
+                const hazards = await this.upstreamWithinRadius(lat, lng, Math.min(radius, MAX_DISTANCE_M), signal);
+                if (hazards.length > 0) {
+                    return hazards.reduce((best, hazard) => hazard.distance < best.distance ? hazard : best);
+                }
+                if (radius >= MAX_DISTANCE_M) {
+                    return undefined;
+                }
+            }
+        }
+
+        const hit = snapshot.index.nearest(lat, lng);
+        if (!hit) {
+            return undefined;
+        }
+        const store = snapshot.store;
+        return {
+            id: store.ids[hit.row],
+            lat: store.lat[hit.row],
+            lng: store.lng[hit.row],
+            severity: store.severity[hit.row],
+            distance: hit.distance,
+        };
+    }
+
+    /**
+     * Finds the hazards within a radius of a location
+     * @param {number} lat - Latitude in degrees
+     * @param {number} lng - Longitude in degrees
+     * @param {number} radiusMeters - Search radius in meters
+     * @param {number} limit - Maximum number of hazards to return
+     * @param {RadiusOrder} orderBy - Nearest first, or most severe first with distance as tie-break
+     * @param {AbortSignal} [signal] - Abandons a backend read when aborted
+     * @returns {Promise<{ total: number, hazards: LocatedHazard[] }>} Matching hazards and how many there were in total
+     */
+    async withinRadius(
+        lat: number,
+        lng: number,
+        radiusMeters: number,
+        limit: number,
+        orderBy: RadiusOrder,
+        signal?: AbortSignal
+    ): Promise<{ total: number, hazards: LocatedHazard[] }> {
+        const snapshot = this.current();
+        if (!snapshot) {
+            const found = await this.upstreamWithinRadius(lat, lng, radiusMeters, signal);
+            const compare = orderBy === 'severity'
+                ? (a: number, b: number) => (found[b].severity - found[a].severity) || (found[a].distance - found[b].distance)
+                : (a: number, b: number) => found[a].distance - found[b].distance;
+            return { total: found.length, hazards: selectTop(found.length, limit, compare).map((i) => found[i]) };
+        }
+
+        const { count, rows, distances } = snapshot.index.withinRadius(lat, lng, radiusMeters);
+        const store = snapshot.store;
+        const severities = store.severity;
+
+        const compare = orderBy === 'severity'
+            ? (a: number, b: number) => (severities[rows[b]] - severities[rows[a]]) || (distances[a] - distances[b])
+            : (a: number, b: number) => distances[a] - distances[b];
+
+        const hazards = selectTop(count, limit, compare).map((i) => ({
+            id: store.ids[rows[i]],
+            lat: store.lat[rows[i]],
+            lng: store.lng[rows[i]],
+            severity: severities[rows[i]],
+            distance: distances[i],
+        }));
+        return { total: count, hazards };
+    }
+
+    /**
+     * Follows a store the mirror has swapped in. The snapshot of the
+     * previous store stays in use until the new one is indexed.
+     * @param {HazardStore} store - Mirror's current store
+     */
+    attach(store: HazardStore): void {
+        this.store = store;
+        store.observe(this);
+        this.dirty = true;
+        this.schedule(0);
+    }
+
+    add(store: HazardStore): void {
+        this.changed(store);
+    }
+
+    remove(store: HazardStore): void {
+        this.changed(store);
+    }
+
+    /**
+     * Returns the snapshot to serve lookups from, or undefined when the
+     * mirror is not fresh and lookups should go to the backend. Only the
+     * first lookup after the mirror loads builds an index inline.
+     * @private
+     */
+    private current(): LocationSnapshot | undefined {
+        this.mirror.ready().catch((error) => console.error('Error loading hazard mirror:', error));
+        if (!this.mirror.isFresh()) {
+            return undefined;
+        }
+        if (!this.snapshot) {
+            this.rebuild();
+        }
+        return this.snapshot;
+    }
+
+    private changed(store: HazardStore): void {
+        if (store !== this.store || this.dirty) {
+            return;
+        }
+        this.dirty = true;
+        this.schedule(this.snapshot ? Math.max(0, this.snapshot.builtAt + REBUILD_INTERVAL_MS - Date.now()) : 0);
+    }
+
+    /**
+     * Queues a background rebuild, unless one is already queued or no
+     * lookup has needed an index yet
+     * @private
+     */
+    private schedule(delayMs: number): void {
+        if (this.timer || !this.snapshot) {
+            return;
+        }
+        this.timer = setTimeout(() => {
+            this.timer = undefined;
+            if (this.dirty) {
+                this.rebuild();
+            }
+        }, delayMs);
+        this.timer.unref();
+    }
+
+    private rebuild(): void {
+        const store = this.store ?? this.mirror.store;
+        this.dirty = false;
+        this.snapshot = {
+            store,
+            index: new SpatialIndex(store.lat, store.lng, store.count, undefined, (row) => store.hasLocation(row)),
+            builtAt: Date.now(),
+        };
+    }
+
+    /**
+     * Reads the hazards within a radius from the backend, paging through
+     * the enclosing box by id so no server row limit cuts the result short
+     * @private
+     */
+    private async upstreamWithinRadius(lat: number, lng: number, radiusMeters: number, signal?: AbortSignal): Promise<LocatedHazard[]> {
+        const [minLat, minLng, maxLat, maxLng] = radiusBox(lat, lng, radiusMeters);
+        const hazards: LocatedHazard[] = [];
+        let afterId: any;
+        for (;;) {
+            const { data, error } = await this.backend.hazardsInBox(minLat, minLng, maxLat, maxLng, afterId, UPSTREAM_PAGE_SIZE, signal);
+            if (error) {
+                throw new Error(error.message);
+            }
+
+            for (const hazard of data ?? []) {
+                if (typeof hazard.lat !== 'number' || typeof hazard.lng !== 'number') {
+                    continue;
+                }
+                const distance = haversineMeters(lat, lng, hazard.lat, hazard.lng);
+                if (distance <= radiusMeters) {
+                    hazards.push({
+                        id: hazard.id,
+                        lat: hazard.lat,
+                        lng: hazard.lng,
+                        severity: typeof hazard.severity === 'number' ? hazard.severity : 0,
+                        distance,
+                    });
+                }
+            }
+
+            if (!data || data.length < UPSTREAM_PAGE_SIZE) {
+                return hazards;
+            }
+            afterId = data[data.length - 1].id;
+        }
+    }
+}
+
+/** One location index per backend */
+const registry = new WeakMap<HazardBackend, HazardLocations>();
+
+/**
+ * Returns the shared location index for a backend, creating it on first use
+ * @param {HazardBackend} backend - Hazard backend
+ * @returns {HazardLocations} Location index for the backend
+ */
+export function getHazardLocations(backend: HazardBackend): HazardLocations {
+    let locations = registry.get(backend);
+    if (!locations) {
+        locations = new HazardLocations(getHazardMirror(backend), backend);
+        registry.set(backend, locations);
+    }
+    return locations;
+}
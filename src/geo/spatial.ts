@@ -0,0 +1,356 @@
+/** Mean Earth radius in meters */
+const EARTH_RADIUS_M = 6_371_008.8;
+
+/** Meters per degree of latitude */
+const METERS_PER_DEGREE = 111_320;
+
+const DEG_TO_RAD = Math.PI / 180;
+
+/**
+ * Great-circle distance between two points
+ * @param {number} lat1 - Latitude of the first point in degrees
+ * @param {number} lng1 - Longitude of the first point in degrees
+ * @param {number} lat2 - Latitude of the second point in degrees
+ * @param {number} lng2 - Longitude of the second point in degrees
+ * @returns {number} Distance in meters
+ */
+export function haversineMeters(lat1: number, lng1: number, lat2: number, lng2: number): number {
+    const dLat = (lat2 - lat1) * DEG_TO_RAD;
+    const dLng = (lng2 - lng1) * DEG_TO_RAD;
+    const a = Math.sin(dLat / 2) ** 2
+        + Math.cos(lat1 * DEG_TO_RAD) * Math.cos(lat2 * DEG_TO_RAD) * Math.sin(dLng / 2) ** 2;
+    return 2 * EARTH_RADIUS_M * Math.asin(Math.min(1, Math.sqrt(a)));
+}
+
+/**
+ * Latitude/longitude box enclosing a circle
+ * @param {number} lat - Latitude of the center in degrees
+ * @param {number} lng - Longitude of the center in degrees
+ * @param {number} radiusMeters - Circle radius in meters
+ * @returns {[number, number, number, number]} Box as [minLat, minLng, maxLat, maxLng]
+ */
+export function radiusBox(lat: number, lng: number, radiusMeters: number): [number, number, number, number] {
+    const dLat = radiusMeters / METERS_PER_DEGREE;
+    const dLng = radiusMeters / (METERS_PER_DEGREE * Math.max(0.01, Math.cos(Math.min(89, Math.abs(lat) + dLat) * DEG_TO_RAD)));
+    return [lat - dLat, lng - dLng, lat + dLat, lng + dLng];
+}
+
+/**
+ * Result of a nearest-neighbour lookup
+ * @interface NearestResult
+ */
+export interface NearestResult {
+    /** Row of the nearest point in the indexed columns */
+    row: number;
+    /** Distance to the query point in meters */
+    distance: number;
+}
+
+/**
+ * Points within a radius, in no particular order. The arrays are views
+ * into scratch buffers owned by the index and are only valid until its
+ * next radius query.
+ * @interface RadiusResult
+ */
+export interface RadiusResult {
+    count: number;
+    rows: Int32Array;
+    /** Distance of each row to the query point in meters */
+    distances: Float64Array;
+}
+
+/**
+ * Immutable uniform-grid spatial index over latitude/longitude columns.
+ * Points are bucketed into square cells of cellDegrees and stored sorted
+ * by cell, so every cell is a contiguous slice of the sorted coordinate
+ * arrays. Lookups only touch the cells around the query point.
+ * @class SpatialIndex
+ */
+export class SpatialIndex {
+    private readonly columns: number;
+    private readonly cells = new Map<number, number>();
+    private readonly rows: Int32Array;
+    private readonly sortedLats: Float64Array;
+    private readonly sortedLngs: Float64Array;
+    private readonly sortedCosLats: Float64Array;
+    private readonly cellEnds: Int32Array;
+    private candidates = new Int32Array(1024);
+    private resultRows = new Int32Array(1024);
+    private resultDistances = new Float64Array(1024);
+
+    /**
+     * Builds an index over the first count entries of the coordinate columns
+     * @param {Float64Array} lats - Latitude column in degrees
+     * @param {Float64Array} lngs - Longitude column in degrees
+     * @param {number} count - Number of rows to index
+     * @param {number} [cellDegrees] - Cell edge length in degrees
+     * @param {(row: number) => boolean} [include] - Filter for rows to index
+     */
+    constructor(
+        lats: Float64Array,
+        lngs: Float64Array,
+        count: number,
+        readonly cellDegrees: number = 0.01,
+        include?: (row: number) => boolean
+    ) {
+        this.columns = Math.ceil(360 / cellDegrees) + 1;
+
+        // Counting sort by cell key: one pass to size cells, one to place rows
+        const keys = new Float64Array(count);
+        const counts = new Map<number, number>();
+        let indexed = 0;
+        for (let row = 0; row < count; row++) {
+            if (include && !include(row)) {
+                keys[row] = -1;
+                continue;
+            }
+            const key = this.cellKey(lats[row], lngs[row]);
+            keys[row] = key;
+            counts.set(key, (counts.get(key) || 0) + 1);
+            indexed++;
+        }
+
+        const cellIds = Array.from(counts.keys());
+        this.cellEnds = new Int32Array(cellIds.length);
+        const cursors = new Int32Array(cellIds.length);
+        let offset = 0;
+        for (let i = 0; i < cellIds.length; i++) {
+            this.cells.set(cellIds[i], i);
+            cursors[i] = offset;
+            offset += counts.get(cellIds[i])!;
+            this.cellEnds[i] = offset;
+        }
+
+        this.rows = new Int32Array(indexed);
+        this.sortedLats = new Float64Array(indexed);
+        this.sortedLngs = new Float64Array(indexed);
+        this.sortedCosLats = new Float64Array(indexed);
+        for (let row = 0; row < count; row++) {
+            if (keys[row] < 0) {
+                continue;
+            }
+            const slot = cursors[this.cells.get(keys[row])!]++;
+            this.rows[slot] = row;
+            this.sortedLats[slot] = lats[row];
+            this.sortedLngs[slot] = lngs[row];
+            this.sortedCosLats[slot] = Math.cos(lats[row] * DEG_TO_RAD);
+        }
+    }
+
+    /** Number of indexed points */
+    get size(): number {
+        return this.rows.length;
+    }
+
+    /**
+     * Finds the indexed point closest to a location. Rings of cells are
+     * searched outwards until no unsearched cell can hold anything closer;
+     * if that is not settled within maxRings, every point is scanned.
+     * @param {number} lat - Query latitude in degrees
+     * @param {number} lng - Query longitude in degrees
+     * @param {number} [maxRings] - Rings of cells to search before falling back to a full scan
+     * @returns {NearestResult | undefined} Nearest point, or undefined if the index is empty
+     */
+    nearest(lat: number, lng: number, maxRings: number = 64): NearestResult | undefined {
+        if (this.rows.length === 0) {
+            return undefined;
+        }
+
+        const cx = this.cellX(lng);
+        const cy = this.cellY(lat);
+        // Smallest on-the-ground cell edge near the query point, for the stop test
+        const cellMeters = this.cellDegrees * METERS_PER_DEGREE * Math.max(0.01, Math.cos(Math.min(89, Math.abs(lat) + this.cellDegrees * maxRings) * DEG_TO_RAD));
+
+        let best = -1;
+        let bestDistance = Infinity;
+        let settled = false;
+        for (let ring = 0; ring <= maxRings; ring++) {
+            // Everything in this ring or beyond is at least (ring - 1) cells away
+            if (best >= 0 && bestDistance <= (ring - 1) * cellMeters) {
+                settled = true;
+                break;
+            }
+            for (let y = cy - ring; y <= cy + ring; y++) {
+                const onEdgeRow = y === cy - ring || y === cy + ring;
+                const step = onEdgeRow || ring === 0 ? 1 : 2 * ring;
+                for (let x = cx - ring; x <= cx + ring; x += step) {
+                    const slice = this.cellSlice(x, y);
+                    if (!slice) {
+                        continue;
+                    }
+                    for (let i = slice[0]; i < slice[1]; i++) {
+                        const distance = haversineMeters(lat, lng, this.sortedLats[i], this.sortedLngs[i]);
+                        if (distance < bestDistance) {
+                            bestDistance = distance;
+                            best = i;
+                        }
+                    }
+                }
+            }
+        }
+
+        if (!settled && !(best >= 0 && bestDistance <= maxRings * cellMeters)) {
+            // Points past maxRings may still be closer than anything found:
+            // the data is sparse around here, so scan it all
+            for (let i = 0; i < this.rows.length; i++) {
+                const distance = haversineMeters(lat, lng, this.sortedLats[i], this.sortedLngs[i]);
+                if (distance < bestDistance) {
+                    bestDistance = distance;
+                    best = i;
+                }
+            }
+        }
+
+        return { row: this.rows[best], distance: bestDistance };
+    }
+
+    /**
+     * Visits every indexed point inside a latitude/longitude bounding box
+     * @param {number} minLat - Southern edge in degrees
+     * @param {number} minLng - Western edge in degrees
+     * @param {number} maxLat - Northern edge in degrees
+     * @param {number} maxLng - Eastern edge in degrees
+     * @param {(row: number, lat: number, lng: number) => void} visit - Called once per point
+     */
+    forEachInBox(
+        minLat: number,
+        minLng: number,
+        maxLat: number,
+        maxLng: number,
+        visit: (row: number, lat: number, lng: number) => void
+    ): void {
+        this.forEachCell(minLat, minLng, maxLat, maxLng, (start, end) => {
+            for (let i = start; i < end; i++) {
+                const pointLat = this.sortedLats[i];
+                const pointLng = this.sortedLngs[i];
+                if (pointLat >= minLat && pointLat <= maxLat && pointLng >= minLng && pointLng <= maxLng) {
+                    visit(this.rows[i], pointLat, pointLng);
+                }
+            }
+        });
+    }
+
+    /**
+     * Finds every indexed point within a radius of a location.
+     * Occupied cells overlapping the radius' bounding box supply the candidates,
+     * which are gathered into a flat buffer and tested in one tight pass.
+     * The pass compares the haversine term against sin²(r / 2R), so the
+     * inverse trigonometry only runs for points that are kept.
+     * @param {number} lat - Query latitude in degrees
+     * @param {number} lng - Query longitude in degrees
+     * @param {number} radiusMeters - Search radius in meters
+     * @returns {RadiusResult} Points within the radius
+     */
+    withinRadius(lat: number, lng: number, radiusMeters: number): RadiusResult {
+        const [minLat, minLng, maxLat, maxLng] = radiusBox(lat, lng, radiusMeters);
+
+        let candidateCount = 0;
+        this.forEachCell(minLat, minLng, maxLat, maxLng, (start, end) => {
+            const needed = candidateCount + end - start;
+            if (needed > this.candidates.length) {
+                const grown = new Int32Array(Math.max(needed, this.candidates.length * 2));
+                grown.set(this.candidates.subarray(0, candidateCount));
+                this.candidates = grown;
+            }
+            for (let i = start; i < end; i++) {
+                this.candidates[candidateCount++] = i;
+            }
+        });
+
+        if (candidateCount > this.resultRows.length) {
+            this.resultRows = new Int32Array(this.candidates.length);
+            this.resultDistances = new Float64Array(this.candidates.length);
+        }
+
+        const sinHalfAngle = Math.sin(Math.min(Math.PI / 2, radiusMeters / (2 * EARTH_RADIUS_M)));
+        const maxA = sinHalfAngle * sinHalfAngle;
+        const cosLat = Math.cos(lat * DEG_TO_RAD);
+        const candidates = this.candidates;
+        const lats = this.sortedLats;
+        const lngs = this.sortedLngs;
+        const cosLats = this.sortedCosLats;
+        const rows = this.resultRows;
+        const distances = this.resultDistances;
+
+        let count = 0;
+        for (let k = 0; k < candidateCount; k++) {
+            const i = candidates[k];
+            const sinDLat = Math.sin((lats[i] - lat) * DEG_TO_RAD * 0.5);
+            const sinDLng = Math.sin((lngs[i] - lng) * DEG_TO_RAD * 0.5);
+            const a = sinDLat * sinDLat + cosLat * cosLats[i] * sinDLng * sinDLng;
+            if (a <= maxA) {
+                rows[count] = this.rows[i];
+                distances[count] = 2 * EARTH_RADIUS_M * Math.asin(Math.sqrt(a));
+                count++;
+            }
+        }
+
+        return { count, rows: rows.subarray(0, count), distances: distances.subarray(0, count) };
+    }
+
+    /**
+     * Visits the occupied cells overlapping a bounding box, clamped to the
+     * grid. When the box spans more cells than are occupied, the occupied
+     * cells are walked instead, so a box the size of the globe costs no
+     * more than a full scan.
+     * @private
+     */
+    private forEachCell(
+        minLat: number,
+        minLng: number,
+        maxLat: number,
+        maxLng: number,
+        visit: (start: number, end: number) => void
+    ): void {
+        const minX = Math.max(0, this.cellX(minLng));
+        const maxX = Math.min(this.columns - 1, this.cellX(maxLng));
+        const minY = Math.max(0, this.cellY(minLat));
+        const maxY = Math.min(Math.ceil(180 / this.cellDegrees), this.cellY(maxLat));
+        if (minX > maxX || minY > maxY) {
+            return;
+        }
+
+        if ((maxX - minX + 1) * (maxY - minY + 1) > this.cells.size) {
+            for (const [key, cell] of this.cells) {
+                const x = key % this.columns;
+                const y = (key - x) / this.columns;
+                if (x >= minX && x <= maxX && y >= minY && y <= maxY) {
+                    visit(cell === 0 ? 0 : this.cellEnds[cell - 1], this.cellEnds[cell]);
+                }
+            }
+            return;
+        }
+
+        for (let y = minY; y <= maxY; y++) {
+            for (let x = minX; x <= maxX; x++) {
+                const slice = this.cellSlice(x, y);
+                if (slice) {
+                    visit(slice[0], slice[1]);
+                }
+            }
+        }
+    }
+
+    private cellX(lng: number): number {
+        return Math.floor((lng + 180) / this.cellDegrees);
+    }
+
+    private cellY(lat: number): number {
+        return Math.floor((lat + 90) / this.cellDegrees);
+    }
+
+    private cellKey(lat: number, lng: number): number {
+        return this.cellY(lat) * this.columns + this.cellX(lng);
+    }
+
+    private cellSlice(x: number, y: number): [number, number] | undefined {
+        if (x < 0 || y < 0 || x >= this.columns) {
+            return undefined;
+        }
+        const cell = this.cells.get(y * this.columns + x);
+        if (cell === undefined) {
+            return undefined;
+        }
+        return [cell === 0 ? 0 : this.cellEnds[cell - 1], this.cellEnds[cell]];
+    }
+}
@@ -6,26 +6,61 @@ loadEnv();
 import { loadConfig } from './config.js'; 
 import { parseArgs } from './cli.js'; 
 import { PotholeServer } from './server.js'; 
-import { runStdioTransport, startHttpTransport } from './transport/index.js'; 
+import { setOutputFormat } from './tools/index.js'; 
+import { configureHazardMirror, getHazardBackend } from './data/index.js'; 
+import { configureWeather } from './weather/index.js'; 
+import { configureComputePool } from './workers/index.js'; 
+import { configureDeadlines } from './deadlines.js'; 
+import { runStdioTransport, startHttpTransport, startClusterTransport } from './transport/index.js'; 
 
 /** 
  * Transport selection logic: 
  * 1. --stdio flag forces STDIO transport 
  * 2. Default: HTTP transport for production compatibility 
+ * 3. --workers N spreads HTTP sessions over N worker processes 
  */ 
 async function main() { 
     try { 
         const config = loadConfig(); 
         const cliOptions = parseArgs(); 
+        setOutputFormat(cliOptions.pretty ? 'pretty' : config.outputFormat); 
+        configureHazardMirror({ 
+            syncIntervalMs: config.mirrorSyncIntervalMs, 
+            maxLagMs: config.mirrorMaxLagMs, 
+            fullReloadIntervalMs: config.mirrorFullReloadIntervalMs, 
+            snapshotPath: config.mirrorSnapshotPath, 
+            snapshotIntervalMs: config.mirrorSnapshotIntervalMs 
+        }); 
+        configureWeather({ 
+            file: config.weatherFile, 
+            cellPrecision: config.weatherCellPrecision, 
+            cacheTtlMs: config.weatherCacheTtlMs, 
+            cacheMaxEntries: config.weatherCacheMaxEntries 
+        }); 
+        configureComputePool({ 
+            threads: config.computeThreads, 
+            maxQueue: config.computeQueueLimit 
+        }); 
+        configureDeadlines({ 
+            defaultMs: config.toolDeadlineMs, 
+            tools: config.toolDeadlines 
+        }); 
         
         if (cliOptions.stdio) { 
             // STDIO transport for local development 
-            const server = new PotholeServer(config.supabaseUrl, config.supabaseKey); 
+            const server = new PotholeServer(getHazardBackend(config)); 
             await runStdioTransport(server.getServer()); 
         } else { 
             // HTTP transport for production/cloud deployment 
             const port = cliOptions.port || config.port; 
-            startHttpTransport({ ...config, port }); 
+            const stateless = cliOptions.stateless || config.stateless; 
+            const workers = cliOptions.workers || config.workers; 
+            const recordPath = cliOptions.record || config.recordPath; 
+            if (workers > 1) { 
+                startClusterTransport({ ...config, port, stateless, workers, recordPath }); 
+            } else { 
+                startHttpTransport({ ...config, port, stateless, recordPath }); 
+            } 
         } 
     } catch (error) { 
         console.error("Fatal error running Pothole server:", error); 
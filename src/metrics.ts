@@ -0,0 +1,279 @@
+import { IntervalHistogram, monitorEventLoopDelay } from 'perf_hooks';
+
+/** Latency buckets in seconds, from 0.5 ms to 10 s */
+export const LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+/** Size buckets in bytes, from 256 B to 4 MiB */
+export const SIZE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304];
+
+export type Labels = { [name: string]: string };
+
+/**
+ * Fixed-bucket histogram backed by a preallocated typed array.
+ * Observing a value is a short bucket scan and two additions, with no
+ * allocation.
+ * @class Histogram
+ */
+export class Histogram {
+    private readonly counts: Float64Array;
+    private sum = 0;
+    private count = 0;
+
+    /**
+     * Creates a new Histogram
+     * @param {Float64Array} bounds - Upper bounds of the buckets, ascending
+     */
+    constructor(private readonly bounds: Float64Array) {
+        this.counts = new Float64Array(bounds.length + 1);
+    }
+
+    /**
+     * Records a value
+     * @param {number} value - Observed value
+     */
+    observe(value: number): void {
+        let i = 0;
+        while (i < this.bounds.length && value > this.bounds[i]) {
+            i++;
+        }
+        this.counts[i]++;
+        this.sum += value;
+        this.count++;
+    }
+
+    /**
+     * Appends the Prometheus text representation of this histogram
+     * @param {string[]} lines - Output lines
+     * @param {string} name - Metric name
+     * @param {string} labels - Rendered label pairs, without braces
+     */
+    render(lines: string[], name: string, labels: string): void {
+        const prefix = labels ? `${labels},` : '';
+        let cumulative = 0;
+        for (let i = 0; i < this.bounds.length; i++) {
+            cumulative += this.counts[i];
+            lines.push(`${name}_bucket{${prefix}le="${this.bounds[i]}"} ${cumulative}`);
+        }
+        cumulative += this.counts[this.bounds.length];
+        lines.push(`${name}_bucket{${prefix}le="+Inf"} ${cumulative}`);
+        lines.push(`${name}_sum${labels ? `{${labels}}` : ''} ${this.sum}`);
+        lines.push(`${name}_count${labels ? `{${labels}}` : ''} ${this.count}`);
+    }
+}
+
+/**
+ * Family of histograms sharing a name and buckets, one per label set.
+ * Children are created on first use and reused afterwards; callers on hot
+ * paths can keep the child returned by labels() to skip the lookup.
+ * @class HistogramVec
+ */
+export class HistogramVec {
+    private readonly bounds: Float64Array;
+    private readonly children = new Map<string, Histogram>();
+
+    /**
+     * Creates a new HistogramVec
+     * @param {string} name - Metric name
+     * @param {string} help - Metric description
+     * @param {number[]} buckets - Upper bounds of the buckets, ascending
+     */
+    constructor(readonly name: string, readonly help: string, buckets: number[]) {
+        this.bounds = Float64Array.from(buckets);
+    }
+
+    /**
+     * Returns the histogram for a label set
+     * @param {Labels} labels - Label values
+     * @returns {Histogram} Histogram for the label set
+     */
+    labels(labels: Labels): Histogram {
+        const key = renderLabels(labels);
+        let child = this.children.get(key);
+        if (!child) {
+            child = new Histogram(this.bounds);
+            this.children.set(key, child);
+        }
+        return child;
+    }
+
+    render(lines: string[]): void {
+        lines.push(`# HELP ${this.name} ${this.help}`);
+        lines.push(`# TYPE ${this.name} histogram`);
+        for (const [labels, child] of this.children) {
+            child.render(lines, this.name, labels);
+        }
+    }
+}
+
+/**
+ * Family of monotonically increasing counters, one per label set
+ * @class CounterVec
+ */
+export class CounterVec {
+    private readonly values = new Map<string, number>();
+
+    /**
+     * Creates a new CounterVec
+     * @param {string} name - Metric name
+     * @param {string} help - Metric description
+     */
+    constructor(readonly name: string, readonly help: string) {}
+
+    /**
+     * Increments the counter for a label set
+     * @param {Labels} labels - Label values
+     * @param {number} [amount] - Increment
+     */
+    inc(labels: Labels, amount: number = 1): void {
+        const key = renderLabels(labels);
+        this.values.set(key, (this.values.get(key) || 0) + amount);
+    }
+
+    render(lines: string[]): void {
+        lines.push(`# HELP ${this.name} ${this.help}`);
+        lines.push(`# TYPE ${this.name} counter`);
+        for (const [labels, value] of this.values) {
+            lines.push(`${this.name}${labels ? `{${labels}}` : ''} ${value}`);
+        }
+    }
+}
+
+/**
+ * Gauge or counter whose values are read from elsewhere when metrics are
+ * scraped, so the code that owns the numbers needs no instrumentation
+ * @class CollectedMetric
+ */
+export class CollectedMetric {
+    /**
+     * Creates a new CollectedMetric
+     * @param {string} name - Metric name
+     * @param {string} help - Metric description
+     * @param {'gauge' | 'counter'} type - Prometheus metric type
+     * @param {() => Array<[Labels, number]>} collect - Returns the current values
+     */
+    constructor(
+        readonly name: string,
+        readonly help: string,
+        readonly type: 'gauge' | 'counter',
+        private readonly collect: () => Array<[Labels, number]>
+    ) {}
+
+    render(lines: string[]): void {
+        lines.push(`# HELP ${this.name} ${this.help}`);
+        lines.push(`# TYPE ${this.name} ${this.type}`);
+        for (const [labels, value] of this.collect()) {
+            const rendered = renderLabels(labels);
+            lines.push(`${this.name}${rendered ? `{${rendered}}` : ''} ${value}`);
+        }
+    }
+}
+
+function renderLabels(labels: Labels): string {
+    let rendered = '';
+    for (const name in labels) {
+        const value = String(labels[name]).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+        rendered += `${rendered ? ',' : ''}${name}="${value}"`;
+    }
+    return rendered;
+}
+
+/** Every registered metric, rendered in registration order */
+const registry: Array<{ render(lines: string[]): void }> = [];
+
+/**
+ * Adds a metric to the registry rendered by renderMetrics()
+ * @param {T} metric - Metric to register
+ * @returns {T} The registered metric
+ */
+export function register<T extends { render(lines: string[]): void }>(metric: T): T {
+    registry.push(metric);
+    return metric;
+}
+
+/**
+ * Renders every registered metric in the Prometheus text format
+ * @returns {string} Metrics exposition
+ */
+export function renderMetrics(): string {
+    const lines: string[] = [];
+    for (const metric of registry) {
+        metric.render(lines);
+    }
+    return `${lines.join('\n')}\n`;
+}
+
+export const toolRequests = register(new CounterVec(
+    'pothole_tool_requests_total',
+    'Tool calls by tool, query kind and outcome'
+));
+
+export const toolDuration = register(new HistogramVec(
+    'pothole_tool_duration_seconds',
+    'Tool call latency by tool and query kind',
+    LATENCY_BUCKETS
+));
+
+export const toolResponseBytes = register(new HistogramVec(
+    'pothole_tool_response_bytes',
+    'Size of tool call results by tool and query kind',
+    SIZE_BUCKETS
+));
+
+export const supabaseDuration = register(new HistogramVec(
+    'pothole_supabase_request_duration_seconds',
+    'Supabase request latency by RPC or table',
+    LATENCY_BUCKETS
+));
+
+export const computeQueueWait = register(new HistogramVec(
+    'pothole_compute_queue_wait_seconds',
+    'Time compute tasks waited for a worker thread, by task',
+    LATENCY_BUCKETS
+));
+
+/** Event loop delay samples, from startEventLoopMonitor() on */
+let eventLoopDelay: IntervalHistogram | undefined;
+
+/**
+ * Starts sampling event loop delay for pothole_event_loop_lag_seconds.
+ * Samples accumulate from then on and scrapes never reset them, so every
+ * scraper reads the same cumulative values. Later calls do nothing.
+ */
+export function startEventLoopMonitor(): void {
+    if (!eventLoopDelay) {
+        eventLoopDelay = monitorEventLoopDelay({ resolution: 20 });
+        eventLoopDelay.enable();
+    }
+}
+
+register(new CollectedMetric(
+    'pothole_event_loop_lag_seconds',
+    'Event loop delay percentiles since the monitor started',
+    'gauge',
+    () => {
+        if (!eventLoopDelay) {
+            return [];
+        }
+        return [
+            [{ quantile: '0.5' }, eventLoopDelay.percentile(50) / 1e9],
+            [{ quantile: '0.99' }, eventLoopDelay.percentile(99) / 1e9],
+            [{ quantile: '1' }, eventLoopDelay.max / 1e9],
+        ];
+    }
+));
+
+register(new CollectedMetric(
+    'pothole_process_memory_bytes',
+    'Process memory usage by kind',
+    'gauge',
+    () => {
+        const usage = process.memoryUsage();
+        return [
+            [{ kind: 'rss' }, usage.rss],
+            [{ kind: 'heap_total' }, usage.heapTotal],
+            [{ kind: 'heap_used' }, usage.heapUsed],
+            [{ kind: 'external' }, usage.external],
+            [{ kind: 'array_buffers' }, usage.arrayBuffers],
+        ];
+    }
+));
@@ -0,0 +1,59 @@
+/** Severity scale ceiling; projections stop here */
+export const MAX_SEVERITY = 5;
+
+/** Time steps projections can be reported in */
+export type ProjectionStep = 'day' | 'week' | 'month';
+
+/** Length of each step in weeks; a month is the Gregorian average */
+export const STEP_WEEKS: { [step in ProjectionStep]: number } = {
+    day: 1 / 7,
+    week: 1,
+    month: 365.2425 / 12 / 7,
+};
+
+/**
+ * Projects severities for many hazards at once. Severity grows linearly
+ * until it reaches MAX_SEVERITY, so every point has the closed form
+ * min(MAX_SEVERITY, initial + rate * weeks) and needs no iteration. The
+ * result is one contiguous row-major matrix, rounded to one decimal.
+ * @param {Float64Array} initial - Current severity per hazard
+ * @param {Float64Array} weeklyRates - Severity gained per week, per hazard
+ * @param {number} stepWeeks - Length of one step in weeks
+ * @param {number} horizon - Number of steps to project
+ * @returns {Float64Array} Severity of hazard i after step t + 1 at index i * horizon + t
+ */
+export function projectSeverities(
+    initial: Float64Array,
+    weeklyRates: Float64Array,
+    stepWeeks: number,
+    horizon: number
+): Float64Array {
+    const count = initial.length;
+    const matrix = new Float64Array(count * horizon);
+    for (let i = 0; i < count; i++) {
+        const start = initial[i];
+        const perStep = weeklyRates[i] * stepWeeks;
+        const base = i * horizon;
+        for (let t = 0; t < horizon; t++) {
+            const severity = start + perStep * (t + 1);
+            matrix[base + t] = severity >= MAX_SEVERITY ? MAX_SEVERITY : Math.round(severity * 10) / 10;
+        }
+    }
+    return matrix;
+}
+
+/**
+ * Computes when each hazard reaches MAX_SEVERITY
+ * @param {Float64Array} initial - Current severity per hazard
+ * @param {Float64Array} weeklyRates - Severity gained per week, per hazard
+ * @param {number} stepWeeks - Length of one step in weeks
+ * @returns {Float64Array} Steps until MAX_SEVERITY per hazard; 0 if already there, Infinity if never
+ */
+export function stepsToMaxSeverity(initial: Float64Array, weeklyRates: Float64Array, stepWeeks: number): Float64Array {
+    const steps = new Float64Array(initial.length);
+    for (let i = 0; i < initial.length; i++) {
+        const remaining = MAX_SEVERITY - initial[i];
+        steps[i] = remaining <= 0 ? 0 : weeklyRates[i] > 0 ? remaining / (weeklyRates[i] * stepWeeks) : Infinity;
+    }
+    return steps;
+}
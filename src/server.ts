@@ -1,11 +1,14 @@
 import { Server } from '@modelcontextprotocol/sdk/server/index.js';
 import {
     CallToolRequestSchema,
+    CallToolResult,
     ErrorCode,
     ListToolsRequestSchema,
     McpError,
 } from '@modelcontextprotocol/sdk/types.js';
-import { createSupabaseClient } from './client.js';
+import type { HazardBackend } from './data/index.js';
+import { toolDuration, toolRequests, toolResponseBytes } from './metrics.js';
+import { abortable, isDeadlineExceeded, toolDeadlineMs, toolSignal } from './deadlines.js';
 import {
     queryHazardsToolDefinition,
     estimateRepairPlanToolDefinition,
@@ -15,21 +18,96 @@ import {
     handleProjectWorseningTool
 } from './tools/index.js';
 
+/** Query kinds advertised by query_hazards, the only values used as metric labels */
+const queryKinds = new Set<string>((queryHazardsToolDefinition.inputSchema.properties as any).kind.enum);
+
+function queryKindLabel(kind: unknown): string {
+    return typeof kind === 'string' && queryKinds.has(kind) ? kind : 'invalid';
+}
+
+/**
+ * Routes a tool call to its handler and records its metrics. The handler
+ * runs under a signal that aborts when the client cancels the call or
+ * disconnects, or when the tool's deadline passes; its upstream reads are
+ * abandoned and the call ends at once rather than when they finish.
+ * @param {HazardBackend} backend - Backend the tools read from
+ * @param {string} name - Tool name
+ * @param {any} args - Tool arguments
+ * @param {AbortSignal} [callSignal] - Cancellation signal of the MCP request
+ * @returns {Promise<CallToolResult>} Tool result
+ * @throws {McpError} If the tool is unknown or exceeds its deadline
+ */
+async function dispatchToolCall(backend: HazardBackend, name: string, args: any, callSignal?: AbortSignal): Promise<CallToolResult> {
+    let handler: (backend: HazardBackend, args: any, signal?: AbortSignal) => Promise<CallToolResult>;
+    switch (name) {
+        case 'query_hazards':
+            handler = handleQueryHazardsTool;
+            break;
+
+        case 'estimate_repair_plan':
+            handler = handleEstimateRepairPlanTool;
+            break;
+
+        case 'project_worsening':
+            handler = handleProjectWorseningTool;
+            break;
+
+        default:
+            throw new McpError(
+                ErrorCode.MethodNotFound,
+                `Unknown tool: ${name}`
+            );
+    }
+
+    const labels = { tool: name, kind: name === 'query_hazards' ? queryKindLabel(args?.kind) : '' };
+    const started = performance.now();
+    const signal = toolSignal(name, callSignal);
+    let outcome = 'error';
+    try {
+        let result: CallToolResult;
+        try {
+            result = await abortable(handler(backend, args, signal), signal);
+        } catch (error) {
+            if (!signal.aborted) {
+                throw error;
+            }
+            if (isDeadlineExceeded(signal)) {
+                outcome = 'timeout';
+                throw new McpError(ErrorCode.RequestTimeout, `${name} exceeded its ${toolDeadlineMs(name)} ms deadline`);
+            }
+            outcome = 'cancelled';
+            throw error;
+        }
+        outcome = result.isError ? 'tool_error' : 'ok';
+
+        let bytes = 0;
+        for (const item of result.content) {
+            if (item.type === 'text') {
+                bytes += Buffer.byteLength(item.text);
+            }
+        }
+        toolResponseBytes.labels(labels).observe(bytes);
+        return result;
+    } finally {
+        toolDuration.labels(labels).observe((performance.now() - started) / 1000);
+        toolRequests.inc({ ...labels, outcome });
+    }
+}
+
 /**
  * Main server class for Pothole Detection MCP integration
  * @class PotholeServer
  */
 export class PotholeServer {
-    private client: any;
+    private backend: HazardBackend;
     private server: Server;
 
     /**
      * Creates a new PotholeServer instance
-     * @param {string} supabaseUrl - Supabase project URL
-     * @param {string} supabaseKey - Supabase API key
+     * @param {HazardBackend} backend - Backend the tools read from
      */
-    constructor(supabaseUrl: string, supabaseKey: string) {
-        this.client = createSupabaseClient(supabaseUrl, supabaseKey);
+    constructor(backend: HazardBackend) {
+        this.backend = backend;
         this.server = new Server(
             {
                 name: 'pothole-detection',
@@ -57,25 +135,9 @@ export class PotholeServer {
         }));
 
         // Handle tool calls
-        this.server.setRequestHandler(CallToolRequestSchema, async (request) => {
+        this.server.setRequestHandler(CallToolRequestSchema, async (request, extra) => {
             const { name, arguments: args } = request.params;
-
-            switch (name) {
-                case 'query_hazards':
-                    return handleQueryHazardsTool(this.client, args);
-                
-                case 'estimate_repair_plan':
-                    return handleEstimateRepairPlanTool(this.client, args);
-
-                case 'project_worsening':
-                    return handleProjectWorseningTool(this.client, args);
-                
-                default:
-                    throw new McpError(
-                        ErrorCode.MethodNotFound,
-                        `Unknown tool: ${name}`
-                    );
-            }
+            return dispatchToolCall(this.backend, name, args, extra.signal);
         });
     }
 
@@ -103,12 +165,12 @@ export class PotholeServer {
 
 /**
  * Factory function for creating standalone server instances
- * Used by HTTP transport for session-based connections
- * @param {string} supabaseUrl - Supabase project URL
- * @param {string} supabaseKey - Supabase API key
+ * Used by HTTP transport for session-based connections; every instance
+ * shares the process-wide backend, and with it the pooled Supabase client
+ * @param {HazardBackend} backend - Backend the tools read from
  * @returns {Server} Configured MCP server instance
  */
-export function createStandaloneServer(supabaseUrl: string, supabaseKey: string): Server {
+export function createStandaloneServer(backend: HazardBackend): Server {
     const server = new Server(
         {
             name: "pothole-detection-discovery",
@@ -121,32 +183,14 @@ export function createStandaloneServer(supabaseUrl: string, supabaseKey: string)
         },
     );
 
-    const client = createSupabaseClient(supabaseUrl, supabaseKey);
-
     // Set up handlers
     server.setRequestHandler(ListToolsRequestSchema, async () => ({
         tools: [queryHazardsToolDefinition, estimateRepairPlanToolDefinition, projectWorseningToolDefinition],
     }));
 
-    server.setRequestHandler(CallToolRequestSchema, async (request) => {
+    server.setRequestHandler(CallToolRequestSchema, async (request, extra) => {
         const { name, arguments: args } = request.params;
-
-        switch (name) {
-            case 'query_hazards':
-                return handleQueryHazardsTool(client, args);
-            
-            case 'estimate_repair_plan':
-                return handleEstimateRepairPlanTool(client, args);
-
-            case 'project_worsening':
-                return handleProjectWorseningTool(client, args);
-            
-            default:
-                throw new McpError(
-                    ErrorCode.MethodNotFound,
-                    `Unknown tool: ${name}`
-                );
-        }
+        return dispatchToolCall(backend, name, args, extra.signal);
     });
 
     return server;
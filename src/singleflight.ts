@@ -0,0 +1,123 @@
+/**
+ * Single-flight counters exposed for monitoring
+ * @interface SingleFlightStats
+ */
+export interface SingleFlightStats {
+    /** Calls made through the group */
+    calls: number;
+    /** Calls that joined an identical call already in flight */
+    deduplicated: number;
+    /** Distinct calls currently in flight */
+    inflight: number;
+    /** Upstream calls aborted because every caller gave up on them */
+    cancelled: number;
+}
+
+/**
+ * A call in flight and the callers still waiting for it
+ * @interface Flight
+ */
+interface Flight {
+    promise: Promise<unknown>;
+    controller: AbortController;
+    /** Callers that can still use the result; Infinity once one cannot cancel */
+    holders: number;
+}
+
+/**
+ * Coalesces concurrent identical calls into one upstream call.
+ * While a call for a key is in flight, further calls for the same key get
+ * the same promise instead of starting their own. The key is forgotten as
+ * soon as the call settles, so results are never reused after the fact.
+ *
+ * Callers may pass an abort signal. A caller whose signal aborts stops
+ * waiting at once, but the shared call is only aborted, through the
+ * signal handed to fn, when every caller has given up; callers without a
+ * signal keep it running to the end.
+ * @class SingleFlight
+ */
+export class SingleFlight {
+    private inflight = new Map<string, Flight>();
+    private calls = 0;
+    private deduplicated = 0;
+    private cancelled = 0;
+
+    /**
+     * Runs fn for key, or joins the identical call already in flight
+     * @param {string} key - Identity of the call
+     * @param {(signal: AbortSignal) => Promise<T>} fn - Upstream call, aborted once no caller wants it
+     * @param {AbortSignal} [signal] - Aborts this caller's wait
+     * @returns {Promise<T>} Result shared by every caller of the key
+     */
+    do<T>(key: string, fn: (signal: AbortSignal) => Promise<T>, signal?: AbortSignal): Promise<T> {
+        this.calls++;
+        if (signal?.aborted) {
+            return Promise.reject(signal.reason);
+        }
+
+        let flight = this.inflight.get(key);
+        // An aborted call may still be winding down; later callers start afresh
+        if (flight && !flight.controller.signal.aborted) {
+            this.deduplicated++;
+        } else {
+            const controller = new AbortController();
+            const created: Flight = { promise: Promise.resolve(), controller, holders: 0 };
+            created.promise = fn(controller.signal).finally(() => {
+                if (this.inflight.get(key) === created) {
+                    this.inflight.delete(key);
+                }
+            });
+            // Callers handle the result; this keeps a call nobody waits for from going unhandled
+            created.promise.catch(() => {});
+            this.inflight.set(key, created);
+            flight = created;
+        }
+        return this.join(flight, signal) as Promise<T>;
+    }
+
+    /**
+     * Returns single-flight counters
+     * @returns {SingleFlightStats} Single-flight counters
+     */
+    stats(): SingleFlightStats {
+        return {
+            calls: this.calls,
+            deduplicated: this.deduplicated,
+            inflight: this.inflight.size,
+            cancelled: this.cancelled,
+        };
+    }
+
+    /**
+     * Waits for a flight on behalf of one caller
+     * @private
+     */
+    private join(flight: Flight, signal: AbortSignal | undefined): Promise<unknown> {
+        if (!signal) {
+            flight.holders = Infinity;
+            return flight.promise;
+        }
+
+        flight.holders++;
+        return new Promise((resolve, reject) => {
+            const onAbort = () => {
+                reject(signal.reason);
+                if (--flight.holders === 0) {
+                    this.cancelled++;
+                    flight.controller.abort(signal.reason);
+                }
+            };
+            signal.addEventListener('abort', onAbort, { once: true });
+            flight.promise.then(
+                (value) => {
+                    signal.removeEventListener('abort', onAbort);
+                    resolve(value);
+                },
+                (error) => {
+                    signal.removeEventListener('abort', onAbort);
+                    reject(error);
+                }
+            );
+        });
+    }
+}
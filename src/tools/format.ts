@@ -0,0 +1,23 @@
+/**
+ * JSON layout of tool results
+ */
+export type OutputFormat = 'compact' | 'pretty';
+
+let outputFormat: OutputFormat = 'compact';
+
+/**
+ * Sets the JSON layout used for every tool result
+ * @param {OutputFormat} format - Compact (default) or indented JSON
+ */
+export function setOutputFormat(format: OutputFormat): void {
+    outputFormat = format;
+}
+
+/**
+ * Serializes tool result data in the configured layout
+ * @param {unknown} data - Result data
+ * @returns {string} JSON text
+ */
+export function toJsonText(data: unknown): string {
+    return outputFormat === 'pretty' ? JSON.stringify(data, null, 2) : JSON.stringify(data);
+}
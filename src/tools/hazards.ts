@@ -1,5 +1,12 @@
 import { Tool, CallToolResult } from '@modelcontextprotocol/sdk/types.js';
-import { SupabaseClient } from '@supabase/supabase-js';
+import { TtlCache, CachePolicy, CacheStats } from '../cache.js';
+import { SingleFlight, SingleFlightStats } from '../singleflight.js';
+import { getHazardHotspots, getHazardLocations, MAX_HOTSPOT_RESOLUTION } from '../geo/index.js';
+import { AnalyticsRpc, CUBE_DIMENSIONS, getHazardBitmaps, getHazardCube, getHazardMirror, HazardBackend, HazardCube, HazardMirror } from '../data/index.js';
+import { toJsonText } from './format.js';
+import { MAX_SEVERITY, ProjectionStep, projectSeverities, STEP_WEEKS } from '../projection.js';
+import { getWeatherProvider } from '../weather/index.js';
+import { computeTasks, getComputePool, ProjectionTask } from '../workers/index.js';
 
 export const queryHazardsToolDefinition: Tool = {
     name: "query_hazards",
@@ -14,12 +21,72 @@ export const queryHazardsToolDefinition: Tool = {
                     "area_with_most_hazards",
                     "top_severe_in_area",
                     "counts_by_type",
-                    "open_vs_resolved"
+                    "open_vs_resolved",
+                    "radius",
+                    "hotspots",
+                    "rollup",
+                    "filter"
                 ]
             },
             area: {
                 type: "string",
                 description: "The area to query for, when applicable."
+            },
+            lat: {
+                type: "number",
+                description: "Latitude of the search center, for radius queries."
+            },
+            lng: {
+                type: "number",
+                description: "Longitude of the search center, for radius queries."
+            },
+            radius: {
+                type: "number",
+                description: "Search radius in meters, for radius queries. Defaults to 1000, at most 50000."
+            },
+            limit: {
+                type: "number",
+                description: "Maximum number of results, for radius queries (default 20), hotspot queries (default 10), rollup groups (default all) and filter queries (default 20; 0 only counts)."
+            },
+            order_by: {
+                type: "string",
+                description: "Ordering of results. Radius queries accept distance (default) or severity; filter queries accept id (default), severity or newest.",
+                enum: ["distance", "severity", "newest", "id"]
+            },
+            offset: {
+                type: "number",
+                description: "Matches to skip before the returned page, for filter queries."
+            },
+            resolution: {
+                type: "number",
+                description: "Grid resolution for hotspot queries, from 0 (whole world) to 20 (about 38 m cells). Each step halves the cell size. Defaults to 15."
+            },
+            bbox: {
+                type: "array",
+                items: { type: "number" },
+                minItems: 4,
+                maxItems: 4,
+                description: "Limits hotspot queries to cells intersecting [west, south, east, north], in degrees."
+            },
+            group_by: {
+                type: "array",
+                items: { type: "string", enum: ["type", "status", "severity", "area", "week"] },
+                description: "Dimensions a rollup query groups hazard counts by. Weeks start on Monday. Omit for a single total."
+            },
+            filters: {
+                type: "object",
+                description: "Conditions for rollup and filter queries. Any listed value matches within a field; every field must match.",
+                properties: {
+                    type: { type: "array", items: { type: "string" } },
+                    status: { type: "array", items: { type: "string" } },
+                    severity: { type: "array", items: { type: "number" } },
+                    min_severity: { type: "number", description: "Lowest severity to include, for filter queries." },
+                    area: { type: "array", items: { type: "string" } },
+                    week_from: { type: "string", description: "Earliest creation date (YYYY-MM-DD) for rollup queries; whole weeks are counted." },
+                    week_to: { type: "string", description: "Latest creation date (YYYY-MM-DD) for rollup queries; whole weeks are counted." },
+                    created_from: { type: "string", description: "Earliest creation time (ISO 8601) for filter queries." },
+                    created_to: { type: "string", description: "Latest creation time (ISO 8601) for filter queries." }
+                }
             }
         },
         required: ["kind"]
@@ -28,22 +95,26 @@ export const queryHazardsToolDefinition: Tool = {
 
 export const estimateRepairPlanToolDefinition: Tool = {
     name: "estimate_repair_plan",
-    description: "Estimates a repair plan for a given hazard.",
+    description: "Estimates a repair plan for a given hazard, or for many hazards at once with portfolio totals.",
     inputSchema: {
         type: "object",
         properties: {
             hazard_id: {
                 type: "number",
                 description: "The ID of the hazard to estimate the repair plan for."
+            },
+            hazard_ids: {
+                type: "array",
+                items: { type: "number" },
+                description: "IDs of several hazards to plan in one call. Takes precedence over hazard_id."
             }
-        },
-        required: ["hazard_id"]
+        }
     }
 };
 
 export const projectWorseningToolDefinition: Tool = {
     name: "project_worsening",
-    description: "Projects how a hazard will worsen over time.",
+    description: "Projects how a hazard will worsen over time. Given lat/lng instead of an ID, the nearest hazard is projected. Given hazard_ids or an area, many hazards are projected at once. The worsening rate depends on the current weather at each hazard.",
     inputSchema: {
         type: "object",
         properties: {
@@ -55,39 +126,383 @@ export const projectWorseningToolDefinition: Tool = {
                 type: "number",
                 description: "The latitude of the hazard."
             },
-            lon: {
+            lng: {
                 type: "number",
                 description: "The longitude of the hazard."
+            },
+            hazard_ids: {
+                type: "array",
+                items: { type: "number" },
+                description: "IDs of several hazards to project in one call."
+            },
+            area: {
+                type: "string",
+                description: "Projects every unresolved hazard in this area."
+            },
+            horizon: {
+                type: "number",
+                description: "Number of steps to project, for batch projections. Defaults to 12."
+            },
+            step: {
+                type: "string",
+                description: "Length of one projection step, for batch projections. Defaults to week.",
+                enum: ["day", "week", "month"]
+            },
+            format: {
+                type: "string",
+                description: "Batch output: a severity matrix with one row per hazard, or a summary of the steps until each hazard reaches severity 5.",
+                enum: ["matrix", "summary"]
             }
         }
     }
 };
 
-export async function handleQueryHazardsTool(supabase: SupabaseClient, args: any): Promise<CallToolResult> {
+/** Freshness policy per analytics kind; these aggregates change slowly */
+const analytics_cache_policy: { [kind: string]: CachePolicy } = {
+    "area_with_most_hazards": { ttlMs: 60_000, staleMs: 5 * 60_000 },
+    "top_severe_in_area": { ttlMs: 30_000, staleMs: 2 * 60_000 },
+    "counts_by_type": { ttlMs: 60_000, staleMs: 5 * 60_000 },
+    "open_vs_resolved": { ttlMs: 30_000, staleMs: 2 * 60_000 },
+};
+
+const analytics_cache = new TtlCache<any>(1000);
+
+/** Distinguishes cache entries of different backends */
+const backend_tags = new WeakMap<HazardBackend, number>();
+let next_backend_tag = 1;
+
+function backend_tag(backend: HazardBackend): number {
+    let tag = backend_tags.get(backend);
+    if (tag === undefined) {
+        tag = next_backend_tag++;
+        backend_tags.set(backend, tag);
+    }
+    return tag;
+}
+
+/** Shares one upstream call between concurrent identical RPCs and lookups */
+const upstream_calls = new SingleFlight();
+
+async function run_analytics_rpc(backend: HazardBackend, kind: AnalyticsRpc, area?: string, signal?: AbortSignal): Promise<any> {
+    const key = `${backend_tag(backend)}:rpc:${kind}:${kind === "top_severe_in_area" ? area ?? "" : ""}`;
+    const { data, error } = await upstream_calls.do(key, (shared) => backend.rpc(kind, area, shared), signal);
+
+    if (error) {
+        throw new Error(error.message);
+    }
+    return data;
+}
+
+/** Returns the hazard mirror when it is fresh enough to serve reads, starting it on first use */
+function fresh_mirror(backend: HazardBackend): HazardMirror | undefined {
+    const mirror = getHazardMirror(backend);
+    mirror.ready().catch((error) => console.error('Error loading hazard mirror:', error));
+    return mirror.isFresh() ? mirror : undefined;
+}
+
+async function fetch_hazard(backend: HazardBackend, hazard_id: any, signal?: AbortSignal) {
+    // Rows missing from a fresh mirror may be brand new, so they still go upstream
+    const mirrored = fresh_mirror(backend)?.get(hazard_id);
+    if (mirrored) {
+        return { data: mirrored, error: null };
+    }
+
+    const key = `${backend_tag(backend)}:hazard:${hazard_id}`;
+    return upstream_calls.do(key, (shared) => backend.hazard(hazard_id, shared), signal);
+}
+
+/**
+ * Returns how many upstream calls were shared with an identical call in flight
+ * @returns {SingleFlightStats} Single-flight counters
+ */
+export function getUpstreamCoalescingStats(): SingleFlightStats {
+    return upstream_calls.stats();
+}
+
+/**
+ * Returns hit/miss counters of the query_hazards result cache
+ * @returns {CacheStats} Cache counters
+ */
+export function getAnalyticsCacheStats(): CacheStats {
+    return analytics_cache.stats();
+}
+
+const max_radius_limit = 1000;
+
+/** Largest radius a radius query may cover, in meters */
+const max_radius_meters = 50_000;
+
+async function handle_radius_query(backend: HazardBackend, args: any, signal?: AbortSignal): Promise<CallToolResult> {
+    const { lat, lng, radius = 1000, limit = 20, order_by = "distance" } = args;
+
+    if (typeof lat !== "number" || typeof lng !== "number" || typeof radius !== "number" || !(radius > 0) || radius > max_radius_meters) {
+        return {
+            content: [{ type: "text", text: `Radius queries need numeric lat, lng and a positive radius of at most ${max_radius_meters} meters.` }],
+            isError: true
+        };
+    }
+
+    let result;
+    try {
+        result = await getHazardLocations(backend).withinRadius(
+            lat,
+            lng,
+            radius,
+            Math.min(max_radius_limit, Math.max(1, Math.floor(limit))),
+            order_by === "severity" ? "severity" : "distance",
+            signal
+        );
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error querying hazards: ${error.message}` }],
+            isError: true
+        };
+    }
+
+    const hazards = result.hazards.map((hazard) => ({
+        id: hazard.id,
+        lat: hazard.lat,
+        lng: hazard.lng,
+        severity: hazard.severity,
+        distance_m: Math.round(hazard.distance),
+    }));
+
+    return {
+        content: [{ type: "text", text: toJsonText({ total: result.total, hazards }) }],
+        isError: false
+    };
+}
+
+const max_hotspot_limit = 1000;
+
+async function handle_hotspots_query(backend: HazardBackend, args: any): Promise<CallToolResult> {
+    const { resolution = 15, limit = 10, bbox } = args;
+
+    if (!Number.isInteger(resolution) || resolution < 0 || resolution > MAX_HOTSPOT_RESOLUTION) {
+        return {
+            content: [{ type: "text", text: `Hotspot resolution must be an integer from 0 to ${MAX_HOTSPOT_RESOLUTION}.` }],
+            isError: true
+        };
+    }
+    if (bbox !== undefined && !(Array.isArray(bbox) && bbox.length === 4 && bbox.every((v: unknown) => typeof v === "number"))) {
+        return {
+            content: [{ type: "text", text: "bbox must be [west, south, east, north]." }],
+            isError: true
+        };
+    }
+
+    let hotspots;
+    try {
+        hotspots = await getHazardHotspots(backend).top(
+            resolution,
+            Math.min(max_hotspot_limit, Math.max(1, Math.floor(limit))),
+            bbox
+        );
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error querying hazards: ${error.message}` }],
+            isError: true
+        };
+    }
+
+    return {
+        content: [{ type: "text", text: toJsonText({ resolution, hotspots }) }],
+        isError: false
+    };
+}
+
+/** Value each query filter field takes */
+const filter_fields: { [field: string]: "strings" | "numbers" | "number" | "date" } = {
+    type: "strings",
+    status: "strings",
+    area: "strings",
+    severity: "numbers",
+    min_severity: "number",
+    week_from: "date",
+    week_to: "date",
+    created_from: "date",
+    created_to: "date",
+};
+
+/** Describes what is wrong with query filters, or returns undefined if they are usable */
+function filter_problem(filters: any): string | undefined {
+    if (filters === null || filters === undefined) {
+        return undefined;
+    }
+    if (typeof filters !== "object" || Array.isArray(filters)) {
+        return "filters must be an object.";
+    }
+    for (const field in filters) {
+        const value = filters[field];
+        if (value === undefined) {
+            continue;
+        }
+        switch (filter_fields[field]) {
+            case "strings":
+                if (!Array.isArray(value) || value.some((item: any) => typeof item !== "string")) {
+                    return `filters.${field} must be an array of strings.`;
+                }
+                break;
+            case "numbers":
+                if (!Array.isArray(value) || value.some((item: any) => typeof item !== "number")) {
+                    return `filters.${field} must be an array of numbers.`;
+                }
+                break;
+            case "number":
+                if (typeof value !== "number") {
+                    return `filters.${field} must be a number.`;
+                }
+                break;
+            case "date":
+                if (typeof value !== "string" || isNaN(Date.parse(value))) {
+                    return `filters.${field} must be an ISO 8601 date.`;
+                }
+                break;
+        }
+    }
+    return undefined;
+}
+
+/** Analytics kinds the cube answers in the shapes their RPCs return */
+const cube_answers: { [kind: string]: (cube: HazardCube) => any } = {
+    "counts_by_type": (cube) => cube.countsByType(),
+    "open_vs_resolved": (cube) => cube.openVsResolved(),
+};
+
+async function handle_rollup_query(backend: HazardBackend, args: any): Promise<CallToolResult> {
+    const { group_by = [], filters = {}, limit } = args;
+
+    if (!Array.isArray(group_by) || group_by.some((dimension: any) => !CUBE_DIMENSIONS.includes(dimension))) {
+        return {
+            content: [{ type: "text", text: `group_by must list dimensions from: ${CUBE_DIMENSIONS.join(", ")}.` }],
+            isError: true
+        };
+    }
+
+    const problem = filter_problem(filters);
+    if (problem) {
+        return {
+            content: [{ type: "text", text: problem }],
+            isError: true
+        };
+    }
+
+    try {
+        await getHazardMirror(backend).ready();
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error querying hazards: ${error.message}` }],
+            isError: true
+        };
+    }
+
+    const cube = getHazardCube(backend);
+    if (!cube.isComplete()) {
+        return {
+            content: [{ type: "text", text: "Rollups are unavailable: the hazards have more distinct types, statuses or areas than the cube can count." }],
+            isError: true
+        };
+    }
+
+    const { total, groups } = cube.rollup(Array.from(new Set(group_by)), filters ?? {});
+    const limited = typeof limit === "number" ? groups.slice(0, Math.max(1, Math.floor(limit))) : groups;
+    return {
+        content: [{ type: "text", text: toJsonText({ total, groups: limited }) }],
+        isError: false
+    };
+}
+
+const max_filter_limit = 1000;
+
+async function handle_filter_query(backend: HazardBackend, args: any): Promise<CallToolResult> {
+    const { filters = {}, order_by = "id", limit = 20, offset = 0 } = args;
+
+    if (!["id", "severity", "newest"].includes(order_by)) {
+        return {
+            content: [{ type: "text", text: "Filter queries order by id, severity or newest." }],
+            isError: true
+        };
+    }
+
+    const problem = filter_problem(filters);
+    if (problem) {
+        return {
+            content: [{ type: "text", text: problem }],
+            isError: true
+        };
+    }
+
+    const mirror = getHazardMirror(backend);
+    try {
+        await mirror.ready();
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error querying hazards: ${error.message}` }],
+            isError: true
+        };
+    }
+
+    const page_offset = Math.max(0, Math.floor(offset) || 0);
+    const { total, rows } = getHazardBitmaps(backend).query(
+        filters ?? {},
+        order_by,
+        page_offset,
+        Math.min(max_filter_limit, Math.max(0, Math.floor(limit) || 0))
+    );
+    const store = mirror.store;
+    const hazards = rows.map((row) => store.record(row));
+
+    return {
+        content: [{ type: "text", text: toJsonText({ total, offset: page_offset, hazards }) }],
+        isError: false
+    };
+}
+
+export async function handleQueryHazardsTool(backend: HazardBackend, args: any, signal?: AbortSignal): Promise<CallToolResult> {
     const { kind, area } = args;
-    let data, error;
-
-    switch (kind) {
-        case "area_with_most_hazards":
-            ({ data, error } = await supabase.rpc('area_with_most_hazards'));
-            break;
-        case "top_severe_in_area":
-            ({ data, error } = await supabase.rpc('top_severe_in_area', { area_name: area }));
-            break;
-        case "counts_by_type":
-            ({ data, error } = await supabase.rpc('counts_by_type'));
-            break;
-        case "open_vs_resolved":
-            ({ data, error } = await supabase.rpc('open_vs_resolved'));
-            break;
-        default:
+
+    if (kind === "radius") {
+        return handle_radius_query(backend, args, signal);
+    }
+
+    if (kind === "hotspots") {
+        return handle_hotspots_query(backend, args);
+    }
+
+    if (kind === "rollup") {
+        return handle_rollup_query(backend, args);
+    }
+
+    if (kind === "filter") {
+        return handle_filter_query(backend, args);
+    }
+
+    // Served from the cube while the mirror is fresh, skipping the RPC and its cache
+    const cube_answer = cube_answers[kind];
+    if (cube_answer && fresh_mirror(backend)) {
+        const cube = getHazardCube(backend);
+        if (cube.isComplete()) {
             return {
-                content: [{ type: "text", text: "Invalid query kind." }],
-                isError: true
+                content: [{ type: "text", text: toJsonText(cube_answer(cube)) }],
+                isError: false
             };
+        }
     }
 
-    if (error) {
+    const policy = analytics_cache_policy[kind];
+
+    if (!policy) {
+        return {
+            content: [{ type: "text", text: "Invalid query kind." }],
+            isError: true
+        };
+    }
+
+    let data;
+    try {
+        const key = `${backend_tag(backend)}:${kind}:${kind === "top_severe_in_area" ? area ?? "" : ""}`;
+        data = await analytics_cache.get(key, policy, (load_signal) => run_analytics_rpc(backend, kind as AnalyticsRpc, area, load_signal), signal);
+    } catch (error: any) {
         return {
             content: [{ type: "text", text: `Error querying hazards: ${error.message}` }],
             isError: true
@@ -95,7 +510,7 @@ export async function handleQueryHazardsTool(supabase: SupabaseClient, args: any
     }
 
     return {
-        content: [{ type: "text", text: JSON.stringify(data, null, 2) }],
+        content: [{ type: "text", text: toJsonText(data) }],
         isError: false
     };
 }
@@ -135,9 +550,113 @@ function build_plan(hazard: any) {
     return plan_details;
 }
 
-export async function handleEstimateRepairPlanTool(supabase: SupabaseClient, args: any): Promise<CallToolResult> {
-    const { hazard_id } = args;
-    const { data, error } = await supabase.from('hazards').select('*').eq('id', hazard_id).single();
+/** Number of IDs fetched per `.in('id', ...)` query in batch plans */
+const plan_batch_chunk = 200;
+/** Number of chunk queries in flight at once in batch plans */
+const plan_batch_concurrency = 4;
+
+async function fetch_hazards_by_ids(backend: HazardBackend, hazard_ids: any[], signal?: AbortSignal): Promise<Map<string, any>> {
+    const found = new Map<string, any>();
+    const mirror = fresh_mirror(backend);
+    const missing = mirror ? hazard_ids.filter((hazard_id) => {
+        const hazard = mirror.get(hazard_id);
+        if (hazard) {
+            found.set(String(hazard_id), hazard);
+        }
+        return !hazard;
+    }) : hazard_ids;
+
+    const chunks: any[][] = [];
+    for (let i = 0; i < missing.length; i += plan_batch_chunk) {
+        chunks.push(missing.slice(i, i + plan_batch_chunk));
+    }
+
+    let next = 0;
+    const run_worker = async () => {
+        while (next < chunks.length) {
+            const chunk = chunks[next++];
+            const { data, error } = await backend.hazards(chunk, signal);
+            if (error) {
+                throw new Error(error.message);
+            }
+            for (const hazard of data ?? []) {
+                found.set(String(hazard.id), hazard);
+            }
+        }
+    };
+
+    await Promise.all(Array.from({ length: Math.min(plan_batch_concurrency, chunks.length) }, run_worker));
+    return found;
+}
+
+async function handle_batch_repair_plan(backend: HazardBackend, hazard_ids: any[], signal?: AbortSignal): Promise<CallToolResult> {
+    const unique_ids = Array.from(new Set(hazard_ids));
+
+    let found;
+    try {
+        found = await fetch_hazards_by_ids(backend, unique_ids, signal);
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error fetching hazards: ${error.message}` }],
+            isError: true
+        };
+    }
+
+    const plans = [];
+    const totals = {
+        requested: unique_ids.length,
+        planned: 0,
+        failed: 0,
+        estimated_cost: 0,
+        by_severity: {} as { [severity: string]: number },
+        personnel: {} as { [role: string]: number },
+    };
+
+    for (const hazard_id of unique_ids) {
+        const hazard = found.get(String(hazard_id));
+        if (!hazard) {
+            plans.push({ hazard_id, error: "Hazard not found" });
+            totals.failed++;
+            continue;
+        }
+
+        const plan = build_plan(hazard);
+        if ("error" in plan) {
+            plans.push({ hazard_id, error: plan.error });
+            totals.failed++;
+            continue;
+        }
+
+        plans.push({ hazard_id, plan });
+        totals.planned++;
+        totals.estimated_cost += plan.estimated_cost;
+        totals.by_severity[hazard.severity] = (totals.by_severity[hazard.severity] || 0) + 1;
+        for (const role of plan.personnel) {
+            totals.personnel[role] = (totals.personnel[role] || 0) + 1;
+        }
+    }
+
+    return {
+        content: [{ type: "text", text: toJsonText({ plans, totals }) }],
+        isError: false
+    };
+}
+
+export async function handleEstimateRepairPlanTool(backend: HazardBackend, args: any, signal?: AbortSignal): Promise<CallToolResult> {
+    const { hazard_id, hazard_ids } = args;
+
+    if (Array.isArray(hazard_ids)) {
+        return handle_batch_repair_plan(backend, hazard_ids, signal);
+    }
+
+    if (hazard_id === undefined || hazard_id === null) {
+        return {
+            content: [{ type: "text", text: "Either hazard_id or hazard_ids must be provided." }],
+            isError: true
+        };
+    }
+
+    const { data, error } = await fetch_hazard(backend, hazard_id, signal);
 
     if (error || !data) {
         return {
@@ -148,7 +667,7 @@ export async function handleEstimateRepairPlanTool(supabase: SupabaseClient, arg
 
     const plan = build_plan(data);
     return {
-        content: [{ type: "text", text: JSON.stringify(plan, null, 2) }],
+        content: [{ type: "text", text: toJsonText(plan) }],
         isError: false
     };
 }
@@ -164,12 +683,158 @@ const weather_mult: { [key: string]: number } = {
     "mist": 1.3,
 };
 
-export async function handleProjectWorseningTool(supabase: SupabaseClient, args: any): Promise<CallToolResult> {
-    const { hazard_id, lat, lng } = args;
+/** Looks up the weather at each hazard and the weekly worsening it causes */
+async function weekly_rates(lats: ArrayLike<number>, lngs: ArrayLike<number>): Promise<{ weather: string[], rates: Float64Array }> {
+    const weather = await getWeatherProvider().conditions(lats, lngs, new Date());
+    const rates = Float64Array.from(weather, (condition) => prog_per_week * (weather_mult[condition] || 1.0));
+    return { weather, rates };
+}
+
+function coordinate(value: any): number {
+    return typeof value === "number" ? value : NaN;
+}
+
+/** Batches projecting fewer values run inline; handing them to a thread costs more than it saves */
+const min_offloaded_projection = 100_000;
+
+/** Runs a batch projection, on a compute thread when it is large */
+function run_projection(task: ProjectionTask, signal?: AbortSignal): Promise<Float64Array> {
+    const work = task.initial.length * (task.summary ? 1 : task.horizon);
+    return work < min_offloaded_projection
+        ? Promise.resolve(computeTasks.project(task))
+        : getComputePool().run("project", task, signal);
+}
+
+/** Most hazards a single batch projection covers */
+const max_batch_projection = 100_000;
+/** Most steps a batch projection may span */
+const max_projection_horizon = 1000;
+
+async function handle_batch_projection(backend: HazardBackend, args: any, signal?: AbortSignal): Promise<CallToolResult> {
+    const { hazard_ids, area, horizon = 12, step = "week", format = "matrix" } = args;
+
+    if (!(step in STEP_WEEKS) || !["matrix", "summary"].includes(format)) {
+        return {
+            content: [{ type: "text", text: "step must be day, week or month, and format matrix or summary." }],
+            isError: true
+        };
+    }
+    if (!Number.isInteger(horizon) || horizon < 1 || horizon > max_projection_horizon) {
+        return {
+            content: [{ type: "text", text: `horizon must be an integer from 1 to ${max_projection_horizon}.` }],
+            isError: true
+        };
+    }
+
+    const ids: any[] = [];
+    const severities: number[] = [];
+    const lats: number[] = [];
+    const lngs: number[] = [];
+    const missing: any[] = [];
+    try {
+        if (Array.isArray(hazard_ids)) {
+            const unique_ids = Array.from(new Set(hazard_ids)).slice(0, max_batch_projection);
+            const found = await fetch_hazards_by_ids(backend, unique_ids, signal);
+            for (const hazard_id of unique_ids) {
+                const hazard = found.get(String(hazard_id));
+                if (hazard) {
+                    ids.push(hazard.id);
+                    severities.push(hazard.severity);
+                    lats.push(coordinate(hazard.lat));
+                    lngs.push(coordinate(hazard.lng));
+                } else {
+                    missing.push(hazard_id);
+                }
+            }
+        } else {
+            const mirror = getHazardMirror(backend);
+            await mirror.ready();
+            const store = mirror.store;
+            const resolved = store.statuses.lookup("resolved");
+            const { rows } = getHazardBitmaps(backend).query({ area: [area] }, "id", 0, Infinity);
+            for (const row of rows) {
+                if (store.status[row] !== resolved && ids.length < max_batch_projection) {
+                    ids.push(store.ids[row]);
+                    severities.push(store.severity[row]);
+                    lats.push(store.lat[row]);
+                    lngs.push(store.lng[row]);
+                }
+            }
+        }
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error fetching hazards: ${error.message}` }],
+            isError: true
+        };
+    }
+
+    let weather: string[];
+    let rates: Float64Array;
+    try {
+        ({ weather, rates } = await weekly_rates(lats, lngs));
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error fetching weather: ${error.message}` }],
+            isError: true
+        };
+    }
+    const summary = format === "summary";
+    let values: Float64Array;
+    try {
+        values = await run_projection({
+            initial: Float64Array.from(severities),
+            weeklyRates: rates,
+            stepWeeks: STEP_WEEKS[step as ProjectionStep],
+            horizon,
+            summary,
+        }, signal);
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error projecting hazards: ${error.message}` }],
+            isError: true
+        };
+    }
+
+    if (summary) {
+        const result = {
+            weather,
+            step,
+            hazard_ids: ids,
+            initial_severity: severities,
+            // null when a hazard never gets there
+            [`${step}s_to_severity_${MAX_SEVERITY}`]: Array.from(values, (value) => (isFinite(value) ? Math.round(value * 10) / 10 : null)),
+            missing,
+        };
+        return {
+            content: [{ type: "text", text: toJsonText(result) }],
+            isError: false
+        };
+    }
+
+    const rows: number[][] = [];
+    for (let i = 0; i < ids.length; i++) {
+        rows.push(Array.from(values.subarray(i * horizon, (i + 1) * horizon)));
+    }
+    return {
+        content: [{ type: "text", text: toJsonText({ weather, step, horizon, hazard_ids: ids, initial_severity: severities, severity: rows, missing }) }],
+        isError: false
+    };
+}
+
+export async function handleProjectWorseningTool(backend: HazardBackend, args: any, signal?: AbortSignal): Promise<CallToolResult> {
+    const { hazard_id, lat, hazard_ids, area } = args;
+
+    if (Array.isArray(hazard_ids) || typeof area === "string") {
+        return handle_batch_projection(backend, args, signal);
+    }
+
+    // Older clients were advertised `lon`
+    const lng = args.lng ?? args.lon;
     let hazard;
+    let resolved: { hazard_id: any, distance_m: number } | undefined;
 
     if (hazard_id) {
-        const { data, error } = await supabase.from('hazards').select('*').eq('id', hazard_id).single();
+        const { data, error } = await fetch_hazard(backend, hazard_id, signal);
         if (error || !data) {
             return {
                 content: [{ type: "text", text: `Error fetching hazard: ${error?.message || 'Hazard not found'}` }],
@@ -177,37 +842,49 @@ export async function handleProjectWorseningTool(supabase: SupabaseClient, args:
             };
         }
         hazard = data;
-    } else if (lat && lng) {
-        // This is a simplified example. A real implementation would use PostGIS for spatial queries.
-        const { data, error } = await supabase.from('hazards').select('*').order('id', { ascending: false }).limit(1).single();
-        if (error || !data) {
+    } else if (typeof lat === "number" && typeof lng === "number") {
+        let nearest;
+        try {
+            nearest = await getHazardLocations(backend).nearest(lat, lng, signal);
+        } catch (error: any) {
             return {
-                content: [{ type: "text", text: `Error fetching hazard: ${error?.message || 'Hazard not found'}` }],
+                content: [{ type: "text", text: `Error fetching hazard: ${error.message}` }],
                 isError: true
             };
         }
-        hazard = data;
+        if (!nearest) {
+            return {
+                content: [{ type: "text", text: "Error fetching hazard: Hazard not found" }],
+                isError: true
+            };
+        }
+        hazard = nearest;
+        resolved = { hazard_id: nearest.id, distance_m: Math.round(nearest.distance) };
     } else {
         return {
-            content: [{ type: "text", text: "Either hazard_id or lat/lon must be provided." }],
+            content: [{ type: "text", text: "Either hazard_id or lat/lng must be provided." }],
             isError: true
         };
     }
 
-    // Placeholder for weather API call
-    const weather_condition = "rain";
-    const multiplier = weather_mult[weather_condition] || 1.0;
-    const weekly_progression = prog_per_week * multiplier;
+    let rates: Float64Array;
+    try {
+        ({ rates } = await weekly_rates([coordinate(hazard.lat)], [coordinate(hazard.lng)]));
+    } catch (error: any) {
+        return {
+            content: [{ type: "text", text: `Error fetching weather: ${error.message}` }],
+            isError: true
+        };
+    }
+    const weeks = projectSeverities(Float64Array.of(hazard.severity), rates, STEP_WEEKS.week, 12);
 
     const projections: { [key: string]: number } = {};
-    let current_severity = hazard.severity;
     for (let i = 1; i <= 12; i++) {
-        current_severity += weekly_progression;
-        projections[`week_${i}`] = Math.min(5, Math.round(current_severity * 10) / 10);
+        projections[`week_${i}`] = weeks[i - 1];
     }
 
     return {
-        content: [{ type: "text", text: JSON.stringify(projections, null, 2) }],
+        content: [{ type: "text", text: toJsonText(resolved ? { ...resolved, ...projections } : projections) }],
         isError: false
     };
-}
\ No newline at end of file
+}
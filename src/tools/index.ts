@@ -4,5 +4,9 @@ export * from './hazards.js';export {
     projectWorseningToolDefinition,
     handleQueryHazardsTool,
     handleEstimateRepairPlanTool,
-    handleProjectWorseningTool
-} from './hazards.js';
\ No newline at end of file
+    handleProjectWorseningTool,
+    getAnalyticsCacheStats,
+    getUpstreamCoalescingStats
+} from './hazards.js';
+export { setOutputFormat } from './format.js';
+export type { OutputFormat } from './format.js';
\ No newline at end of file
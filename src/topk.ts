@@ -0,0 +1,59 @@
+/**
+ * Selects the best `limit` of `count` items without sorting all of them.
+ * Items are identified by index; a bounded binary heap keeps the worst kept
+ * item at its root, so each candidate costs at most O(log limit).
+ * @param {number} count - Number of items, identified as 0..count-1
+ * @param {number} limit - Maximum number of items to return
+ * @param {(a: number, b: number) => number} compare - Negative when item a ranks before item b
+ * @returns {number[]} Indices of the selected items, best first
+ */
+export function selectTop(count: number, limit: number, compare: (a: number, b: number) => number): number[] {
+    const size = Math.min(count, Math.max(0, limit));
+    const heap: number[] = [];
+    if (size === 0) {
+        return heap;
+    }
+
+    // Root holds the item that ranks last among those kept
+    const worse = (a: number, b: number) => compare(heap[a], heap[b]) > 0;
+    const siftUp = (i: number) => {
+        while (i > 0) {
+            const parent = (i - 1) >> 1;
+            if (!worse(i, parent)) {
+                break;
+            }
+            [heap[i], heap[parent]] = [heap[parent], heap[i]];
+            i = parent;
+        }
+    };
+    const siftDown = (i: number) => {
+        for (;;) {
+            const left = 2 * i + 1;
+            const right = left + 1;
+            let largest = i;
+            if (left < heap.length && worse(left, largest)) {
+                largest = left;
+            }
+            if (right < heap.length && worse(right, largest)) {
+                largest = right;
+            }
+            if (largest === i) {
+                break;
+            }
+            [heap[i], heap[largest]] = [heap[largest], heap[i]];
+            i = largest;
+        }
+    };
+
+    for (let item = 0; item < count; item++) {
+        if (heap.length < size) {
+            heap.push(item);
+            siftUp(heap.length - 1);
+        } else if (compare(item, heap[0]) < 0) {
+            heap[0] = item;
+            siftDown(0);
+        }
+    }
+
+    return heap.sort(compare);
+}
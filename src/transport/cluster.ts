@@ -0,0 +1,315 @@
+import cluster, { Worker } from 'cluster';
+import { Agent, createServer, IncomingHttpHeaders, IncomingMessage, request, ServerResponse } from 'http';
+import { Config } from '../config.js';
+import { startHttpTransport } from './http.js';
+
+/** Delay before a crashed worker is replaced */
+const RESPAWN_DELAY_MS = 1000;
+
+/** Time a worker has to answer a metrics scrape before it is left out */
+const WORKER_METRICS_TIMEOUT_MS = 2000;
+
+/** Headers that describe one connection and must not be passed across the proxy */
+const HOP_BY_HOP_HEADERS = new Set([
+    'connection',
+    'keep-alive',
+    'proxy-connection',
+    'proxy-authenticate',
+    'proxy-authorization',
+    'te',
+    'trailer',
+    'transfer-encoding',
+    'upgrade',
+]);
+
+/**
+ * A worker process and the internal port it serves on
+ * @interface WorkerSlot
+ */
+interface WorkerSlot {
+    worker: Worker;
+    /** Loopback port, known once the worker reports it is listening */
+    port?: number;
+}
+
+/**
+ * Starts the HTTP transport across several processes.
+ * In the primary process this forks config.workers workers and runs a thin
+ * reverse proxy on the public port. Each worker runs the regular HTTP
+ * transport on a private loopback port and prefixes the session IDs it
+ * issues with its index, so the proxy routes every request that carries an
+ * `mcp-session-id` to the worker holding that session. Requests without a
+ * session (new sessions, stateless mode) are spread round-robin. In a
+ * worker process this simply starts the HTTP transport.
+ * @param {Config} config - Server configuration
+ */
+export function startClusterTransport(config: Config): void {
+    if (!cluster.isPrimary) {
+        startHttpTransport({ ...config, workerId: parseInt(process.env.POTHOLE_WORKER_ID ?? '0', 10) });
+        return;
+    }
+
+    const slots: WorkerSlot[] = [];
+    let shuttingDown = false;
+    // Workers measure recorded request offsets from the same moment
+    const recordOrigin = String(Date.now());
+
+    const spawnWorker = (workerId: number) => {
+        const worker = cluster.fork({ POTHOLE_WORKER_ID: String(workerId), POTHOLE_RECORD_ORIGIN: recordOrigin });
+        slots[workerId] = { worker };
+        worker.on('message', (message: any) => {
+            if (message?.type === 'listening' && slots[workerId]?.worker === worker) {
+                slots[workerId].port = message.port;
+            }
+        });
+    };
+
+    for (let workerId = 0; workerId < config.workers; workerId++) {
+        spawnWorker(workerId);
+    }
+
+    cluster.on('exit', (worker, code, signal) => {
+        const workerId = slots.findIndex((slot) => slot?.worker === worker);
+        if (workerId < 0 || shuttingDown) {
+            return;
+        }
+        console.error(`Pothole Detection worker ${workerId} exited (${signal ?? code}); its sessions are lost`);
+        slots[workerId].port = undefined;
+        setTimeout(() => spawnWorker(workerId), RESPAWN_DELAY_MS);
+    });
+
+    const shutdown = () => {
+        shuttingDown = true;
+        for (const slot of slots) {
+            slot?.worker.kill();
+        }
+        process.exit(0);
+    };
+    process.on('SIGINT', shutdown);
+    process.on('SIGTERM', shutdown);
+
+    const agent = new Agent({ keepAlive: true });
+    let nextWorker = 0;
+
+    const pickWorker = (): WorkerSlot | undefined => {
+        for (let attempt = 0; attempt < slots.length; attempt++) {
+            const slot = slots[nextWorker];
+            nextWorker = (nextWorker + 1) % slots.length;
+            if (slot?.port) {
+                return slot;
+            }
+        }
+        return undefined;
+    };
+
+    const proxy = createServer((req, res) => {
+        const url = new URL(req.url!, `http://${req.headers.host}`);
+
+        if (url.pathname === '/health') {
+            handleClusterHealth(res, slots);
+            return;
+        }
+
+        if (url.pathname === '/metrics') {
+            handleClusterMetrics(res, slots).catch((error) => {
+                console.error('Error collecting worker metrics:', error);
+                if (!res.headersSent) {
+                    res.writeHead(502, { 'Content-Type': 'text/plain' });
+                }
+                res.end();
+            });
+            return;
+        }
+
+        const sessionId = req.headers['mcp-session-id'] as string | undefined;
+        if (sessionId) {
+            const owner = slots[parseInt(sessionId.split('.', 1)[0], 10)];
+            if (!owner?.port) {
+                res.statusCode = 404;
+                res.end('Session not found');
+                return;
+            }
+            forwardRequest(req, res, owner.port, agent);
+            return;
+        }
+
+        const slot = pickWorker();
+        if (!slot?.port) {
+            res.writeHead(503, { 'Content-Type': 'text/plain', 'Retry-After': '1' });
+            res.end('No workers available');
+            return;
+        }
+        forwardRequest(req, res, slot.port, agent);
+    });
+
+    const host = config.isProduction ? '0.0.0.0' : 'localhost';
+
+    proxy.listen(config.port, host, () => {
+        console.log(`Pothole Detection MCP Server listening on port ${config.port} with ${config.workers} workers`);
+    });
+}
+
+/**
+ * Streams a request to a worker and its response back to the client.
+ * Bodies are piped in both directions, so SSE streams pass through as
+ * they are written.
+ * @param {IncomingMessage} req - Client request
+ * @param {ServerResponse} res - Client response
+ * @param {number} port - Worker's loopback port
+ * @param {Agent} agent - Keep-alive agent for worker connections
+ * @private
+ */
+function forwardRequest(req: IncomingMessage, res: ServerResponse, port: number, agent: Agent): void {
+    const upstream = request({
+        host: '127.0.0.1',
+        port,
+        method: req.method,
+        path: req.url,
+        headers: endToEndHeaders(req.headers),
+        agent,
+    }, (upstreamRes) => {
+        res.writeHead(upstreamRes.statusCode ?? 502, endToEndHeaders(upstreamRes.headers));
+        res.flushHeaders();
+        upstreamRes.pipe(res);
+    });
+
+    upstream.on('error', (error) => {
+        console.error('Error forwarding request to worker:', error.message);
+        if (!res.headersSent) {
+            res.writeHead(502, { 'Content-Type': 'text/plain' });
+        }
+        res.end();
+    });
+
+    // A client that goes away mid-stream releases the worker's side as well
+    res.on('close', () => {
+        if (!res.writableFinished) {
+            upstream.destroy();
+        }
+    });
+
+    req.pipe(upstream);
+}
+
+/**
+ * Drops the hop-by-hop headers, including any the Connection header names,
+ * so each side of the proxy frames and keeps alive its own connection
+ * @param {IncomingHttpHeaders} headers - Headers as received on one side
+ * @returns {IncomingHttpHeaders} The headers to send on the other side
+ * @private
+ */
+function endToEndHeaders(headers: IncomingHttpHeaders): IncomingHttpHeaders {
+    const dropped = new Set(HOP_BY_HOP_HEADERS);
+    for (const name of String(headers.connection ?? '').split(',')) {
+        dropped.add(name.trim().toLowerCase());
+    }
+    const forwarded: IncomingHttpHeaders = {};
+    for (const [name, value] of Object.entries(headers)) {
+        if (!dropped.has(name)) {
+            forwarded[name] = value;
+        }
+    }
+    return forwarded;
+}
+
+/**
+ * Reports which workers are up
+ * @param {ServerResponse} res - HTTP response
+ * @param {WorkerSlot[]} slots - Worker slots
+ * @private
+ */
+function handleClusterHealth(res: ServerResponse, slots: WorkerSlot[]): void {
+    const workers = slots.map((slot, workerId) => ({
+        workerId,
+        pid: slot?.worker.process.pid,
+        ready: Boolean(slot?.port),
+    }));
+    const ready = workers.filter((worker) => worker.ready).length;
+
+    res.writeHead(ready > 0 ? 200 : 503, { 'Content-Type': 'application/json' });
+    res.end(JSON.stringify({
+        status: ready === workers.length ? 'healthy' : ready > 0 ? 'degraded' : 'unavailable',
+        timestamp: new Date().toISOString(),
+        workers
+    }));
+}
+
+/**
+ * Merges every worker's metrics into one exposition, adding a worker label
+ * to each sample and keeping each metric family's samples together.
+ * Workers that fail or do not answer in time are left out of the scrape.
+ * @param {ServerResponse} res - HTTP response
+ * @param {WorkerSlot[]} slots - Worker slots
+ * @returns {Promise<void>}
+ * @private
+ */
+async function handleClusterMetrics(res: ServerResponse, slots: WorkerSlot[]): Promise<void> {
+    const families = new Map<string, { header: string[]; samples: string[] }>();
+
+    await Promise.all(slots.map(async (slot, workerId) => {
+        if (!slot?.port) {
+            return;
+        }
+        let text: string;
+        try {
+            const response = await fetch(`http://127.0.0.1:${slot.port}/metrics`, {
+                signal: AbortSignal.timeout(WORKER_METRICS_TIMEOUT_MS)
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            text = await response.text();
+        } catch (error) {
+            console.error(`Skipping metrics of worker ${workerId}:`, error);
+            return;
+        }
+
+        let family: { header: string[]; samples: string[] } | undefined;
+        for (const line of text.split('\n')) {
+            if (!line) {
+                continue;
+            }
+            if (line.startsWith('# HELP ') || line.startsWith('# TYPE ')) {
+                const name = line.split(' ', 3)[2];
+                family = families.get(name);
+                if (!family) {
+                    family = { header: [], samples: [] };
+                    families.set(name, family);
+                }
+                if (family.header.length < 2 && !family.header.includes(line)) {
+                    family.header.push(line);
+                }
+                continue;
+            }
+            family?.samples.push(addWorkerLabel(line, workerId));
+        }
+    }));
+
+    const lines: string[] = [];
+    for (const family of families.values()) {
+        lines.push(...family.header, ...family.samples);
+    }
+
+    res.writeHead(200, { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8' });
+    res.end(`${lines.join('\n')}\n`);
+}
+
+/**
+ * Adds a worker label to one sample line of the text exposition format
+ * @param {string} line - Sample as `name{labels} value` or `name value`
+ * @param {number} workerId - Worker index
+ * @returns {string} The sample with the worker label first
+ * @private
+ */
+function addWorkerLabel(line: string, workerId: number): string {
+    const space = line.indexOf(' ');
+    const brace = line.indexOf('{');
+    const worker = `worker="${workerId}"`;
+    if (brace < 0 || brace > space) {
+        return `${line.slice(0, space)}{${worker}}${line.slice(space)}`;
+    }
+    // Label values are quoted, so the set ends at the last brace before the value
+    const close = line.lastIndexOf('}');
+    const labels = line.slice(brace + 1, close);
+    return `${line.slice(0, brace)}{${labels ? `${worker},${labels}` : worker}}${line.slice(close + 1)}`;
+}
@@ -0,0 +1,232 @@
+import { IncomingMessage, OutgoingHttpHeaders, ServerResponse } from 'http';
+import { Transform } from 'stream';
+import { constants, createBrotliCompress, createGzip } from 'zlib';
+
+/** Default minimum response size, in bytes, before compression is applied */
+export const DEFAULT_COMPRESSION_THRESHOLD = 1024;
+
+type Encoding = 'br' | 'gzip';
+
+/**
+ * Picks the preferred encoding the client accepts
+ * @param {string | undefined} header - Accept-Encoding header value
+ * @returns {Encoding | undefined} Negotiated encoding, or undefined for identity
+ */
+export function negotiateEncoding(header: string | undefined): Encoding | undefined {
+    if (!header) {
+        return undefined;
+    }
+
+    const accepted = new Map<string, number>();
+    for (const part of header.split(',')) {
+        const [name, ...params] = part.trim().toLowerCase().split(';');
+        const q = params.map((param) => param.trim()).find((param) => param.startsWith('q='));
+        accepted.set(name, q ? parseFloat(q.slice(2)) : 1);
+    }
+
+    const quality = (encoding: string) => accepted.get(encoding) ?? accepted.get('*') ?? 0;
+    if (quality('br') > 0 && quality('br') >= quality('gzip')) {
+        return 'br';
+    }
+    if (quality('gzip') > 0) {
+        return 'gzip';
+    }
+    return undefined;
+}
+
+function createCompressor(encoding: Encoding): Transform {
+    return encoding === 'br'
+        ? createBrotliCompress({
+            params: {
+                // Favour latency: responses are small JSON documents and events
+                [constants.BROTLI_PARAM_QUALITY]: 4,
+                [constants.BROTLI_PARAM_MODE]: constants.BROTLI_MODE_TEXT,
+            },
+        })
+        : createGzip({ level: 6 });
+}
+
+/**
+ * Compresses a response with the encoding negotiated from Accept-Encoding.
+ * The response's write methods are wrapped so callers such as the MCP
+ * transport stay unaware of it. Ordinary responses are buffered until they
+ * reach the threshold; smaller ones go out uncompressed. Event streams
+ * cannot be sized up front, so they are compressed from the first byte and
+ * flushed after every write, keeping each event deliverable immediately.
+ * Compressed output pauses while the socket is backed up. Every response
+ * passed in carries Vary: Accept-Encoding, compressed or not.
+ * @param {IncomingMessage} req - HTTP request
+ * @param {ServerResponse} res - HTTP response to wrap
+ * @param {number} threshold - Minimum size in bytes worth compressing
+ */
+export function compressResponse(req: IncomingMessage, res: ServerResponse, threshold: number): void {
+    // The body depends on Accept-Encoding whether or not this one ends up compressed
+    res.setHeader('Vary', 'Accept-Encoding');
+    const encoding = negotiateEncoding(req.headers['accept-encoding'] as string | undefined);
+    if (!encoding || req.method === 'HEAD') {
+        return;
+    }
+
+    const writeHead = res.writeHead.bind(res) as (...args: any[]) => ServerResponse;
+    const write = res.write.bind(res) as (...args: any[]) => boolean;
+    const end = res.end.bind(res) as (...args: any[]) => ServerResponse;
+    const flushHeaders = res.flushHeaders.bind(res);
+
+    let head: any[] | undefined;
+    let mode: 'pending' | 'identity' | 'compressed' = 'pending';
+    let streaming = false;
+    let compressor: Transform | undefined;
+    let buffered: Buffer[] = [];
+    let bufferedBytes = 0;
+
+    const headerValue = (name: string): unknown => {
+        const headers = head?.find((arg, index) => index > 0 && arg && typeof arg === 'object') as OutgoingHttpHeaders | undefined;
+        for (const key in headers ?? {}) {
+            if (key.toLowerCase() === name) {
+                return headers![key];
+            }
+        }
+        return res.getHeader(name);
+    };
+
+    const isEventStream = () => String(headerValue('content-type') ?? '').includes('text/event-stream');
+
+    const commitHead = (compressed: boolean) => {
+        if (compressed) {
+            res.setHeader('Content-Encoding', encoding);
+            res.removeHeader('Content-Length');
+        }
+        if (!head) {
+            return;
+        }
+        const args = head.map((arg, index) => {
+            if (!compressed || index === 0 || !arg || typeof arg !== 'object') {
+                return arg;
+            }
+            const headers: OutgoingHttpHeaders = {};
+            for (const key in arg) {
+                if (key.toLowerCase() !== 'content-length') {
+                    headers[key] = arg[key];
+                }
+            }
+            return headers;
+        });
+        head = undefined;
+        writeHead(...args);
+    };
+
+    const startCompression = () => {
+        mode = 'compressed';
+        commitHead(true);
+        compressor = createCompressor(encoding);
+        compressor.on('data', (chunk: Buffer) => {
+            // Hold the compressed output while the socket is backed up
+            if (!write(chunk)) {
+                compressor!.pause();
+                res.once('drain', () => compressor!.resume());
+            }
+        });
+        compressor.on('end', () => end());
+        compressor.on('error', (error) => {
+            console.error('Response compression error:', error);
+            res.destroy(error);
+        });
+        for (const chunk of buffered) {
+            compressor.write(chunk);
+        }
+        buffered = [];
+    };
+
+    const toBuffer = (chunk: any, chunkEncoding?: BufferEncoding): Buffer =>
+        Buffer.isBuffer(chunk) ? chunk : Buffer.from(chunk, typeof chunkEncoding === 'string' ? chunkEncoding : 'utf8');
+
+    res.writeHead = ((...args: any[]) => {
+        // Node's own write/end send an implicit head through here once the
+        // mode is settled; only the caller's explicit head is held back
+        if (mode !== 'pending') {
+            return writeHead(...args);
+        }
+        head = args;
+        return res;
+    }) as typeof res.writeHead;
+
+    res.flushHeaders = () => {
+        if (mode === 'pending') {
+            if (isEventStream()) {
+                streaming = true;
+                startCompression();
+            } else {
+                mode = 'identity';
+                commitHead(false);
+            }
+        }
+        flushHeaders();
+    };
+
+    res.write = ((chunk: any, chunkEncoding?: any, callback?: any) => {
+        if (typeof chunkEncoding === 'function') {
+            callback = chunkEncoding;
+            chunkEncoding = undefined;
+        }
+
+        if (mode === 'pending') {
+            if (isEventStream()) {
+                streaming = true;
+                startCompression();
+            } else {
+                buffered.push(toBuffer(chunk, chunkEncoding));
+                bufferedBytes += buffered[buffered.length - 1].length;
+                if (bufferedBytes >= threshold) {
+                    startCompression();
+                }
+                callback?.();
+                return true;
+            }
+        }
+
+        if (mode === 'identity') {
+            return write(chunk, chunkEncoding, callback);
+        }
+
+        const accepted = compressor!.write(toBuffer(chunk, chunkEncoding), callback);
+        if (streaming) {
+            compressor!.flush();
+        }
+        return accepted;
+    }) as typeof res.write;
+
+    res.end = ((chunk?: any, chunkEncoding?: any, callback?: any) => {
+        if (typeof chunk === 'function') {
+            callback = chunk;
+            chunk = undefined;
+        } else if (typeof chunkEncoding === 'function') {
+            callback = chunkEncoding;
+            chunkEncoding = undefined;
+        }
+        if (callback) {
+            res.once('finish', callback);
+        }
+
+        const last = chunk === undefined || chunk === null ? undefined : toBuffer(chunk, chunkEncoding);
+
+        if (mode === 'pending') {
+            const total = bufferedBytes + (last?.length ?? 0);
+            if (total < threshold && !isEventStream()) {
+                mode = 'identity';
+                commitHead(false);
+                const body = last ? [...buffered, last] : buffered;
+                buffered = [];
+                return end(body.length ? Buffer.concat(body) : undefined);
+            }
+            streaming = isEventStream();
+            startCompression();
+        }
+
+        if (mode === 'identity') {
+            return end(last);
+        }
+
+        compressor!.end(last);
+        return res;
+    }) as typeof res.end;
+}
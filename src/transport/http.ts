@@ -1,11 +1,107 @@
 import { createServer, IncomingMessage, ServerResponse } from 'http';
 import { StreamableHTTPServerTransport } from '@modelcontextprotocol/sdk/server/streamableHttp.js';
+import { Server } from '@modelcontextprotocol/sdk/server/index.js';
 import { randomUUID } from 'crypto';
 import { createStandaloneServer } from '../server.js';
 import { Config } from '../config.js';
+import { getClientPoolStats } from '../client.js';
+import { SessionStore } from './sessions.js';
+import { compressResponse } from './compression.js';
+import { readJsonBody, TrafficRecorder } from './recorder.js';
+import { getAnalyticsCacheStats, getUpstreamCoalescingStats } from '../tools/index.js';
+import { CollectedMetric, Labels, register, renderMetrics, startEventLoopMonitor } from '../metrics.js';
+import { getHazardBackend, getHazardMirrorStats } from '../data/index.js';
+import { getWeatherCacheStats } from '../weather/index.js';
+import { getComputePoolStats } from '../workers/index.js';
+import { withRequestSignal } from '../deadlines.js';
 
 /** Session storage for streamable HTTP connections */
-const sessions = new Map<string, { transport: StreamableHTTPServerTransport; server: any }>();
+const sessions = new SessionStore();
+
+register(new CollectedMetric('pothole_sessions', 'HTTP sessions by state', 'gauge', () => {
+    const stats = sessions.stats();
+    return [[{ state: 'live' }, stats.live], [{ state: 'pending' }, stats.pending]];
+}));
+
+register(new CollectedMetric('pothole_sessions_closed_total', 'HTTP sessions evicted or refused', 'counter', () => {
+    const stats = sessions.stats();
+    return [
+        [{ reason: 'idle' }, stats.evictedIdle],
+        [{ reason: 'lru' }, stats.evictedLru],
+        [{ reason: 'rejected' }, stats.rejected],
+    ];
+}));
+
+register(new CollectedMetric('pothole_supabase_pool', 'Supabase connection pool usage', 'gauge', () =>
+    getClientPoolStats().flatMap((pool) => [
+        [{ url: pool.url, state: 'active' }, pool.active],
+        [{ url: pool.url, state: 'queued' }, pool.queued],
+        [{ url: pool.url, state: 'size' }, pool.size],
+    ] as Array<[Labels, number]>)
+));
+
+register(new CollectedMetric('pothole_analytics_cache_lookups_total', 'query_hazards cache lookups by result', 'counter', () => {
+    const stats = getAnalyticsCacheStats();
+    return [
+        [{ result: 'hit' }, stats.hits],
+        [{ result: 'stale' }, stats.staleHits],
+        [{ result: 'miss' }, stats.misses],
+    ];
+}));
+
+register(new CollectedMetric('pothole_upstream_calls_deduplicated_total', 'Supabase calls shared with an identical call in flight', 'counter', () =>
+    [[{}, getUpstreamCoalescingStats().deduplicated]]
+));
+
+register(new CollectedMetric('pothole_upstream_calls_cancelled_total', 'Supabase calls aborted after every caller gave up', 'counter', () =>
+    [[{}, getUpstreamCoalescingStats().cancelled]]
+));
+
+register(new CollectedMetric('pothole_weather_cache_lookups_total', 'Weather cache lookups by result', 'counter', () => {
+    const stats = getWeatherCacheStats();
+    return [[{ result: 'hit' }, stats.hits], [{ result: 'miss' }, stats.misses]];
+}));
+
+register(new CollectedMetric('pothole_compute_pool', 'Compute threads and queued tasks', 'gauge', () => {
+    const stats = getComputePoolStats();
+    return [[{ state: 'threads' }, stats.threads], [{ state: 'busy' }, stats.busy], [{ state: 'queued' }, stats.queued]];
+}));
+
+register(new CollectedMetric('pothole_compute_tasks_total', 'Compute tasks by outcome', 'counter', () => {
+    const stats = getComputePoolStats();
+    return [
+        [{ outcome: 'completed' }, stats.completed],
+        [{ outcome: 'failed' }, stats.failed],
+        [{ outcome: 'rejected' }, stats.rejected],
+        [{ outcome: 'cancelled' }, stats.cancelled],
+    ];
+}));
+
+register(new CollectedMetric('pothole_hazard_mirror_rows', 'Hazards held in the in-memory mirror', 'gauge', () =>
+    getHazardMirrorStats().map((mirror, index) => [{ mirror: String(index) }, mirror.rows] as [Labels, number])
+));
+
+register(new CollectedMetric('pothole_hazard_mirror_lag_seconds', 'Time since the hazard mirror last synced', 'gauge', () =>
+    getHazardMirrorStats().map((mirror, index) => [{ mirror: String(index) }, mirror.lagMs / 1000] as [Labels, number])
+));
+
+/**
+ * A prebuilt MCP server connected to a transport without session IDs
+ * @interface StatelessServer
+ */
+interface StatelessServer {
+    server: Server;
+    transport: StreamableHTTPServerTransport;
+}
+
+/** Records incoming JSON-RPC requests when started with a record path */
+let recorder: TrafficRecorder | undefined;
+
+/** Upper bound on idle prebuilt servers kept for stateless mode */
+const MAX_IDLE_STATELESS_SERVERS = 256;
+
+/** Idle prebuilt servers, reused across stateless requests */
+const statelessServers: StatelessServer[] = [];
 
 /**
  * Starts the HTTP transport server
@@ -13,22 +109,73 @@ const sessions = new Map<string, { transport: StreamableHTTPServerTransport; ser
  */
 export function startHttpTransport(config: Config): void {
     const httpServer = createServer();
+    startEventLoopMonitor();
+
+    if (config.stateless) {
+        // Build the first server up front so the first request pays only for tool work
+        acquireStatelessServer(config)
+            .then(releaseStatelessServer)
+            .catch((error) => console.error('Error preparing the stateless server:', error));
+    } else {
+        sessions.start(config.maxSessions, config.sessionIdleTtlMs);
+    }
+
+    if (config.recordPath) {
+        // Cluster workers share the primary's origin so their offsets line up
+        const origin = Number(process.env.POTHOLE_RECORD_ORIGIN) || Date.now();
+        const active = new TrafficRecorder(config.recordPath, origin, config.workerId);
+        recorder = active;
+        const stop = () => {
+            active.close().finally(() => process.exit(0));
+        };
+        process.once('SIGINT', stop);
+        process.once('SIGTERM', stop);
+    }
 
     httpServer.on('request', async (req, res) => {
         const url = new URL(req.url!, `http://${req.headers.host}`);
 
+        if (config.compression && (url.pathname === '/mcp' || url.pathname === '/metrics')) {
+            compressResponse(req, res, config.compressionThreshold);
+        }
+
         switch (url.pathname) {
-            case '/mcp':
-                await handleMcpRequest(req, res, config);
+            case '/mcp': {
+                let parsedBody: unknown;
+                if (recorder && req.method === 'POST') {
+                    const recorded = await recordRequest(req, res, recorder);
+                    if (!recorded) {
+                        break;
+                    }
+                    parsedBody = recorded.body;
+                }
+                // Tool calls carried by this request stop if its client goes away
+                await withRequestSignal(disconnectSignal(res), () => config.stateless
+                    ? handleStatelessRequest(req, res, config, parsedBody)
+                    : handleMcpRequest(req, res, config, parsedBody));
                 break;
+            }
             case '/health':
                 handleHealthCheck(res);
                 break;
+            case '/metrics':
+                handleMetrics(res);
+                break;
             default:
                 handleNotFound(res);
         }
     });
 
+    if (config.workerId !== undefined) {
+        // Cluster worker: only the primary talks to this listener
+        httpServer.listen(0, '127.0.0.1', () => {
+            const address = httpServer.address();
+            const port = typeof address === 'object' && address ? address.port : 0;
+            process.send?.({ type: 'listening', workerId: config.workerId, port });
+        });
+        return;
+    }
+
     const host = config.isProduction ? '0.0.0.0' : 'localhost';
     
     httpServer.listen(config.port, host, () => {
@@ -36,33 +183,96 @@ export function startHttpTransport(config: Config): void {
     });
 }
 
+/**
+ * Returns a signal that aborts if the response is closed before it is
+ * fully sent, which happens when the client disconnects mid-request
+ * @param {ServerResponse} res - HTTP response
+ * @returns {AbortSignal} Disconnect signal
+ * @private
+ */
+function disconnectSignal(res: ServerResponse): AbortSignal {
+    const controller = new AbortController();
+    res.on('close', () => {
+        if (!res.writableFinished) {
+            controller.abort(new Error('Client disconnected'));
+        }
+    });
+    return controller.signal;
+}
+
+/**
+ * Reads a POST body on behalf of the traffic recorder and records it once
+ * the response is done, when the session it belongs to is known. The
+ * parsed body is handed on to the transport, which can no longer read it.
+ * @param {IncomingMessage} req - HTTP request
+ * @param {ServerResponse} res - HTTP response
+ * @param {TrafficRecorder} active - Recorder to write to
+ * @returns {Promise<{ body: unknown } | undefined>} Parsed body, or undefined if an error response was sent
+ * @private
+ */
+async function recordRequest(
+    req: IncomingMessage,
+    res: ServerResponse,
+    active: TrafficRecorder
+): Promise<{ body: unknown } | undefined> {
+    const arrivedAt = Date.now();
+    let body: unknown;
+    try {
+        body = await readJsonBody(req);
+    } catch (error: any) {
+        const tooLarge = error.message === 'Request body too large';
+        res.writeHead(tooLarge ? 413 : 400, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({
+            jsonrpc: '2.0',
+            error: { code: tooLarge ? -32000 : -32700, message: tooLarge ? error.message : 'Parse error: Invalid JSON' },
+            id: null
+        }));
+        return undefined;
+    }
+
+    res.on('close', () => {
+        // A new session's ID only exists on the response
+        const session = (req.headers['mcp-session-id'] ?? res.getHeader('mcp-session-id')) as string | undefined;
+        active.record(arrivedAt, session, body);
+    });
+    return { body };
+}
+
 /**
  * Handles MCP protocol requests
  * @param {IncomingMessage} req - HTTP request
  * @param {ServerResponse} res - HTTP response
  * @param {Config} config - Server configuration
+ * @param {unknown} [parsedBody] - Body already read from the request
  * @returns {Promise<void>}
  * @private
  */
 async function handleMcpRequest(
     req: IncomingMessage,
     res: ServerResponse,
-    config: Config
+    config: Config,
+    parsedBody?: unknown
 ): Promise<void> {
     const sessionId = req.headers['mcp-session-id'] as string | undefined;
 
     if (sessionId) {
-        const session = sessions.get(sessionId);
+        const session = sessions.begin(sessionId);
         if (!session) {
             res.statusCode = 404;
             res.end('Session not found');
             return;
         }
-        return await session.transport.handleRequest(req, res);
+        res.on('close', () => sessions.end(sessionId, session));
+        return await session.transport.handleRequest(req, res, parsedBody);
     }
 
     if (req.method === 'POST') {
-        await createNewSession(req, res, config);
+        if (!sessions.reserve()) {
+            res.writeHead(503, { 'Content-Type': 'text/plain', 'Retry-After': '5' });
+            res.end('Too many sessions');
+            return;
+        }
+        await createNewSession(req, res, config, parsedBody);
         return;
     }
 
@@ -75,19 +285,24 @@ async function handleMcpRequest(
  * @param {IncomingMessage} req - HTTP request
  * @param {ServerResponse} res - HTTP response
  * @param {Config} config - Server configuration
+ * @param {unknown} [parsedBody] - Body already read from the request
  * @returns {Promise<void>}
  * @private
  */
 async function createNewSession(
     req: IncomingMessage,
     res: ServerResponse,
-    config: Config
+    config: Config,
+    parsedBody?: unknown
 ): Promise<void> {
-    const serverInstance = createStandaloneServer(config.supabaseUrl, config.supabaseKey);
+    const serverInstance = createStandaloneServer(getHazardBackend(config));
     const transport = new StreamableHTTPServerTransport({
-        sessionIdGenerator: () => randomUUID(),
+        // In cluster mode the owning worker is encoded in the session ID for routing
+        sessionIdGenerator: () => config.workerId !== undefined
+            ? `${config.workerId}.${randomUUID()}`
+            : randomUUID(),
         onsessioninitialized: (sessionId) => {
-            sessions.set(sessionId, { transport, server: serverInstance });
+            sessions.add(sessionId, transport, serverInstance);
             console.log('New Pothole Detection session created:', sessionId);
         }
     });
@@ -101,11 +316,104 @@ async function createNewSession(
 
     try {
         await serverInstance.connect(transport);
-        await transport.handleRequest(req, res);
+        await transport.handleRequest(req, res, parsedBody);
     } catch (error) {
         console.error('Streamable HTTP connection error:', error);
         res.statusCode = 500;
         res.end('Internal server error');
+    } finally {
+        if (!transport.sessionId) {
+            // The request never initialized a session; free its slot
+            sessions.cancelReservation();
+            serverInstance.close().catch(() => {});
+        }
+    }
+}
+
+/**
+ * Handles MCP requests in stateless mode.
+ * No session IDs are issued and nothing is stored per client: each POST is
+ * served by a prebuilt server taken from the idle list and returned once its
+ * response has been written. A single transport keys in-flight responses by
+ * JSON-RPC id, which different clients reuse freely, so concurrent requests
+ * each hold their own prebuilt server; the list only grows to the peak
+ * concurrency and is reused from then on.
+ * @param {IncomingMessage} req - HTTP request
+ * @param {ServerResponse} res - HTTP response
+ * @param {Config} config - Server configuration
+ * @param {unknown} [parsedBody] - Body already read from the request
+ * @returns {Promise<void>}
+ * @private
+ */
+async function handleStatelessRequest(
+    req: IncomingMessage,
+    res: ServerResponse,
+    config: Config,
+    parsedBody?: unknown
+): Promise<void> {
+    if (req.method !== 'POST') {
+        res.writeHead(405, { 'Content-Type': 'application/json', 'Allow': 'POST' });
+        res.end(JSON.stringify({
+            jsonrpc: '2.0',
+            error: { code: -32000, message: 'Method not allowed in stateless mode' },
+            id: null
+        }));
+        return;
+    }
+
+    const instance = await acquireStatelessServer(config);
+
+    res.on('close', () => {
+        // A response cut short may still have a handler running against this
+        // transport, so only cleanly finished instances go back to the list
+        if (res.writableFinished) {
+            releaseStatelessServer(instance);
+        } else {
+            instance.server.close().catch(() => {});
+        }
+    });
+
+    try {
+        await instance.transport.handleRequest(req, res, parsedBody);
+    } catch (error) {
+        console.error('Stateless HTTP request error:', error);
+        if (!res.headersSent) {
+            res.statusCode = 500;
+            res.end('Internal server error');
+        }
+    }
+}
+
+/**
+ * Takes an idle prebuilt server, building one if none is available
+ * @param {Config} config - Server configuration
+ * @returns {Promise<StatelessServer>} Server connected to a session-less transport
+ * @private
+ */
+async function acquireStatelessServer(config: Config): Promise<StatelessServer> {
+    const idle = statelessServers.pop();
+    if (idle) {
+        return idle;
+    }
+
+    const server = createStandaloneServer(getHazardBackend(config));
+    const transport = new StreamableHTTPServerTransport({
+        sessionIdGenerator: undefined
+    });
+    await server.connect(transport);
+    return { server, transport };
+}
+
+/**
+ * Returns a prebuilt server to the idle list
+ * @param {StatelessServer} instance - Server to release
+ * @private
+ */
+function releaseStatelessServer(instance: StatelessServer): void {
+    if (statelessServers.length < MAX_IDLE_STATELESS_SERVERS) {
+        statelessServers.push(instance);
+    } else {
+        instance.server.close().catch(() => {});
     }
 }
 
@@ -118,10 +426,29 @@ function handleHealthCheck(res: ServerResponse): void {
     res.writeHead(200, { 'Content-Type': 'application/json' });
     res.end(JSON.stringify({ 
         status: 'healthy', 
-        timestamp: new Date().toISOString() 
+        timestamp: new Date().toISOString(),
+        sessions: sessions.stats(),
+        idleStatelessServers: statelessServers.length,
+        supabasePools: getClientPoolStats(),
+        analyticsCache: getAnalyticsCacheStats(),
+        upstreamCoalescing: getUpstreamCoalescingStats(),
+        hazardMirrors: getHazardMirrorStats(),
+        weatherCache: getWeatherCacheStats(),
+        computePool: getComputePoolStats(),
+        recorder: recorder?.stats()
     }));
 }
 
+/**
+ * Handles the Prometheus metrics endpoint
+ * @param {ServerResponse} res - HTTP response
+ * @private
+ */
+function handleMetrics(res: ServerResponse): void {
+    res.writeHead(200, { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8' });
+    res.end(renderMetrics());
+}
+
 /**
  * Handles 404 Not Found responses
  * @param {ServerResponse} res - HTTP response
@@ -143,6 +470,15 @@ function logServerStart(config: Config): void {
         : `http://localhost:${config.port}`;
     
     console.log(`Pothole Detection MCP Server listening on ${displayUrl}`);
+    if (config.stateless) {
+        console.log('Stateless mode: no MCP session IDs are issued');
+    }
+    if (config.recordPath) {
+        console.log(`Recording MCP requests to ${config.recordPath}`);
+    }
+    if (config.dataBackend === 'memory') {
+        console.log(`Serving hazards from ${config.dataFile} in memory`);
+    }
 
     if (!config.isProduction) {
         console.log('Put this in your client config:');
@@ -1,2 +1,3 @@
 export { runStdioTransport } from './stdio.js';
-export { startHttpTransport } from './http.js';
\ No newline at end of file
+export { startHttpTransport } from './http.js';
+export { startClusterTransport } from './cluster.js';
\ No newline at end of file
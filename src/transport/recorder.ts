@@ -0,0 +1,207 @@
+import { IncomingMessage } from 'http';
+import { open, FileHandle } from 'fs/promises';
+
+/** Bodies larger than this are refused, matching the MCP transport's own limit */
+const MAX_BODY_BYTES = 4 * 1024 * 1024;
+
+/** Buffered lines are written once they reach this size... */
+const FLUSH_BYTES = 64 * 1024;
+
+/** ...or after this long */
+const FLUSH_INTERVAL_MS = 1_000;
+
+/** Lines beyond this much unwritten backlog are dropped rather than held */
+const MAX_PENDING_BYTES = 16 * 1024 * 1024;
+
+/** Keys whose values are replaced before a body is recorded */
+const SECRET_KEY = /token|secret|password|passwd|authorization|api[-_]?key|cookie/i;
+
+/**
+ * One recorded JSON-RPC request, written as a line of JSONL
+ * @interface RecordedRequest
+ */
+export interface RecordedRequest {
+    /** Arrival time in milliseconds since recording started */
+    t: number;
+    /** MCP session the request belongs to; for initialize, the session it created */
+    session?: string;
+    /** Cluster worker that served the request */
+    worker?: number;
+    /** JSON-RPC message or batch, sanitized */
+    body: unknown;
+}
+
+/**
+ * Recorder counters exposed for monitoring
+ * @interface RecorderStats
+ */
+export interface RecorderStats {
+    path: string;
+    recorded: number;
+    /** Requests dropped because writes fell too far behind */
+    dropped: number;
+    writeErrors: number;
+}
+
+/**
+ * Copies a JSON-RPC body with secrets redacted and `_meta` fields, which
+ * carry per-connection progress tokens, removed
+ * @param {unknown} value - Parsed body
+ * @returns {unknown} Sanitized copy
+ */
+export function sanitizeBody(value: unknown): unknown {
+    if (Array.isArray(value)) {
+        return value.map(sanitizeBody);
+    }
+    if (!value || typeof value !== 'object') {
+        return value;
+    }
+    const copy: { [key: string]: unknown } = {};
+    for (const [key, field] of Object.entries(value)) {
+        if (key === '_meta') {
+            continue;
+        }
+        copy[key] = SECRET_KEY.test(key) ? '[redacted]' : sanitizeBody(field);
+    }
+    return copy;
+}
+
+/**
+ * Reads and parses a JSON request body
+ * @param {IncomingMessage} req - HTTP request
+ * @returns {Promise<unknown>} Parsed body
+ * @throws {Error} If the body is too large or not valid JSON
+ */
+export async function readJsonBody(req: IncomingMessage): Promise<unknown> {
+    const chunks: Buffer[] = [];
+    let size = 0;
+    for await (const chunk of req) {
+        size += chunk.length;
+        if (size > MAX_BODY_BYTES) {
+            throw new Error('Request body too large');
+        }
+        chunks.push(chunk);
+    }
+    return JSON.parse(Buffer.concat(chunks).toString('utf8'));
+}
+
+/**
+ * Appends JSON-RPC requests to a JSONL file for later replay. Lines are
+ * buffered in memory and written asynchronously in batches, one write at a
+ * time so lines keep their order; a slow disk costs dropped lines, never
+ * request latency. Each write appends whole lines, so several processes
+ * may record into the same file.
+ * @class TrafficRecorder
+ */
+export class TrafficRecorder {
+    private file?: Promise<FileHandle>;
+    private buffer: string[] = [];
+    private bufferBytes = 0;
+    private pendingBytes = 0;
+    private writing: Promise<void> = Promise.resolve();
+    private timer?: NodeJS.Timeout;
+    private recorded = 0;
+    private dropped = 0;
+    private writeErrors = 0;
+
+    /**
+     * Creates a new TrafficRecorder
+     * @param {string} path - JSONL file to append to
+     * @param {number} origin - Epoch milliseconds offsets are measured from
+     * @param {number} [worker] - Cluster worker ID stamped on each line
+     */
+    constructor(private readonly path: string, private readonly origin: number, private readonly worker?: number) {}
+
+    /**
+     * Queues a request for writing
+     * @param {number} arrivedAt - Epoch milliseconds the request arrived
+     * @param {string | undefined} session - MCP session ID
+     * @param {unknown} body - Parsed JSON-RPC body
+     */
+    record(arrivedAt: number, session: string | undefined, body: unknown): void {
+        const entry: RecordedRequest = { t: arrivedAt - this.origin, session, worker: this.worker, body: sanitizeBody(body) };
+        const line = `${JSON.stringify(entry)}\n`;
+        if (this.pendingBytes + line.length > MAX_PENDING_BYTES) {
+            this.dropped++;
+            return;
+        }
+
+        this.recorded++;
+        this.buffer.push(line);
+        this.bufferBytes += line.length;
+        this.pendingBytes += line.length;
+        if (this.bufferBytes >= FLUSH_BYTES) {
+            this.flush();
+        } else if (!this.timer) {
+            this.timer = setTimeout(() => this.flush(), FLUSH_INTERVAL_MS);
+            this.timer.unref();
+        }
+    }
+
+    /**
+     * Writes everything buffered so far
+     * @returns {Promise<void>} Resolves once the lines are written
+     */
+    flush(): Promise<void> {
+        clearTimeout(this.timer);
+        this.timer = undefined;
+        if (this.buffer.length === 0) {
+            return this.writing;
+        }
+
+        const chunk = this.buffer.join('');
+        const bytes = this.bufferBytes;
+        this.buffer = [];
+        this.bufferBytes = 0;
+        this.writing = this.writing
+            .then(async () => {
+                const file = await this.handle();
+                await file.write(chunk);
+            })
+            .catch((error) => {
+                this.writeErrors++;
+                console.error('Error writing traffic recording:', error);
+            })
+            .finally(() => {
+                this.pendingBytes -= bytes;
+            });
+        return this.writing;
+    }
+
+    /**
+     * Opens the recording file the first time it is called
+     * @returns {Promise<FileHandle>} Handle appending to the recording
+     * @private
+     */
+    private handle(): Promise<FileHandle> {
+        if (!this.file) {
+            this.file = open(this.path, 'a');
+            // A failed open is retried on the next write
+            this.file.catch(() => {
+                this.file = undefined;
+            });
+        }
+        return this.file;
+    }
+
+    /**
+     * Writes what is buffered and closes the file
+     * @returns {Promise<void>}
+     */
+    async close(): Promise<void> {
+        await this.flush();
+        if (this.file) {
+            const file = this.file;
+            this.file = undefined;
+            await (await file.catch(() => undefined))?.close();
+        }
+    }
+
+    /**
+     * Returns recorder counters
+     * @returns {RecorderStats} Recorder counters
+     */
+    stats(): RecorderStats {
+        return { path: this.path, recorded: this.recorded, dropped: this.dropped, writeErrors: this.writeErrors };
+    }
+}
@@ -0,0 +1,209 @@
+import { StreamableHTTPServerTransport } from '@modelcontextprotocol/sdk/server/streamableHttp.js';
+import { Server } from '@modelcontextprotocol/sdk/server/index.js';
+
+/** Default idle time after which a session is evicted */
+export const DEFAULT_SESSION_IDLE_TTL_MS = 30 * 60 * 1000;
+
+/** Default maximum number of live sessions */
+export const DEFAULT_MAX_SESSIONS = 1000;
+
+/**
+ * A live MCP session
+ * @interface SessionEntry
+ */
+export interface SessionEntry {
+    transport: StreamableHTTPServerTransport;
+    server: Server;
+    /** Time of the last request start or end, in epoch milliseconds */
+    lastSeen: number;
+    /** HTTP requests currently open against the session */
+    inflight: number;
+}
+
+/**
+ * Session counters exposed for monitoring
+ * @interface SessionStats
+ */
+export interface SessionStats {
+    live: number;
+    pending: number;
+    max: number;
+    idleTtlMs: number;
+    evictedIdle: number;
+    evictedLru: number;
+    rejected: number;
+}
+
+/**
+ * Bounded store for HTTP sessions with idle-TTL and LRU eviction.
+ * Entries live in a Map kept in least-recently-used order: every touch
+ * re-inserts the entry at the tail, so the oldest entry is always at the
+ * head. Idle sweeps and LRU eviction walk from the head and stop at the
+ * first entry that is still fresh, which keeps both O(1) per eviction.
+ * Sessions with an open request are never evicted.
+ * @class SessionStore
+ */
+export class SessionStore {
+    private entries = new Map<string, SessionEntry>();
+    private maxSessions = DEFAULT_MAX_SESSIONS;
+    private idleTtlMs = DEFAULT_SESSION_IDLE_TTL_MS;
+    private pending = 0;
+    private evictedIdle = 0;
+    private evictedLru = 0;
+    private rejected = 0;
+    private sweepTimer?: NodeJS.Timeout;
+
+    /**
+     * Applies limits and starts the periodic idle sweep
+     * @param {number} maxSessions - Maximum number of live sessions
+     * @param {number} idleTtlMs - Idle time after which a session is evicted
+     */
+    start(maxSessions: number, idleTtlMs: number): void {
+        this.maxSessions = Math.max(1, maxSessions);
+        this.idleTtlMs = Math.max(1000, idleTtlMs);
+
+        if (this.sweepTimer) {
+            clearInterval(this.sweepTimer);
+        }
+        const interval = Math.min(30_000, Math.ceil(this.idleTtlMs / 4));
+        this.sweepTimer = setInterval(() => this.sweep(Date.now()), interval);
+        this.sweepTimer.unref();
+    }
+
+    /** Number of live sessions */
+    get size(): number {
+        return this.entries.size;
+    }
+
+    /**
+     * Marks the start of a request against a session
+     * @param {string} sessionId - Session ID from the request
+     * @returns {SessionEntry | undefined} The session, or undefined if unknown
+     */
+    begin(sessionId: string): SessionEntry | undefined {
+        const entry = this.entries.get(sessionId);
+        if (!entry) {
+            return undefined;
+        }
+        entry.inflight++;
+        this.touch(sessionId, entry);
+        return entry;
+    }
+
+    /**
+     * Marks the end of a request started with begin()
+     * @param {string} sessionId - Session ID from the request
+     * @param {SessionEntry} entry - Entry returned by begin()
+     */
+    end(sessionId: string, entry: SessionEntry): void {
+        entry.inflight--;
+        if (this.entries.get(sessionId) === entry) {
+            this.touch(sessionId, entry);
+        }
+    }
+
+    /**
+     * Reserves room for a session that is about to be initialized.
+     * At the cap, the least recently used idle session is evicted to make
+     * room; if every session is busy the reservation is rejected.
+     * @returns {boolean} Whether a new session may be created
+     */
+    reserve(): boolean {
+        if (this.entries.size + this.pending >= this.maxSessions && !this.evictLeastRecentlyUsed()) {
+            this.rejected++;
+            return false;
+        }
+        this.pending++;
+        return true;
+    }
+
+    /**
+     * Stores a newly initialized session, consuming its reservation
+     * @param {string} sessionId - Session ID issued by the transport
+     * @param {StreamableHTTPServerTransport} transport - Session transport
+     * @param {Server} server - Session server
+     */
+    add(sessionId: string, transport: StreamableHTTPServerTransport, server: Server): void {
+        this.pending = Math.max(0, this.pending - 1);
+        this.entries.set(sessionId, { transport, server, lastSeen: Date.now(), inflight: 0 });
+    }
+
+    /**
+     * Gives back a reservation whose session was never initialized
+     */
+    cancelReservation(): void {
+        this.pending = Math.max(0, this.pending - 1);
+    }
+
+    /**
+     * Removes a session without closing it
+     * @param {string} sessionId - Session ID
+     */
+    delete(sessionId: string): void {
+        this.entries.delete(sessionId);
+    }
+
+    /**
+     * Evicts every idle session whose last activity is older than the TTL
+     * @param {number} now - Current time in epoch milliseconds
+     * @returns {number} Number of sessions evicted
+     */
+    sweep(now: number): number {
+        let evicted = 0;
+        for (const [sessionId, entry] of this.entries) {
+            if (now - entry.lastSeen < this.idleTtlMs) {
+                break;
+            }
+            if (entry.inflight > 0) {
+                // Still streaming; move it out of the way of the sweep
+                this.touch(sessionId, entry);
+                continue;
+            }
+            this.evict(sessionId, entry);
+            this.evictedIdle++;
+            evicted++;
+        }
+        return evicted;
+    }
+
+    /**
+     * Returns session counters
+     * @returns {SessionStats} Session counters
+     */
+    stats(): SessionStats {
+        return {
+            live: this.entries.size,
+            pending: this.pending,
+            max: this.maxSessions,
+            idleTtlMs: this.idleTtlMs,
+            evictedIdle: this.evictedIdle,
+            evictedLru: this.evictedLru,
+            rejected: this.rejected,
+        };
+    }
+
+    private evictLeastRecentlyUsed(): boolean {
+        for (const [sessionId, entry] of this.entries) {
+            if (entry.inflight === 0) {
+                this.evict(sessionId, entry);
+                this.evictedLru++;
+                return true;
+            }
+        }
+        return false;
+    }
+
+    private evict(sessionId: string, entry: SessionEntry): void {
+        this.entries.delete(sessionId);
+        entry.server.close().catch((error) => {
+            console.error('Error closing evicted session:', sessionId, error);
+        });
+        console.log('Pothole Detection session evicted:', sessionId);
+    }
+
+    private touch(sessionId: string, entry: SessionEntry): void {
+        entry.lastSeen = Date.now();
+        this.entries.delete(sessionId);
+        this.entries.set(sessionId, entry);
+    }
+}
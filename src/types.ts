@@ -7,11 +7,40 @@
  * @interface QueryHazardsArgs
  */
 export interface QueryHazardsArgs {
-    kind: 'area_with_most_hazards' | 'top_severe_in_area' | 'counts_by_type' | 'open_vs_resolved';
+    kind: 'area_with_most_hazards' | 'top_severe_in_area' | 'counts_by_type' | 'open_vs_resolved' | 'radius' | 'hotspots' | 'rollup' | 'filter';
+    area?: string;
     lat?: number;
     lng?: number;
+    /** Search radius in meters */
     radius?: number;
     limit?: number;
+    /** Radius queries: distance or severity; filter queries: id, severity or newest */
+    order_by?: 'distance' | 'severity' | 'newest' | 'id';
+    /** Matches to skip, for filter queries */
+    offset?: number;
+    /** Grid resolution for hotspot queries, 0 (whole world) to 20 */
+    resolution?: number;
+    /** [west, south, east, north] box hotspot cells must intersect */
+    bbox?: [number, number, number, number];
+    /** Dimensions a rollup query groups by */
+    group_by?: Array<'type' | 'status' | 'severity' | 'area' | 'week'>;
+    /** Conditions for rollup and filter queries */
+    filters?: {
+        type?: string[];
+        status?: string[];
+        severity?: number[];
+        /** Filter queries only */
+        min_severity?: number;
+        area?: string[];
+        /** Rollup queries only */
+        week_from?: string;
+        /** Rollup queries only */
+        week_to?: string;
+        /** Filter queries only */
+        created_from?: string;
+        /** Filter queries only */
+        created_to?: string;
+    };
 }
 
 /**
@@ -19,7 +48,9 @@ export interface QueryHazardsArgs {
  * @interface EstimateRepairPlanArgs
  */
 export interface EstimateRepairPlanArgs {
-    hazard_id: string;
+    hazard_id?: string;
+    /** Plan several hazards in one call; takes precedence over hazard_id */
+    hazard_ids?: string[];
 }
 
 /**
@@ -30,4 +61,15 @@ export interface ProjectWorseningArgs {
     hazard_id?: string;
     lat?: number;
     lng?: number;
+    /** Deprecated alias of lng */
+    lon?: number;
+    /** Batch projection of several hazards */
+    hazard_ids?: string[];
+    /** Batch projection of every unresolved hazard in an area */
+    area?: string;
+    /** Steps to project, for batch projections */
+    horizon?: number;
+    step?: 'day' | 'week' | 'month';
+    /** Batch output: full severity matrix or time to severity 5 */
+    format?: 'matrix' | 'summary';
 }
\ No newline at end of file
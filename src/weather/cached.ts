@@ -0,0 +1,143 @@
+import { CacheStats, TtlCache } from '../cache.js';
+import { SingleFlight } from '../singleflight.js';
+import { encodeGeohash, geohashCenter } from './geohash.js';
+import { FileWeatherProvider, StaticWeatherProvider, WeatherProvider } from './providers.js';
+
+const HOUR_MS = 3_600_000;
+
+/**
+ * Weather lookup settings
+ * @interface WeatherOptions
+ */
+export interface WeatherOptions {
+    /** Weather file to read conditions from; unset reports rain everywhere */
+    file?: string;
+    /** Geohash length of a cache cell; 5 is about 5 km across */
+    cellPrecision: number;
+    /** Time a looked-up condition is reused */
+    cacheTtlMs: number;
+    /** Maximum number of cell-hours kept */
+    cacheMaxEntries: number;
+}
+
+export const DEFAULT_WEATHER_OPTIONS: WeatherOptions = {
+    cellPrecision: 5,
+    cacheTtlMs: 60 * 60_000,
+    cacheMaxEntries: 10_000,
+};
+
+/**
+ * Puts a bounded TTL cache in front of a weather provider. Locations are
+ * bucketed by geohash cell and times by hour, and each bucket is looked up
+ * once, at the cell's center and the start of the hour, so projections
+ * for thousands of nearby hazards share one upstream call. Concurrent
+ * misses on the same bucket also share it.
+ * @class CachedWeatherProvider
+ */
+export class CachedWeatherProvider implements WeatherProvider {
+    private readonly cache: TtlCache<string>;
+    private readonly lookups = new SingleFlight();
+
+    /**
+     * Creates a new CachedWeatherProvider
+     * @param {WeatherProvider} provider - Provider to look conditions up from
+     * @param {WeatherOptions} options - Cell size and cache bounds
+     */
+    constructor(private readonly provider: WeatherProvider, private readonly options: WeatherOptions) {
+        this.cache = new TtlCache<string>(options.cacheMaxEntries);
+    }
+
+    async condition(lat: number, lng: number, at: Date): Promise<string> {
+        const [condition] = await this.conditions([lat], [lng], at);
+        return condition;
+    }
+
+    /**
+     * Returns the conditions at many locations at once, looking each cell up once
+     * @param {ArrayLike<number>} lats - Latitudes; NaN for hazards without a location
+     * @param {ArrayLike<number>} lngs - Longitudes; NaN for hazards without a location
+     * @param {Date} at - Time of interest
+     * @returns {Promise<string[]>} Condition per location
+     */
+    async conditions(lats: ArrayLike<number>, lngs: ArrayLike<number>, at: Date): Promise<string[]> {
+        const hour = Math.floor(at.getTime() / HOUR_MS);
+        const cells = new Map<string, Promise<string>>();
+        const keys: string[] = new Array(lats.length);
+
+        for (let i = 0; i < lats.length; i++) {
+            const located = isFinite(lats[i]) && isFinite(lngs[i]);
+            // Hazards without a location share one bucket per hour
+            const cell = located ? encodeGeohash(lats[i], lngs[i], this.options.cellPrecision) : '';
+            const key = `${cell}:${hour}`;
+            keys[i] = key;
+            if (!cells.has(key)) {
+                cells.set(key, this.lookup(key, cell, hour));
+            }
+        }
+
+        const found = await Promise.all(cells.values());
+        const resolved = new Map(Array.from(cells.keys(), (key, i) => [key, found[i]]));
+        return keys.map((key) => resolved.get(key)!);
+    }
+
+    /**
+     * Returns cache counters
+     * @returns {CacheStats} Cache counters
+     */
+    stats(): CacheStats {
+        return this.cache.stats();
+    }
+
+    private lookup(key: string, cell: string, hour: number): Promise<string> {
+        const policy = { ttlMs: this.options.cacheTtlMs, staleMs: 0 };
+        return this.cache.get(key, policy, () => this.lookups.do(key, () => {
+            const center = cell ? geohashCenter(cell) : { lat: NaN, lng: NaN };
+            return this.provider.condition(center.lat, center.lng, new Date(hour * HOUR_MS));
+        }));
+    }
+}
+
+let weatherOptions: WeatherOptions = DEFAULT_WEATHER_OPTIONS;
+let source: WeatherProvider | undefined;
+let shared: CachedWeatherProvider | undefined;
+
+/**
+ * Sets the weather file and cache settings. Takes effect on the next lookup.
+ * @param {Partial<WeatherOptions>} options - Options to override
+ */
+export function configureWeather(options: Partial<WeatherOptions>): void {
+    weatherOptions = { ...weatherOptions, ...options };
+    shared = undefined;
+}
+
+/**
+ * Replaces the source of weather conditions, e.g. with a live weather API.
+ * Lookups still go through the shared cache.
+ * @param {WeatherProvider | undefined} provider - New source; undefined restores the configured one
+ */
+export function setWeatherProvider(provider: WeatherProvider | undefined): void {
+    source = provider;
+    shared = undefined;
+}
+
+/**
+ * Returns the shared, cached weather provider
+ * @returns {CachedWeatherProvider} Weather provider
+ */
+export function getWeatherProvider(): CachedWeatherProvider {
+    if (!shared) {
+        const provider = source ?? (weatherOptions.file
+            ? new FileWeatherProvider(weatherOptions.file)
+            : new StaticWeatherProvider());
+        shared = new CachedWeatherProvider(provider, weatherOptions);
+    }
+    return shared;
+}
+
+/**
+ * Returns hit/miss counters of the shared weather cache
+ * @returns {CacheStats} Cache counters
+ */
+export function getWeatherCacheStats(): CacheStats {
+    return getWeatherProvider().stats();
+}
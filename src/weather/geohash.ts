@@ -0,0 +1,88 @@
+const BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz';
+
+/**
+ * Encodes a location as a geohash. Each character halves the cell five
+ * more times, alternating longitude and latitude; precision 5 cells are
+ * about 4.9 km by 4.9 km at the equator.
+ * @param {number} lat - Latitude in degrees
+ * @param {number} lng - Longitude in degrees
+ * @param {number} precision - Number of characters
+ * @returns {string} Geohash of the cell containing the location
+ */
+export function encodeGeohash(lat: number, lng: number, precision: number): string {
+    let latMin = -90;
+    let latMax = 90;
+    let lngMin = -180;
+    let lngMax = 180;
+    let hash = '';
+    let bits = 0;
+    let value = 0;
+    let even = true;
+
+    while (hash.length < precision) {
+        if (even) {
+            const mid = (lngMin + lngMax) / 2;
+            value = value * 2 + (lng >= mid ? 1 : 0);
+            if (lng >= mid) {
+                lngMin = mid;
+            } else {
+                lngMax = mid;
+            }
+        } else {
+            const mid = (latMin + latMax) / 2;
+            value = value * 2 + (lat >= mid ? 1 : 0);
+            if (lat >= mid) {
+                latMin = mid;
+            } else {
+                latMax = mid;
+            }
+        }
+        even = !even;
+        if (++bits === 5) {
+            hash += BASE32[value];
+            bits = 0;
+            value = 0;
+        }
+    }
+    return hash;
+}
+
+/**
+ * Returns the center of a geohash cell
+ * @param {string} hash - Geohash
+ * @returns {{ lat: number, lng: number }} Center of the cell
+ */
+export function geohashCenter(hash: string): { lat: number, lng: number } {
+    let latMin = -90;
+    let latMax = 90;
+    let lngMin = -180;
+    let lngMax = 180;
+    let even = true;
+
+    for (const char of hash) {
+        const value = BASE32.indexOf(char);
+        if (value < 0) {
+            throw new Error(`Invalid geohash character: ${char}`);
+        }
+        for (let bit = 4; bit >= 0; bit--) {
+            const set = ((value >> bit) & 1) === 1;
+            if (even) {
+                const mid = (lngMin + lngMax) / 2;
+                if (set) {
+                    lngMin = mid;
+                } else {
+                    lngMax = mid;
+                }
+            } else {
+                const mid = (latMin + latMax) / 2;
+                if (set) {
+                    latMin = mid;
+                } else {
+                    latMax = mid;
+                }
+            }
+            even = !even;
+        }
+    }
+    return { lat: (latMin + latMax) / 2, lng: (lngMin + lngMax) / 2 };
+}
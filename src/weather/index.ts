@@ -0,0 +1,12 @@
+export { StaticWeatherProvider, FileWeatherProvider } from './providers.js';
+export type { WeatherProvider, WeatherFile, WeatherWindow } from './providers.js';
+export {
+    CachedWeatherProvider,
+    configureWeather,
+    setWeatherProvider,
+    getWeatherProvider,
+    getWeatherCacheStats,
+    DEFAULT_WEATHER_OPTIONS
+} from './cached.js';
+export type { WeatherOptions } from './cached.js';
+export { encodeGeohash, geohashCenter } from './geohash.js';
@@ -0,0 +1,114 @@
+import { readFile } from 'fs/promises';
+import { encodeGeohash } from './geohash.js';
+
+/**
+ * Source of weather conditions for worsening projections
+ * @interface WeatherProvider
+ */
+export interface WeatherProvider {
+    /**
+     * Returns the weather condition at a place and time
+     * @param {number} lat - Latitude; NaN when the hazard has no location
+     * @param {number} lng - Longitude; NaN when the hazard has no location
+     * @param {Date} at - Time of interest
+     * @returns {Promise<string>} Condition such as "clear", "rain" or "snow"
+     */
+    condition(lat: number, lng: number, at: Date): Promise<string>;
+}
+
+/**
+ * Reports the same condition everywhere. Used when no weather source is
+ * configured.
+ * @class StaticWeatherProvider
+ */
+export class StaticWeatherProvider implements WeatherProvider {
+    /**
+     * Creates a new StaticWeatherProvider
+     * @param {string} weather - Condition to report
+     */
+    constructor(private readonly weather: string = 'rain') {}
+
+    async condition(): Promise<string> {
+        return this.weather;
+    }
+}
+
+/**
+ * Condition over a time window; an unbounded side matches any time
+ * @interface WeatherWindow
+ */
+export interface WeatherWindow {
+    from?: string;
+    to?: string;
+    condition: string;
+}
+
+/**
+ * Contents of a weather file
+ * @interface WeatherFile
+ */
+export interface WeatherFile {
+    /** Condition where no cell matches; "clear" if unset */
+    default?: string;
+    /**
+     * Conditions by geohash prefix. The longest prefix of a location's
+     * geohash that has a matching entry wins.
+     */
+    cells: { [geohash: string]: string | WeatherWindow[] };
+}
+
+/** Longest geohash prefix looked up in a weather file */
+const MAX_FILE_PRECISION = 12;
+
+/**
+ * Reads conditions from a local JSON file (see WeatherFile), for offline
+ * use and tests. The file is read once, on the first lookup.
+ * @class FileWeatherProvider
+ */
+export class FileWeatherProvider implements WeatherProvider {
+    private loading?: Promise<WeatherFile>;
+
+    /**
+     * Creates a new FileWeatherProvider
+     * @param {string} path - Path of the weather file
+     */
+    constructor(private readonly path: string) {}
+
+    async condition(lat: number, lng: number, at: Date): Promise<string> {
+        const file = await this.load();
+        const fallback = file.default ?? 'clear';
+        if (!isFinite(lat) || !isFinite(lng)) {
+            return fallback;
+        }
+
+        const time = at.getTime();
+        const hash = encodeGeohash(lat, lng, MAX_FILE_PRECISION);
+        for (let length = MAX_FILE_PRECISION; length > 0; length--) {
+            const entry = file.cells[hash.slice(0, length)];
+            if (typeof entry === 'string') {
+                return entry;
+            }
+            const window = entry?.find((candidate) =>
+                (!candidate.from || Date.parse(candidate.from) <= time)
+                && (!candidate.to || time < Date.parse(candidate.to)));
+            if (window) {
+                return window.condition;
+            }
+        }
+        return fallback;
+    }
+
+    private load(): Promise<WeatherFile> {
+        if (!this.loading) {
+            this.loading = readFile(this.path, 'utf8').then((text) => {
+                const file = JSON.parse(text) as WeatherFile;
+                return { ...file, cells: file.cells ?? {} };
+            });
+            // Let the next lookup retry instead of caching the failure
+            this.loading.catch(() => {
+                this.loading = undefined;
+            });
+        }
+        return this.loading;
+    }
+}
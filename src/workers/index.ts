@@ -0,0 +1,10 @@
+export {
+    WorkerPool,
+    configureComputePool,
+    getComputePool,
+    getComputePoolStats,
+    DEFAULT_COMPUTE_POOL_OPTIONS
+} from './pool.js';
+export type { ComputePoolOptions, ComputePoolStats } from './pool.js';
+export { computeTasks, transferablesOf } from './tasks.js';
+export type { ComputeTaskName, ComputeTasks, ProjectionTask } from './tasks.js';
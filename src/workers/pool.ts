@@ -0,0 +1,261 @@
+import { Worker } from 'worker_threads';
+import { availableParallelism } from 'os';
+import { extname } from 'path';
+import { fileURLToPath } from 'url';
+import { computeQueueWait } from '../metrics.js';
+import { computeTasks, ComputeTaskName, ComputeTasks, transferablesOf } from './tasks.js';
+
+type TaskInput<K extends ComputeTaskName> = Parameters<ComputeTasks[K]>[0];
+type TaskOutput<K extends ComputeTaskName> = ReturnType<ComputeTasks[K]>;
+
+/**
+ * Compute pool sizing
+ * @interface ComputePoolOptions
+ */
+export interface ComputePoolOptions {
+    /** Worker threads; 0 runs tasks on the event loop */
+    threads: number;
+    /** Tasks allowed to wait for a thread before new ones are refused */
+    maxQueue: number;
+}
+
+export const DEFAULT_COMPUTE_POOL_OPTIONS: ComputePoolOptions = {
+    threads: Math.max(1, Math.min(4, availableParallelism() - 1)),
+    maxQueue: 256,
+};
+
+/**
+ * Point-in-time statistics for the compute pool
+ * @interface ComputePoolStats
+ */
+export interface ComputePoolStats {
+    threads: number;
+    /** Threads currently running a task */
+    busy: number;
+    /** Tasks waiting for a free thread */
+    queued: number;
+    maxQueue: number;
+    completed: number;
+    failed: number;
+    /** Tasks refused because the queue was full */
+    rejected: number;
+    /** Tasks dropped from the queue because their caller gave up */
+    cancelled: number;
+}
+
+interface Job {
+    id: number;
+    task: ComputeTaskName;
+    input: unknown;
+    transfer: ArrayBuffer[];
+    enqueuedAt: number;
+    resolve: (result: any) => void;
+    reject: (error: Error) => void;
+    /** Stops listening for the caller's abort once the task is running */
+    detach?: () => void;
+}
+
+interface Thread {
+    worker: Worker;
+    job?: Job;
+}
+
+/** Compiled builds run worker.js, tsx runs worker.ts; threads inherit the loader */
+const WORKER_URL = new URL(`./worker${extname(fileURLToPath(import.meta.url))}`, import.meta.url);
+
+/**
+ * Fixed pool of worker threads running computeTasks off the event loop.
+ * Tasks wait in a bounded FIFO queue for a free thread; once the queue is
+ * full, run() rejects at once so overload shows up as fast errors rather
+ * than unbounded memory and latency. Typed arrays in a task's input are
+ * transferred to the thread instead of copied (SharedArrayBuffer-backed
+ * ones are shared), and results come back the same way. Threads are
+ * started on first use, replaced if they crash, and do not keep the
+ * process alive.
+ * @class WorkerPool
+ */
+export class WorkerPool {
+    private readonly threads: Thread[] = [];
+    private readonly queue: Job[] = [];
+    private nextId = 1;
+    private completed = 0;
+    private failed = 0;
+    private rejected = 0;
+    private cancelled = 0;
+
+    /**
+     * Creates a new WorkerPool
+     * @param {ComputePoolOptions} options - Pool sizing
+     */
+    constructor(private readonly options: ComputePoolOptions) {}
+
+    /**
+     * Runs a task on a worker thread. The buffers of typed arrays in the
+     * input are transferred and become unusable to the caller.
+     * @param {K} task - Name of the task
+     * @param {TaskInput<K>} input - Task input
+     * @param {AbortSignal} [signal] - Drops the task if it aborts while the task is still queued
+     * @returns {Promise<TaskOutput<K>>} Task result
+     * @throws {Error} If the queue is full
+     */
+    run<K extends ComputeTaskName>(task: K, input: TaskInput<K>, signal?: AbortSignal): Promise<TaskOutput<K>> {
+        if (signal?.aborted) {
+            return Promise.reject(signal.reason);
+        }
+        if (this.options.threads <= 0) {
+            computeQueueWait.labels({ task }).observe(0);
+            return new Promise((resolve) => resolve(computeTasks[task](input as any) as TaskOutput<K>));
+        }
+        if (this.queue.length >= this.options.maxQueue) {
+            this.rejected++;
+            return Promise.reject(new Error(`Compute queue is full (${this.queue.length} tasks waiting)`));
+        }
+
+        return new Promise((resolve, reject) => {
+            const job: Job = {
+                id: this.nextId++,
+                task,
+                input,
+                transfer: transferablesOf(input),
+                enqueuedAt: performance.now(),
+                resolve,
+                reject,
+            };
+            if (signal) {
+                const onAbort = () => {
+                    const index = this.queue.indexOf(job);
+                    if (index >= 0) {
+                        this.queue.splice(index, 1);
+                        this.cancelled++;
+                        reject(signal.reason);
+                    }
+                };
+                signal.addEventListener('abort', onAbort, { once: true });
+                job.detach = () => signal.removeEventListener('abort', onAbort);
+            }
+            this.queue.push(job);
+            this.dispatch();
+        });
+    }
+
+    /**
+     * Returns current pool statistics
+     * @returns {ComputePoolStats} Pool statistics
+     */
+    stats(): ComputePoolStats {
+        return {
+            threads: this.threads.length,
+            busy: this.threads.filter((thread) => thread.job).length,
+            queued: this.queue.length,
+            maxQueue: this.options.maxQueue,
+            completed: this.completed,
+            failed: this.failed,
+            rejected: this.rejected,
+            cancelled: this.cancelled,
+        };
+    }
+
+    /**
+     * Stops every thread; queued and running tasks are rejected
+     */
+    async close(): Promise<void> {
+        for (const job of this.queue.splice(0)) {
+            job.reject(new Error('Compute pool closed'));
+        }
+        const threads = this.threads.splice(0);
+        for (const thread of threads) {
+            thread.job?.reject(new Error('Compute pool closed'));
+            thread.job = undefined;
+        }
+        await Promise.all(threads.map((thread) => thread.worker.terminate()));
+    }
+
+    private dispatch(): void {
+        while (this.queue.length > 0) {
+            let thread = this.threads.find((candidate) => !candidate.job);
+            if (!thread && this.threads.length < this.options.threads) {
+                thread = this.spawn();
+            }
+            if (!thread) {
+                return;
+            }
+
+            const job = this.queue.shift()!;
+            job.detach?.();
+            computeQueueWait.labels({ task: job.task }).observe((performance.now() - job.enqueuedAt) / 1000);
+            thread.job = job;
+            thread.worker.postMessage({ id: job.id, task: job.task, input: job.input }, job.transfer);
+        }
+    }
+
+    private spawn(): Thread {
+        const thread: Thread = { worker: new Worker(WORKER_URL) };
+        thread.worker.unref();
+
+        thread.worker.on('message', (message: { id: number, result?: unknown, error?: string }) => {
+            const job = thread.job;
+            if (!job || job.id !== message.id) {
+                return;
+            }
+            thread.job = undefined;
+            if (message.error !== undefined) {
+                this.failed++;
+                job.reject(new Error(message.error));
+            } else {
+                this.completed++;
+                job.resolve(message.result);
+            }
+            this.dispatch();
+        });
+
+        const retire = (error: Error) => {
+            const index = this.threads.indexOf(thread);
+            if (index < 0) {
+                return;
+            }
+            this.threads.splice(index, 1);
+            if (thread.job) {
+                this.failed++;
+                thread.job.reject(error);
+                thread.job = undefined;
+            }
+            // A replacement is spawned on demand
+            this.dispatch();
+        };
+        thread.worker.on('error', retire);
+        thread.worker.on('exit', (code) => retire(new Error(`Compute thread exited with code ${code}`)));
+
+        this.threads.push(thread);
+        return thread;
+    }
+}
+
+let poolOptions: ComputePoolOptions = DEFAULT_COMPUTE_POOL_OPTIONS;
+let pool: WorkerPool | undefined;
+
+/**
+ * Sets the sizing of the shared pool; takes effect before its first use
+ * @param {Partial<ComputePoolOptions>} options - Options to override
+ */
+export function configureComputePool(options: Partial<ComputePoolOptions>): void {
+    poolOptions = { ...poolOptions, ...options };
+}
+
+/**
+ * Returns the shared compute pool, creating it on first use
+ * @returns {WorkerPool} Compute pool
+ */
+export function getComputePool(): WorkerPool {
+    if (!pool) {
+        pool = new WorkerPool(poolOptions);
+    }
+    return pool;
+}
+
+/**
+ * Returns statistics of the shared compute pool
+ * @returns {ComputePoolStats} Pool statistics
+ */
+export function getComputePoolStats(): ComputePoolStats {
+    return getComputePool().stats();
+}
@@ -0,0 +1,51 @@
+import { projectSeverities, stepsToMaxSeverity } from '../projection.js';
+
+/**
+ * Input of the project task
+ * @interface ProjectionTask
+ */
+export interface ProjectionTask {
+    initial: Float64Array;
+    weeklyRates: Float64Array;
+    stepWeeks: number;
+    horizon: number;
+    /** Compute steps until maximum severity instead of the full matrix */
+    summary: boolean;
+}
+
+/**
+ * CPU-heavy computations that can run on a worker thread. Inputs and
+ * outputs must survive structured cloning; typed arrays are the cheap way
+ * to move columns, since their buffers can be transferred or shared.
+ */
+export const computeTasks = {
+    /** Worsening projection for a batch of hazards */
+    project(task: ProjectionTask): Float64Array {
+        return task.summary
+            ? stepsToMaxSeverity(task.initial, task.weeklyRates, task.stepWeeks)
+            : projectSeverities(task.initial, task.weeklyRates, task.stepWeeks, task.horizon);
+    },
+};
+
+export type ComputeTasks = typeof computeTasks;
+export type ComputeTaskName = keyof ComputeTasks;
+
+/**
+ * Lists the buffers of a value that can be transferred rather than
+ * copied: those of typed arrays at its top level (or the value itself),
+ * excluding shared buffers, which are never copied anyway
+ * @param {unknown} value - Task input or output
+ * @returns {ArrayBuffer[]} Buffers to transfer
+ */
+export function transferablesOf(value: unknown): ArrayBuffer[] {
+    const candidates = ArrayBuffer.isView(value)
+        ? [value]
+        : value && typeof value === 'object' ? Object.values(value) : [];
+    const buffers = new Set<ArrayBuffer>();
+    for (const candidate of candidates) {
+        if (ArrayBuffer.isView(candidate) && candidate.buffer instanceof ArrayBuffer) {
+            buffers.add(candidate.buffer);
+        }
+    }
+    return Array.from(buffers);
+}
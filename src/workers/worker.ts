@@ -0,0 +1,15 @@
+import { parentPort } from 'worker_threads';
+import { computeTasks, ComputeTaskName, transferablesOf } from './tasks.js';
+
+/*
+ * Entry point of a compute thread. Runs one task per message and posts
+ * back either its result, with its buffers transferred, or the error.
+ */
+parentPort?.on('message', (message: { id: number, task: ComputeTaskName, input: any }) => {
+    try {
+        const result = computeTasks[message.task](message.input);
+        parentPort!.postMessage({ id: message.id, result }, transferablesOf(result));
+    } catch (error: any) {
+        parentPort!.postMessage({ id: message.id, error: error?.message ?? String(error) });
+    }
+});
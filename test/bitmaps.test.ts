@@ -0,0 +1,65 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { HazardBitmaps, HazardFilter, HazardStore } from '../src/data/index.js';
+import { generateHazards, seededRandom, StubHazard } from '../bench/stub.js';
+
+function matches(hazard: StubHazard, filter: HazardFilter): boolean {
+    const createdAt = Date.parse(hazard.created_at);
+    return (!filter.type || filter.type.includes(hazard.type))
+        && (!filter.status || filter.status.includes(hazard.status))
+        && (!filter.severity || filter.severity.includes(hazard.severity))
+        && (filter.min_severity === undefined || hazard.severity >= filter.min_severity)
+        && (!filter.area || filter.area.includes(hazard.area))
+        && (!filter.created_from || createdAt >= Date.parse(filter.created_from))
+        && (!filter.created_to || createdAt <= Date.parse(filter.created_to));
+}
+
+describe('HazardBitmaps', () => {
+    // Inserted in shuffled order so store order differs from id order
+    const hazards = generateHazards(12_000, 13);
+    const random = seededRandom(17);
+    const shuffled = [...hazards];
+    for (let i = shuffled.length - 1; i > 0; i--) {
+        const j = Math.floor(random() * (i + 1));
+        [shuffled[i], shuffled[j]] = [shuffled[j], shuffled[i]];
+    }
+    const store = new HazardStore();
+    for (const hazard of shuffled) {
+        store.upsert(hazard);
+    }
+    const bitmaps = new HazardBitmaps();
+    bitmaps.attach(store);
+
+    const filters: HazardFilter[] = [
+        {},
+        { type: ['pothole'] },
+        { type: ['pothole', 'crack'], status: ['open', 'in_progress'] },
+        { area: ['Harbor'], min_severity: 4 },
+        { severity: [1, 5], created_from: '2025-04-01', created_to: '2025-06-30T23:59:59Z' },
+        { type: ['no such type'] },
+    ];
+
+    for (const filter of filters) {
+        it(`counts and pages ${JSON.stringify(filter)} like a linear scan`, () => {
+            const expected = hazards.filter((hazard) => matches(hazard, filter)).map((hazard) => hazard.id);
+
+            assert.equal(bitmaps.query(filter, 'id', 0, 0).total, expected.length);
+
+            const { total, rows } = bitmaps.query(filter, 'id', 10, 25);
+            assert.equal(total, expected.length);
+            assert.deepEqual(rows.map((row) => store.ids[row]), expected.slice(10, 35));
+
+            const bySeverity = bitmaps.query(filter, 'severity', 0, 50).rows;
+            for (let i = 1; i < bySeverity.length; i++) {
+                assert.ok(store.severity[bySeverity[i - 1]] >= store.severity[bySeverity[i]]);
+            }
+        });
+    }
+
+    it('follows rows changed after it was attached', () => {
+        store.upsert({ ...hazards[0], type: 'brand new type' });
+        const { total, rows } = bitmaps.query({ type: ['brand new type'] }, 'id', 0, 10);
+        assert.equal(total, 1);
+        assert.equal(store.ids[rows[0]], hazards[0].id);
+    });
+});
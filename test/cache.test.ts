@@ -0,0 +1,103 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { setImmediate as tick } from 'node:timers/promises';
+import { TtlCache } from '../src/cache.js';
+
+const FRESH = { ttlMs: 60_000, staleMs: 0 };
+/** Expires at once but may be served stale for a minute */
+const ALWAYS_STALE = { ttlMs: 0, staleMs: 60_000 };
+
+/** Loader whose results are handed out one call at a time */
+function controlledLoader<V>() {
+    const pending: Array<{ resolve: (value: V) => void; reject: (error: Error) => void }> = [];
+    const load = () => new Promise<V>((resolve, reject) => pending.push({ resolve, reject }));
+    return { load, pending };
+}
+
+describe('TtlCache', () => {
+    it('answers from the cache while the value is fresh', async () => {
+        const cache = new TtlCache<number>(10);
+        let loads = 0;
+        const load = async () => ++loads;
+        assert.equal(await cache.get('a', FRESH, load), 1);
+        assert.equal(await cache.get('a', FRESH, load), 1);
+        assert.equal(loads, 1);
+        assert.deepEqual({ hits: cache.stats().hits, misses: cache.stats().misses }, { hits: 1, misses: 1 });
+    });
+
+    it('serves a stale value at once and refreshes it once in the background', async () => {
+        const cache = new TtlCache<string>(10);
+        const { load, pending } = controlledLoader<string>();
+
+        const first = cache.get('a', ALWAYS_STALE, load);
+        pending.shift()!.resolve('v1');
+        assert.equal(await first, 'v1');
+
+        // Both lookups get the stale value; only the first starts a refresh
+        assert.equal(await cache.get('a', ALWAYS_STALE, load), 'v1');
+        assert.equal(await cache.get('a', ALWAYS_STALE, load), 'v1');
+        assert.equal(pending.length, 1);
+        assert.equal(cache.stats().refreshes, 1);
+        assert.equal(cache.stats().staleHits, 2);
+
+        pending.shift()!.resolve('v2');
+        await tick();
+        assert.equal(await cache.get('a', ALWAYS_STALE, load), 'v2');
+    });
+
+    it('keeps the stale value when a refresh fails and tries again later', async () => {
+        const cache = new TtlCache<string>(10);
+        const { load, pending } = controlledLoader<string>();
+
+        const first = cache.get('a', ALWAYS_STALE, load);
+        pending.shift()!.resolve('v1');
+        await first;
+
+        assert.equal(await cache.get('a', ALWAYS_STALE, load), 'v1');
+        pending.shift()!.reject(new Error('upstream down'));
+        await tick();
+        assert.equal(cache.stats().refreshErrors, 1);
+
+        assert.equal(await cache.get('a', ALWAYS_STALE, load), 'v1');
+        assert.equal(pending.length, 1);
+        pending.shift()!.resolve('v2');
+        await tick();
+        assert.equal(await cache.get('a', ALWAYS_STALE, load), 'v2');
+    });
+
+    it('waits for the loader once the stale window has passed', async () => {
+        const cache = new TtlCache<number>(10);
+        let loads = 0;
+        const load = async () => ++loads;
+        const expired = { ttlMs: 0, staleMs: 0 };
+        assert.equal(await cache.get('a', expired, load), 1);
+        assert.equal(await cache.get('a', expired, load), 2);
+        assert.equal(cache.stats().misses, 2);
+    });
+
+    it('passes loader failures on without caching them', async () => {
+        const cache = new TtlCache<number>(10);
+        await assert.rejects(cache.get('a', FRESH, async () => { throw new Error('boom'); }), /boom/);
+        assert.equal(cache.stats().size, 0);
+        assert.equal(await cache.get('a', FRESH, async () => 7), 7);
+    });
+
+    it('evicts the least recently used value beyond its capacity', async () => {
+        const cache = new TtlCache<string>(2);
+        const loaded: string[] = [];
+        const loader = (key: string) => async () => {
+            loaded.push(key);
+            return key;
+        };
+        await cache.get('a', FRESH, loader('a'));
+        await cache.get('b', FRESH, loader('b'));
+        await cache.get('a', FRESH, loader('a'));
+        await cache.get('c', FRESH, loader('c'));
+        assert.equal(cache.stats().evictions, 1);
+
+        // b was least recently used, so a is still cached
+        await cache.get('a', FRESH, loader('a'));
+        await cache.get('b', FRESH, loader('b'));
+        assert.deepEqual(loaded, ['a', 'b', 'c', 'b']);
+    });
+});
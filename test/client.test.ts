@@ -0,0 +1,60 @@
+import { after, before, describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { createServer, Server } from 'node:http';
+import { AddressInfo } from 'node:net';
+import { ConnectionPool } from '../src/client.js';
+
+describe('ConnectionPool', () => {
+    let server: Server;
+    let url: string;
+
+    before(async () => {
+        server = createServer((req, res) => res.end(`hello ${req.url}`));
+        await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+        url = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+    });
+    after(() => new Promise<void>((resolve) => server.close(() => resolve())));
+
+    it('holds a slot until the body has been read and hands it on in order', async () => {
+        const pool = new ConnectionPool(url, 2);
+        const first = pool.fetch(`${url}/1`);
+        const second = pool.fetch(`${url}/2`);
+        const third = pool.fetch(`${url}/3`);
+        const [one, two] = await Promise.all([first, second]);
+        assert.equal(pool.stats().active, 2);
+        assert.equal(pool.stats().queued, 1);
+
+        // Having the headers is not enough; the body still holds the socket
+        assert.equal(await one.text(), 'hello /1');
+        assert.equal(await (await third).text(), 'hello /3');
+        await two.body!.cancel();
+
+        const stats = pool.stats();
+        assert.equal(stats.active, 0);
+        assert.equal(stats.peakActive, 2);
+        assert.equal(stats.totalRequests, 3);
+        assert.equal(stats.saturatedRequests, 1);
+    });
+
+    it('drops a request from the queue when its signal aborts', async () => {
+        const pool = new ConnectionPool(url, 1);
+        const held = await pool.fetch(`${url}/held`);
+        const controller = new AbortController();
+        const waiting = pool.fetch(`${url}/waiting`, { signal: controller.signal });
+        controller.abort(new Error('gave up'));
+        await assert.rejects(waiting, /gave up/);
+        assert.equal(pool.stats().queued, 0);
+        assert.equal(pool.stats().abandonedRequests, 1);
+
+        await held.text();
+        assert.equal(pool.stats().active, 0);
+        assert.equal(await (await pool.fetch(`${url}/next`)).text(), 'hello /next');
+    });
+
+    it('gives the slot back when the request fails', async () => {
+        const pool = new ConnectionPool('http://127.0.0.1:1', 1);
+        await assert.rejects(pool.fetch('http://127.0.0.1:1/'));
+        assert.equal(pool.stats().active, 0);
+        assert.equal(await (await pool.fetch(`${url}/after`)).text(), 'hello /after');
+    });
+});
@@ -0,0 +1,119 @@
+import { after, before, describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { createServer, get, IncomingMessage, Server, ServerResponse } from 'node:http';
+import { AddressInfo } from 'node:net';
+import { brotliDecompressSync, createGunzip, gunzipSync } from 'node:zlib';
+import { compressResponse, negotiateEncoding } from '../src/transport/compression.js';
+
+const THRESHOLD = 1024;
+const LARGE = JSON.stringify(Array.from({ length: 200 }, (_, id) => ({ id, type: 'pothole', status: 'open' })));
+
+/** Response bodies by path, each written the way a different caller writes */
+const handlers: Record<string, (res: ServerResponse) => void> = {
+    '/large': (res) => {
+        res.writeHead(200, { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(LARGE) });
+        res.end(LARGE);
+    },
+    '/small': (res) => {
+        res.writeHead(200, { 'Content-Type': 'application/json', 'Content-Length': 2 });
+        res.end('{}');
+    },
+    '/pieces': (res) => {
+        res.setHeader('Content-Type', 'application/json');
+        for (let i = 0; i < LARGE.length; i += 100) {
+            res.write(LARGE.slice(i, i + 100));
+        }
+        res.end();
+    },
+};
+
+describe('compressResponse', () => {
+    let server: Server;
+    let url: string;
+    let stream: ServerResponse | undefined;
+
+    before(async () => {
+        server = createServer((req, res) => {
+            compressResponse(req, res, THRESHOLD);
+            if (req.url === '/events') {
+                res.writeHead(200, { 'Content-Type': 'text/event-stream' });
+                res.flushHeaders();
+                res.write('data: first\n\n');
+                stream = res;
+                return;
+            }
+            handlers[req.url!](res);
+        });
+        await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+        url = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+    });
+    after(() => new Promise<void>((resolve) => server.close(() => resolve())));
+
+    const request = (path: string, acceptEncoding?: string) => new Promise<IncomingMessage>((resolve, reject) => {
+        get(`${url}${path}`, { headers: acceptEncoding ? { 'Accept-Encoding': acceptEncoding } : {} }, resolve).on('error', reject);
+    });
+
+    const fetchRaw = async (path: string, acceptEncoding?: string) => {
+        const res = await request(path, acceptEncoding);
+        const chunks: Buffer[] = [];
+        for await (const chunk of res) {
+            chunks.push(chunk);
+        }
+        return { headers: res.headers, body: Buffer.concat(chunks) };
+    };
+
+    it('negotiates the preferred encoding the client accepts', () => {
+        assert.equal(negotiateEncoding('gzip, deflate, br'), 'br');
+        assert.equal(negotiateEncoding('br;q=0.5, gzip'), 'gzip');
+        assert.equal(negotiateEncoding('br;q=0, *'), 'gzip');
+        assert.equal(negotiateEncoding('*'), 'br');
+        assert.equal(negotiateEncoding('deflate, identity'), undefined);
+        assert.equal(negotiateEncoding(undefined), undefined);
+    });
+
+    it('compresses a large body and drops its Content-Length', async () => {
+        const { headers, body } = await fetchRaw('/large', 'br');
+        assert.equal(headers['content-encoding'], 'br');
+        assert.equal(headers['content-length'], undefined);
+        assert.equal(headers.vary, 'Accept-Encoding');
+        assert.equal(brotliDecompressSync(body).toString(), LARGE);
+    });
+
+    it('compresses a body written in pieces once it passes the threshold', async () => {
+        const { headers, body } = await fetchRaw('/pieces', 'gzip');
+        assert.equal(headers['content-encoding'], 'gzip');
+        assert.equal(gunzipSync(body).toString(), LARGE);
+    });
+
+    it('sends a body under the threshold as it is', async () => {
+        const { headers, body } = await fetchRaw('/small', 'br, gzip');
+        assert.equal(headers['content-encoding'], undefined);
+        assert.equal(headers['content-length'], '2');
+        assert.equal(headers.vary, 'Accept-Encoding');
+        assert.equal(body.toString(), '{}');
+    });
+
+    it('leaves the response alone for a client that accepts no encoding', async () => {
+        const { headers, body } = await fetchRaw('/large');
+        assert.equal(headers['content-encoding'], undefined);
+        assert.equal(headers.vary, 'Accept-Encoding');
+        assert.equal(body.toString(), LARGE);
+    });
+
+    it('delivers each event of a stream as it is written', { timeout: 5_000 }, async () => {
+        const res = await request('/events', 'gzip');
+        assert.equal(res.headers['content-encoding'], 'gzip');
+        const events = res.pipe(createGunzip());
+
+        // The first event arrives while the stream is still open
+        const [first] = await new Promise<[Buffer]>((resolve) => events.once('data', (chunk) => resolve([chunk])));
+        assert.equal(first.toString(), 'data: first\n\n');
+
+        stream!.end('data: last\n\n');
+        const rest: Buffer[] = [];
+        for await (const chunk of events) {
+            rest.push(chunk);
+        }
+        assert.equal(Buffer.concat(rest).toString(), 'data: last\n\n');
+    });
+});
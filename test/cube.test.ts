@@ -0,0 +1,117 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { CubeDimension, CubeFilter, CubeGroup, HazardCube, HazardStore } from '../src/data/index.js';
+import { buildRpcs, generateHazards, StubHazard } from '../bench/stub.js';
+
+/** Monday of the week a timestamp falls in, as YYYY-MM-DD */
+function weekOf(timestamp: string): string {
+    const day = new Date(timestamp.slice(0, 10));
+    day.setUTCDate(day.getUTCDate() - (day.getUTCDay() + 6) % 7);
+    return day.toISOString().slice(0, 10);
+}
+
+function valueOf(hazard: StubHazard, dimension: CubeDimension): string | number {
+    return dimension === 'week' ? weekOf(hazard.created_at) : hazard[dimension];
+}
+
+/** Counts hazards by group the slow way */
+function bruteForce(hazards: StubHazard[], groupBy: CubeDimension[], filter: CubeFilter): Map<string, number> {
+    const counts = new Map<string, number>();
+    for (const hazard of hazards) {
+        if ((filter.type && !filter.type.includes(hazard.type))
+            || (filter.status && !filter.status.includes(hazard.status))
+            || (filter.severity && !filter.severity.includes(hazard.severity))
+            || (filter.area && !filter.area.includes(hazard.area))
+            || (filter.week_from && weekOf(hazard.created_at) < weekOf(filter.week_from))
+            || (filter.week_to && weekOf(hazard.created_at) > weekOf(filter.week_to))) {
+            continue;
+        }
+        const key = JSON.stringify(groupBy.map((dimension) => valueOf(hazard, dimension)));
+        counts.set(key, (counts.get(key) || 0) + 1);
+    }
+    return counts;
+}
+
+/** Groups of equal count come back in no particular order */
+function byCount<T extends { count: number }>(groups: T[]): T[] {
+    return [...groups].sort((a, b) => b.count - a.count || JSON.stringify(a).localeCompare(JSON.stringify(b)));
+}
+
+function byKey(groups: CubeGroup[], groupBy: CubeDimension[]): Map<string, number> {
+    return new Map(groups.map((group) => [JSON.stringify(groupBy.map((dimension) => group[dimension])), group.count]));
+}
+
+describe('HazardCube', () => {
+    const hazards = generateHazards(20_000, 3);
+    const store = new HazardStore();
+    for (const hazard of hazards) {
+        store.upsert(hazard);
+    }
+    const cube = new HazardCube();
+    cube.attach(store);
+
+    const cases: Array<[CubeDimension[], CubeFilter]> = [
+        [[], {}],
+        [['type'], {}],
+        [['status'], {}],
+        [['type', 'status', 'severity', 'area'], {}],
+        [['week'], {}],
+        [['area', 'week'], { week_from: '2025-03-01', week_to: '2025-05-31' }],
+        [['severity'], { type: ['pothole', 'sinkhole'], status: ['open'] }],
+        [['type'], { severity: [4, 5], area: ['Harbor', 'Nowhere'] }],
+        [['status'], { type: ['no such type'] }],
+    ];
+
+    for (const [groupBy, filter] of cases) {
+        it(`matches a brute-force count grouped by [${groupBy.join(', ')}] with ${JSON.stringify(filter)}`, () => {
+            const expected = bruteForce(hazards, groupBy, filter);
+            const { total, groups } = cube.rollup(groupBy, filter);
+            assert.deepEqual(byKey(groups, groupBy), expected);
+            assert.equal(total, Array.from(expected.values()).reduce((sum, count) => sum + count, 0));
+            for (let i = 1; i < groups.length; i++) {
+                assert.ok(groups[i - 1].count >= groups[i].count);
+            }
+        });
+    }
+
+    it('answers counts_by_type and open_vs_resolved exactly as the RPCs do', () => {
+        const rpcs = buildRpcs(hazards);
+        assert.deepEqual(byCount(cube.countsByType()), byCount(rpcs.counts_by_type({}) as any[]));
+
+        const expected = rpcs.open_vs_resolved({}) as any;
+        const actual = cube.openVsResolved();
+        assert.deepEqual({ ...actual, by_status: byCount(actual.by_status) }, { ...expected, by_status: byCount(expected.by_status) });
+    });
+
+    it('follows rows changed after it was attached', () => {
+        const changed = hazards.map((hazard) => hazard.id % 7 === 0
+            ? { ...hazard, status: 'resolved', severity: 1 + (hazard.severity % 5), type: 'debris' }
+            : hazard);
+        for (const hazard of changed) {
+            store.upsert(hazard);
+        }
+        const extra = { ...hazards[0], id: hazards.length + 1, area: 'Brand New' };
+        store.upsert(extra);
+        changed.push(extra);
+
+        const groupBy: CubeDimension[] = ['type', 'status', 'severity', 'area'];
+        assert.deepEqual(byKey(cube.rollup(groupBy).groups, groupBy), bruteForce(changed, groupBy, {}));
+        assert.equal(cube.isComplete(), true);
+    });
+});
+
+describe('HazardCube overflow', () => {
+    it('reports itself incomplete once a dimension outgrows its key bits', () => {
+        const store = new HazardStore();
+        const cube = new HazardCube();
+        cube.attach(store);
+        // Code 0 stands for null, leaving 1023 type codes
+        for (let id = 1; id <= 1023; id++) {
+            store.upsert({ id, type: `type ${id}`, status: 'open', severity: 1 });
+        }
+        assert.equal(cube.isComplete(), true);
+
+        store.upsert({ id: 1024, type: 'type 1024', status: 'open', severity: 1 });
+        assert.equal(cube.isComplete(), false);
+    });
+});
@@ -0,0 +1,96 @@
+import { afterEach, describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { setTimeout as sleep } from 'node:timers/promises';
+import {
+    abortable,
+    configureDeadlines,
+    DEFAULT_DEADLINE_OPTIONS,
+    isDeadlineExceeded,
+    parseToolDeadlines,
+    toolDeadlineMs,
+    toolSignal,
+    withRequestSignal
+} from '../src/deadlines.js';
+
+describe('parseToolDeadlines', () => {
+    it('reads tool=ms pairs', () => {
+        assert.deepEqual(parseToolDeadlines('query_hazards=5000, project_worsening = 0,'), {
+            query_hazards: 5000,
+            project_worsening: 0,
+        });
+        assert.deepEqual(parseToolDeadlines(''), {});
+    });
+
+    it('refuses entries without a tool or a non-negative number', () => {
+        for (const value of ['query_hazards', '=100', 'query_hazards=-1', 'query_hazards=soon']) {
+            assert.throws(() => parseToolDeadlines(value), /Invalid tool deadline/, value);
+        }
+    });
+});
+
+describe('toolSignal', () => {
+    afterEach(() => configureDeadlines(DEFAULT_DEADLINE_OPTIONS));
+
+    it('uses the tool deadline, then the default', () => {
+        configureDeadlines({ defaultMs: 1_000, tools: { slow: 5_000, unlimited: 0 } });
+        assert.equal(toolDeadlineMs('slow'), 5_000);
+        assert.equal(toolDeadlineMs('unlimited'), 0);
+        assert.equal(toolDeadlineMs('other'), 1_000);
+    });
+
+    it('aborts once the deadline passes', async () => {
+        configureDeadlines({ tools: { quick: 20 } });
+        const signal = toolSignal('quick');
+        assert.equal(signal.aborted, false);
+        // Timeout signals do not keep the process alive, so wait on a timer of our own
+        await sleep(100);
+        assert.equal(signal.aborted, true);
+        assert.equal(isDeadlineExceeded(signal), true);
+    });
+
+    it('aborts with the call or the request it runs under', () => {
+        configureDeadlines({ defaultMs: 0 });
+        const call = new AbortController();
+        const fromCall = toolSignal('any', call.signal);
+        call.abort(new Error('cancelled by client'));
+        assert.equal(fromCall.aborted, true);
+        assert.equal(isDeadlineExceeded(fromCall), false);
+
+        const request = new AbortController();
+        const fromRequest = withRequestSignal(request.signal, () => toolSignal('any'));
+        // Outside the request the tool has nothing to abort it
+        assert.equal(toolSignal('any').aborted, false);
+        request.abort();
+        assert.equal(fromRequest.aborted, true);
+    });
+
+    it('keeps the request signal across awaits', async () => {
+        configureDeadlines({ defaultMs: 0 });
+        const request = new AbortController();
+        const signal = await withRequestSignal(request.signal, async () => {
+            await new Promise((resolve) => setImmediate(resolve));
+            return toolSignal('any');
+        });
+        request.abort();
+        assert.equal(signal.aborted, true);
+    });
+});
+
+describe('abortable', () => {
+    it('settles with the promise while the signal holds', async () => {
+        const controller = new AbortController();
+        assert.equal(await abortable(Promise.resolve(4), controller.signal), 4);
+        await assert.rejects(abortable(Promise.reject(new Error('failed')), controller.signal), /failed/);
+    });
+
+    it('rejects as soon as the signal aborts, without waiting for the promise', async () => {
+        const controller = new AbortController();
+        const never = new Promise(() => {});
+        const waiting = abortable(never, controller.signal);
+        controller.abort(new Error('gave up'));
+        await assert.rejects(waiting, /gave up/);
+
+        const late = Promise.reject(new Error('ignored'));
+        await assert.rejects(abortable(late, controller.signal), /gave up/);
+    });
+});
@@ -0,0 +1,63 @@
+import { after, describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { mkdtemp, rm, writeFile } from 'node:fs/promises';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { getHazardMirror, MemoryBackend } from '../src/data/index.js';
+import { HazardLocations } from '../src/geo/index.js';
+import { generateHazards } from '../bench/stub.js';
+
+/** Memory backend that counts the box pages read from it */
+class CountingBackend extends MemoryBackend {
+    boxPages = 0;
+
+    async hazardsInBox(minLat: number, minLng: number, maxLat: number, maxLng: number, afterId: any, limit: number, signal?: AbortSignal) {
+        this.boxPages++;
+        return super.hazardsInBox(minLat, minLng, maxLat, maxLng, afterId, limit, signal);
+    }
+}
+
+describe('HazardLocations', async () => {
+    const dir = await mkdtemp(join(tmpdir(), 'pothole-locations-'));
+    after(() => rm(dir, { recursive: true, force: true }));
+
+    const hazards = generateHazards(5000, 31);
+    const path = join(dir, 'hazards.json');
+    await writeFile(path, JSON.stringify(hazards));
+
+    const queries: Array<[number, number, number]> = [
+        [40.7, -73.95, 2_000],
+        [40.6, -74.1, 500],
+        [40.72, -73.95, 50_000],
+        [0, 0, 50_000],
+    ];
+
+    it('answers the same from the backend while the mirror is stale as from the index', async () => {
+        const backend = new CountingBackend(path);
+        const mirror = getHazardMirror(backend);
+        const locations = new HazardLocations(mirror, backend);
+        // A mirror that has fallen behind and never catches up
+        const lagging = Object.assign(Object.create(mirror), { isFresh: () => false });
+        const fallback = new HazardLocations(lagging, backend);
+
+        const stale = [];
+        for (const [lat, lng, radius] of queries) {
+            stale.push({
+                nearest: await fallback.nearest(lat, lng),
+                radius: await fallback.withinRadius(lat, lng, radius, 25, 'distance'),
+            });
+        }
+        // The 50 km box holds every hazard, so it took several pages to read
+        assert.ok(backend.boxPages > queries.length + 4);
+        assert.equal(stale[2].radius.total, hazards.length);
+
+        await mirror.ready();
+        assert.equal(mirror.isFresh(), true);
+        for (const [i, [lat, lng, radius]] of queries.entries()) {
+            const fresh = await locations.withinRadius(lat, lng, radius, 25, 'distance');
+            assert.equal(stale[i].radius.total, fresh.total);
+            assert.deepEqual(stale[i].radius.hazards.map((hazard) => hazard.id), fresh.hazards.map((hazard) => hazard.id));
+            assert.equal(stale[i].nearest?.id, (await locations.nearest(lat, lng))?.id);
+        }
+    });
+});
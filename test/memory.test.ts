@@ -0,0 +1,98 @@
+import { after, describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { mkdtemp, rm, writeFile } from 'node:fs/promises';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { AnalyticsRpc, HazardStore, MemoryBackend, writeSnapshot } from '../src/data/index.js';
+import { buildRpcs, generateHazards } from '../bench/stub.js';
+
+/** Groups of equal count come back in no particular order */
+function byCount<T extends { count: number }>(groups: T[]): T[] {
+    return [...groups].sort((a, b) => b.count - a.count || JSON.stringify(a).localeCompare(JSON.stringify(b)));
+}
+
+describe('MemoryBackend', async () => {
+    const dir = await mkdtemp(join(tmpdir(), 'pothole-memory-'));
+    after(() => rm(dir, { recursive: true, force: true }));
+
+    const hazards = generateHazards(5000, 21);
+    // The stub's RPCs answer the way the Supabase functions do
+    const rpcs = buildRpcs(hazards);
+
+    const jsonPath = join(dir, 'hazards.json');
+    await writeFile(jsonPath, JSON.stringify(hazards));
+    const snapshotPath = join(dir, 'hazards.snapshot');
+    const store = new HazardStore();
+    for (const hazard of hazards) {
+        store.upsert(hazard);
+    }
+    await writeSnapshot(snapshotPath, store, { fullLoadAt: 0 });
+
+    for (const [source, path] of [['a JSON file', jsonPath], ['a snapshot', snapshotPath]]) {
+        describe(`loaded from ${source}`, () => {
+            const backend = new MemoryBackend(path);
+            const rpc = async (kind: AnalyticsRpc, area?: string) => {
+                const { data, error } = await backend.rpc(kind, area);
+                assert.equal(error, null);
+                return data;
+            };
+
+            it('answers counts_by_type like the RPC', async () => {
+                assert.deepEqual(byCount(await rpc('counts_by_type')), byCount(rpcs.counts_by_type({}) as any[]));
+            });
+
+            it('answers open_vs_resolved like the RPC', async () => {
+                const expected = rpcs.open_vs_resolved({}) as any;
+                const actual = await rpc('open_vs_resolved');
+                assert.deepEqual(Object.keys(actual).sort(), Object.keys(expected).sort());
+                assert.equal(actual.open, expected.open);
+                assert.equal(actual.resolved, expected.resolved);
+                assert.deepEqual(byCount(actual.by_status), byCount(expected.by_status));
+            });
+
+            it('answers area_with_most_hazards like the RPC', async () => {
+                const expected = rpcs.area_with_most_hazards({}) as any[];
+                const actual = await rpc('area_with_most_hazards');
+                assert.equal(actual.length, 1);
+                assert.deepEqual(Object.keys(actual[0]).sort(), Object.keys(expected[0]).sort());
+                assert.equal(actual[0].count, expected[0].count);
+            });
+
+            it('answers top_severe_in_area like the RPC', async () => {
+                for (const area of ['Downtown', 'Harbor', 'Airport', 'Nowhere']) {
+                    assert.deepEqual(await rpc('top_severe_in_area', area), rpcs.top_severe_in_area({ area_name: area }), area);
+                }
+            });
+
+            it('pages through every hazard in id order', async () => {
+                const ids: number[] = [];
+                let afterId: number | undefined;
+                for (;;) {
+                    const { data } = await backend.pageById(afterId, 777);
+                    if (!data || data.length === 0) {
+                        break;
+                    }
+                    ids.push(...data.map((hazard) => hazard.id));
+                    afterId = ids[ids.length - 1];
+                }
+                assert.deepEqual(ids, hazards.map((hazard) => hazard.id));
+            });
+
+            it('pages through the hazards inside a box in id order', async () => {
+                const found: any[] = [];
+                let afterId: number | undefined;
+                for (;;) {
+                    const { data } = await backend.hazardsInBox(40.6, -74.0, 40.7, -73.9, afterId, 50);
+                    found.push(...data!);
+                    if (data!.length < 50) {
+                        break;
+                    }
+                    afterId = data![data!.length - 1].id;
+                }
+                const expected = hazards.filter((hazard) => hazard.lat >= 40.6 && hazard.lat <= 40.7 && hazard.lng >= -74.0 && hazard.lng <= -73.9);
+                assert.ok(expected.length > 50);
+                assert.deepEqual(found, expected);
+            });
+        });
+    }
+});
@@ -0,0 +1,65 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { MAX_SEVERITY, projectSeverities, STEP_WEEKS, stepsToMaxSeverity } from '../src/projection.js';
+import { seededRandom } from '../bench/stub.js';
+
+/** The step-by-step projection project_worsening used to run per hazard */
+function projectByLoop(severity: number, weeklyRate: number, stepWeeks: number, horizon: number): number[] {
+    const projections: number[] = [];
+    let current = severity;
+    for (let t = 0; t < horizon; t++) {
+        current += weeklyRate * stepWeeks;
+        projections.push(Math.min(MAX_SEVERITY, Math.round(current * 10) / 10));
+    }
+    return projections;
+}
+
+describe('projectSeverities', () => {
+    const random = seededRandom(19);
+    const count = 500;
+    const initial = Float64Array.from({ length: count }, () => 1 + Math.floor(random() * 5));
+    const rates = Float64Array.from({ length: count }, () => random() * 0.6);
+    // Hazards already at the ceiling, that never worsen, and that cap on the first step
+    initial[0] = MAX_SEVERITY;
+    rates[1] = 0;
+    rates[2] = 10;
+
+    for (const step of ['day', 'week', 'month'] as const) {
+        it(`matches the step-by-step loop for ${step} steps`, () => {
+            const horizon = 26;
+            const matrix = projectSeverities(initial, rates, STEP_WEEKS[step], horizon);
+            assert.equal(matrix.length, count * horizon);
+            let edges = 0;
+            for (let i = 0; i < count; i++) {
+                const expected = projectByLoop(initial[i], rates[i], STEP_WEEKS[step], horizon);
+                const actual = Array.from(matrix.subarray(i * horizon, (i + 1) * horizon));
+                for (let t = 0; t < horizon; t++) {
+                    if (actual[t] !== expected[t]) {
+                        // Summing step by step drifts by an ulp or so, which can only tip a value across a rounding edge
+                        assert.ok(Math.abs(actual[t] - expected[t]) <= 0.1 + 1e-9, `hazard ${i} step ${t}: ${actual[t]} vs ${expected[t]}`);
+                        edges++;
+                    }
+                }
+            }
+            assert.ok(edges < count * horizon / 100, `${edges} values differ`);
+        });
+    }
+
+    it('agrees with the loop exactly away from rounding edges', () => {
+        const matrix = projectSeverities(Float64Array.from([2, 3.5]), Float64Array.from([0.25, 0.3]), 1, 8);
+        assert.deepEqual(Array.from(matrix), [...projectByLoop(2, 0.25, 1, 8), ...projectByLoop(3.5, 0.3, 1, 8)]);
+    });
+});
+
+describe('stepsToMaxSeverity', () => {
+    it('counts the steps until the projection reaches the ceiling', () => {
+        const initial = Float64Array.from([5, 3, 2, 4.5]);
+        const rates = Float64Array.from([0.5, 0, 0.5, 1]);
+        assert.deepEqual(Array.from(stepsToMaxSeverity(initial, rates, 1)), [0, Infinity, 6, 0.5]);
+        assert.deepEqual(Array.from(stepsToMaxSeverity(initial, rates, 2)), [0, Infinity, 3, 0.25]);
+
+        const matrix = projectSeverities(initial, rates, 1, 8);
+        assert.equal(matrix[2 * 8 + 5], MAX_SEVERITY);
+        assert.ok(matrix[2 * 8 + 4] < MAX_SEVERITY);
+    });
+});
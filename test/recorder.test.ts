@@ -0,0 +1,100 @@
+import { after, describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { mkdir, mkdtemp, readFile, rm } from 'node:fs/promises';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { Readable } from 'node:stream';
+import { readJsonBody, RecordedRequest, sanitizeBody, TrafficRecorder } from '../src/transport/recorder.js';
+
+async function readRecording(path: string): Promise<RecordedRequest[]> {
+    const text = await readFile(path, 'utf8');
+    return text.split('\n').filter(Boolean).map((line) => JSON.parse(line));
+}
+
+describe('sanitizeBody', () => {
+    it('redacts secrets and drops _meta at any depth', () => {
+        const body = [{
+            jsonrpc: '2.0',
+            method: 'tools/call',
+            params: {
+                name: 'query_hazards',
+                arguments: { area: 'Downtown', apiKey: 'k', nested: { Authorization: 'Bearer x', severity: 3 } },
+                _meta: { progressToken: 7 },
+            },
+        }];
+        assert.deepEqual(sanitizeBody(body), [{
+            jsonrpc: '2.0',
+            method: 'tools/call',
+            params: {
+                name: 'query_hazards',
+                arguments: { area: 'Downtown', apiKey: '[redacted]', nested: { Authorization: '[redacted]', severity: 3 } },
+            },
+        }]);
+        // The original is left as it was
+        assert.equal((body[0].params.arguments as any).apiKey, 'k');
+    });
+});
+
+describe('readJsonBody', () => {
+    it('parses a body sent in pieces', async () => {
+        const req = Readable.from([Buffer.from('{"jsonrpc":'), Buffer.from('"2.0","id":1}')]);
+        assert.deepEqual(await readJsonBody(req as any), { jsonrpc: '2.0', id: 1 });
+    });
+
+    it('refuses bodies that are too large or not JSON', async () => {
+        const huge = Readable.from(Array.from({ length: 5 }, () => Buffer.alloc(1024 * 1024, 32)));
+        await assert.rejects(readJsonBody(huge as any), /too large/);
+        await assert.rejects(readJsonBody(Readable.from([Buffer.from('{oops')]) as any), SyntaxError);
+    });
+});
+
+describe('TrafficRecorder', async () => {
+    const dir = await mkdtemp(join(tmpdir(), 'pothole-recorder-'));
+    after(() => rm(dir, { recursive: true, force: true }));
+
+    it('appends sanitized requests in order with offsets from the origin', async () => {
+        const path = join(dir, 'traffic.jsonl');
+        const recorder = new TrafficRecorder(path, 1_000, 2);
+        // Enough lines to pass the flush size a few times over
+        for (let i = 0; i < 2_000; i++) {
+            recorder.record(1_000 + i, i % 2 ? 'session-1' : undefined, { id: i, params: { token: 'secret', padding: 'x'.repeat(100) } });
+        }
+        await recorder.close();
+
+        const lines = await readRecording(path);
+        assert.equal(lines.length, 2_000);
+        lines.forEach((line, i) => {
+            assert.equal(line.t, i);
+            assert.equal(line.worker, 2);
+            assert.equal(line.session, i % 2 ? 'session-1' : undefined);
+            assert.deepEqual(line.body, { id: i, params: { token: '[redacted]', padding: 'x'.repeat(100) } });
+        });
+        assert.deepEqual(recorder.stats(), { path, recorded: 2_000, dropped: 0, writeErrors: 0 });
+    });
+
+    it('lets several recorders append to the same file', async () => {
+        const path = join(dir, 'shared.jsonl');
+        const first = new TrafficRecorder(path, 0, 0);
+        const second = new TrafficRecorder(path, 0, 1);
+        first.record(1, undefined, { id: 'a' });
+        second.record(2, undefined, { id: 'b' });
+        await Promise.all([first.close(), second.close()]);
+        const lines = await readRecording(path);
+        assert.deepEqual(lines.map((line) => line.worker).sort(), [0, 1]);
+    });
+
+    it('opens the file again after a failed open', async () => {
+        const path = join(dir, 'later', 'traffic.jsonl');
+        const recorder = new TrafficRecorder(path, 0);
+        recorder.record(1, undefined, { id: 1 });
+        await recorder.flush();
+        assert.equal(recorder.stats().writeErrors, 1);
+
+        await mkdir(join(dir, 'later'));
+        recorder.record(2, undefined, { id: 2 });
+        await recorder.close();
+        const lines = await readRecording(path);
+        assert.deepEqual(lines.map((line) => line.body), [{ id: 2 }]);
+        assert.equal(recorder.stats().writeErrors, 1);
+    });
+});
@@ -0,0 +1,93 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { RoaringBitmap } from '../src/data/index.js';
+import { seededRandom } from '../bench/stub.js';
+
+/** Random values in [0, span), roughly density * span of them */
+function sample(random: () => number, span: number, density: number, offset: number = 0): Set<number> {
+    const values = new Set<number>();
+    for (let i = 0; i < span * density; i++) {
+        values.add(offset + Math.floor(random() * span));
+    }
+    return values;
+}
+
+function bitmapOf(values: Iterable<number>): RoaringBitmap {
+    const bitmap = new RoaringBitmap();
+    for (const value of values) {
+        bitmap.add(value);
+    }
+    return bitmap;
+}
+
+function valuesOf(bitmap: RoaringBitmap): number[] {
+    const values: number[] = [];
+    bitmap.forEach((value) => values.push(value));
+    return values;
+}
+
+function sorted(values: Iterable<number>): number[] {
+    return Array.from(values).sort((a, b) => a - b);
+}
+
+describe('RoaringBitmap', () => {
+    const random = seededRandom(11);
+    // Sparse chunks stay arrays; dense ones (over 4096 values) become bitmaps
+    const shapes: { [name: string]: Set<number> } = {
+        empty: new Set(),
+        sparse: sample(random, 200_000, 0.01),
+        dense: sample(random, 200_000, 0.3),
+        mixed: new Set([...sample(random, 65_536, 0.5), ...sample(random, 65_536, 0.01, 65_536), ...sample(random, 65_536, 0.4, 4 * 65_536)]),
+        high: sample(random, 1_000_000, 0.002, 2 ** 32 - 2_000_000),
+    };
+
+    it('holds exactly the values added, in ascending order', () => {
+        for (const [name, values] of Object.entries(shapes)) {
+            const bitmap = bitmapOf(values);
+            assert.equal(bitmap.size, values.size, name);
+            assert.deepEqual(valuesOf(bitmap), sorted(values), name);
+        }
+    });
+
+    for (const [leftName, left] of Object.entries(shapes)) {
+        for (const [rightName, right] of Object.entries(shapes)) {
+            it(`intersects and unites ${leftName} with ${rightName}`, () => {
+                const a = bitmapOf(left);
+                const b = bitmapOf(right);
+
+                const both = a.and(b);
+                assert.deepEqual(valuesOf(both), sorted([...left].filter((value) => right.has(value))));
+                assert.equal(both.size, [...left].filter((value) => right.has(value)).length);
+
+                const either = a.or(b);
+                assert.deepEqual(valuesOf(either), sorted(new Set([...left, ...right])));
+
+                // Operands are left untouched
+                assert.equal(a.size, left.size);
+                assert.equal(b.size, right.size);
+            });
+        }
+    }
+
+    it('converts dense chunks back when values are removed', () => {
+        const values = sample(random, 65_536, 0.5);
+        const bitmap = bitmapOf(values);
+        const kept = new Set<number>();
+        for (const value of values) {
+            if (kept.size < 100) {
+                kept.add(value);
+            } else {
+                bitmap.remove(value);
+            }
+        }
+        assert.equal(bitmap.size, kept.size);
+        assert.deepEqual(valuesOf(bitmap), sorted(kept));
+        assert.deepEqual(valuesOf(bitmap.and(bitmapOf(values))), sorted(kept));
+
+        for (const value of kept) {
+            bitmap.remove(value);
+        }
+        assert.equal(bitmap.size, 0);
+        assert.equal(bitmap.has([...kept][0]), false);
+    });
+});
@@ -0,0 +1,76 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { SessionStore } from '../src/transport/sessions.js';
+
+/** Stores a session whose server records when it is closed */
+function addSession(store: SessionStore, sessionId: string, closed: string[]): void {
+    assert.equal(store.reserve(), true);
+    const server = { close: async () => { closed.push(sessionId); } };
+    store.add(sessionId, {} as any, server as any);
+}
+
+describe('SessionStore', () => {
+    it('evicts the least recently used idle session at the cap', () => {
+        const store = new SessionStore();
+        store.start(3, 60_000);
+        const closed: string[] = [];
+        addSession(store, 'a', closed);
+        addSession(store, 'b', closed);
+        addSession(store, 'c', closed);
+
+        // Touching a makes b the oldest
+        const a = store.begin('a')!;
+        store.end('a', a);
+        addSession(store, 'd', closed);
+        assert.deepEqual(closed, ['b']);
+        assert.equal(store.begin('b'), undefined);
+        assert.equal(store.size, 3);
+        assert.equal(store.stats().evictedLru, 1);
+    });
+
+    it('never evicts a session with an open request', () => {
+        const store = new SessionStore();
+        store.start(2, 60_000);
+        const closed: string[] = [];
+        addSession(store, 'a', closed);
+        addSession(store, 'b', closed);
+
+        const a = store.begin('a')!;
+        const b = store.begin('b')!;
+        assert.equal(store.reserve(), false);
+        assert.equal(store.stats().rejected, 1);
+
+        // Once b is done it is the only candidate, even though a is older
+        store.end('b', b);
+        addSession(store, 'c', closed);
+        assert.deepEqual(closed, ['b']);
+        assert.ok(store.begin('a'));
+        store.end('a', a);
+    });
+
+    it('counts reservations against the cap until they are used or given back', () => {
+        const store = new SessionStore();
+        store.start(1, 60_000);
+        assert.equal(store.reserve(), true);
+        assert.equal(store.reserve(), false);
+        store.cancelReservation();
+        assert.equal(store.reserve(), true);
+        assert.equal(store.stats().pending, 1);
+    });
+
+    it('sweeps out sessions idle past the TTL but keeps busy ones', () => {
+        const store = new SessionStore();
+        store.start(10, 1_000);
+        const closed: string[] = [];
+        addSession(store, 'a', closed);
+        addSession(store, 'b', closed);
+        addSession(store, 'c', closed);
+        store.begin('b');
+
+        assert.equal(store.sweep(Date.now()), 0);
+        assert.equal(store.sweep(Date.now() + 1_000), 2);
+        assert.deepEqual(closed, ['a', 'c']);
+        assert.equal(store.size, 1);
+        assert.equal(store.stats().evictedIdle, 2);
+    });
+});
@@ -0,0 +1,96 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { setImmediate as tick } from 'node:timers/promises';
+import { SingleFlight } from '../src/singleflight.js';
+
+/** Upstream call that settles when told to and records whether it was aborted */
+function controlledCall<T>() {
+    const call = {
+        started: 0,
+        signal: undefined as AbortSignal | undefined,
+        resolve: (_: T) => {},
+        fn: (signal: AbortSignal) => {
+            call.started++;
+            call.signal = signal;
+            return new Promise<T>((resolve) => {
+                call.resolve = resolve;
+            });
+        },
+    };
+    return call;
+}
+
+describe('SingleFlight', () => {
+    it('shares one call between concurrent callers of a key', async () => {
+        const group = new SingleFlight();
+        const call = controlledCall<number>();
+        const results = [group.do('a', call.fn), group.do('a', call.fn), group.do('b', async () => 2)];
+        assert.equal(call.started, 1);
+        call.resolve(1);
+        assert.deepEqual(await Promise.all(results), [1, 1, 2]);
+        assert.equal(group.stats().deduplicated, 1);
+        assert.equal(group.stats().inflight, 0);
+
+        // Settled calls are not reused
+        await group.do('a', async () => 3);
+        assert.equal(call.started, 1);
+    });
+
+    it('aborts the shared call only when every caller has given up', async () => {
+        const group = new SingleFlight();
+        const call = controlledCall<number>();
+        const first = new AbortController();
+        const second = new AbortController();
+        const waits = [group.do('a', call.fn, first.signal), group.do('a', call.fn, second.signal)];
+
+        first.abort(new Error('first gave up'));
+        await assert.rejects(waits[0], /first gave up/);
+        assert.equal(call.signal!.aborted, false);
+
+        second.abort(new Error('second gave up'));
+        await assert.rejects(waits[1], /second gave up/);
+        assert.equal(call.signal!.aborted, true);
+        assert.equal(group.stats().cancelled, 1);
+    });
+
+    it('keeps the call running for a caller without a signal', async () => {
+        const group = new SingleFlight();
+        const call = controlledCall<number>();
+        const controller = new AbortController();
+        const cancellable = group.do('a', call.fn, controller.signal);
+        const steadfast = group.do('a', call.fn);
+
+        controller.abort(new Error('gave up'));
+        await assert.rejects(cancellable, /gave up/);
+        assert.equal(call.signal!.aborted, false);
+        call.resolve(5);
+        assert.equal(await steadfast, 5);
+        assert.equal(group.stats().cancelled, 0);
+    });
+
+    it('starts afresh rather than joining a call that was aborted', async () => {
+        const group = new SingleFlight();
+        const aborted = controlledCall<number>();
+        const controller = new AbortController();
+        const wait = group.do('a', aborted.fn, controller.signal);
+        controller.abort(new Error('gave up'));
+        await assert.rejects(wait, /gave up/);
+
+        // The aborted call has not settled yet, but a new caller gets a new call
+        const fresh = controlledCall<number>();
+        const result = group.do('a', fresh.fn);
+        assert.equal(fresh.started, 1);
+        fresh.resolve(9);
+        aborted.resolve(0);
+        assert.equal(await result, 9);
+        await tick();
+        assert.equal(group.stats().inflight, 0);
+    });
+
+    it('rejects at once for a signal that has already aborted', async () => {
+        const group = new SingleFlight();
+        const call = controlledCall<number>();
+        await assert.rejects(group.do('a', call.fn, AbortSignal.abort(new Error('too late'))), /too late/);
+        assert.equal(call.started, 0);
+    });
+});
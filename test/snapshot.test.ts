@@ -0,0 +1,63 @@
+import { after, describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { mkdtemp, rm, writeFile } from 'node:fs/promises';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { HazardStore, readSnapshot, writeSnapshot } from '../src/data/index.js';
+import { generateHazards } from '../bench/stub.js';
+
+describe('hazard snapshots', async () => {
+    const dir = await mkdtemp(join(tmpdir(), 'pothole-snapshot-'));
+    after(() => rm(dir, { recursive: true, force: true }));
+
+    it('round-trips every row and the sync state', async () => {
+        const hazards = generateHazards(2000, 7);
+        const store = new HazardStore();
+        for (const hazard of hazards) {
+            store.upsert(hazard);
+        }
+        // Rows missing optional columns come back as nulls
+        store.upsert({ id: 9999, severity: 2 });
+
+        const path = join(dir, 'numeric.snapshot');
+        await writeSnapshot(path, store, { watermark: '2025-06-01T00:00:00.000Z', fullLoadAt: 1234 });
+        const restored = await readSnapshot(path);
+
+        assert.deepEqual(restored.meta, { watermark: '2025-06-01T00:00:00.000Z', fullLoadAt: 1234 });
+        assert.equal(restored.store.count, store.count);
+        for (let row = 0; row < store.count; row++) {
+            assert.deepEqual(restored.store.record(row), store.record(row));
+        }
+        assert.equal(restored.store.rowOf(9999), store.rowOf(9999));
+    });
+
+    it('keeps text ids', async () => {
+        const store = new HazardStore();
+        store.upsert({ id: 'b7e3', lat: 1, lng: 2, severity: 1, type: 'pothole' });
+        store.upsert({ id: '42', lat: 3, lng: 4, severity: 2, type: 'crack' });
+
+        const path = join(dir, 'text.snapshot');
+        await writeSnapshot(path, store, { fullLoadAt: 0 });
+        const { store: restored } = await readSnapshot(path);
+
+        assert.deepEqual(restored.columns().ids, ['b7e3', '42']);
+        assert.equal(restored.record(restored.rowOf('b7e3')).type, 'pothole');
+    });
+
+    it('round-trips an empty store that still accepts rows', async () => {
+        const path = join(dir, 'empty.snapshot');
+        await writeSnapshot(path, new HazardStore(), { fullLoadAt: 0 });
+        const { store } = await readSnapshot(path);
+
+        assert.equal(store.count, 0);
+        store.upsert({ id: 1, lat: 40.7, lng: -74, severity: 4 });
+        assert.equal(store.count, 1);
+        assert.equal(store.record(store.rowOf(1)).severity, 4);
+    });
+
+    it('rejects files that are not snapshots', async () => {
+        const path = join(dir, 'bogus.snapshot');
+        await writeFile(path, 'not a snapshot');
+        await assert.rejects(readSnapshot(path), /is not a hazard snapshot/);
+    });
+});
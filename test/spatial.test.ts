@@ -0,0 +1,100 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { haversineMeters, SpatialIndex } from '../src/geo/index.js';
+import { generateHazards, seededRandom } from '../bench/stub.js';
+
+describe('SpatialIndex', () => {
+    const hazards = generateHazards(10_000, 5);
+    const count = hazards.length + 2;
+    const lats = new Float64Array(count);
+    const lngs = new Float64Array(count);
+    hazards.forEach((hazard, row) => {
+        lats[row] = hazard.lat;
+        lngs[row] = hazard.lng;
+    });
+    // A far-away outlier, and a row without coordinates that is left out
+    lats[count - 2] = -33.87;
+    lngs[count - 2] = 151.21;
+    lats[count - 1] = NaN;
+    lngs[count - 1] = NaN;
+    const indexed = (row: number) => !isNaN(lats[row]);
+    const index = new SpatialIndex(lats, lngs, count, 0.01, indexed);
+
+    const random = seededRandom(9);
+    const queries = Array.from({ length: 50 }, () => [40.5 + random() * 0.45, -74.2 + random() * 0.5]);
+    queries.push([0, 0], [89.9, 179.9], [-89.9, -179.9]);
+
+    it('finds the nearest point a linear scan finds', () => {
+        for (const [lat, lng] of queries) {
+            let best = Infinity;
+            for (let row = 0; row < count; row++) {
+                if (indexed(row)) {
+                    best = Math.min(best, haversineMeters(lat, lng, lats[row], lngs[row]));
+                }
+            }
+            const nearest = index.nearest(lat, lng);
+            assert.ok(nearest, `nearest to ${lat}, ${lng}`);
+            assert.ok(Math.abs(nearest.distance - best) < 1e-6, `nearest to ${lat}, ${lng}`);
+            assert.ok(Math.abs(haversineMeters(lat, lng, lats[nearest.row], lngs[nearest.row]) - best) < 1e-6);
+        }
+    });
+
+    it('looks past the searched rings when what they found may not be nearest', () => {
+        // Row 0 sits in a corner cell of the last searched ring, about 90
+        // cells away; row 1 is straight east, 70 cells out and unsearched
+        const sparse = new SpatialIndex(
+            Float64Array.from([0.645, 0.005]),
+            Float64Array.from([0.645, 0.705]),
+            2
+        );
+        const nearest = sparse.nearest(0.005, 0.005, 64);
+        assert.equal(nearest?.row, 1);
+        assert.ok(Math.abs(nearest!.distance - haversineMeters(0.005, 0.005, 0.005, 0.705)) < 1e-6);
+    });
+
+    it('finds the same points within a radius as a linear scan', () => {
+        for (const radius of [50, 500, 2_000, 10_000, 50_000, 20_000_000]) {
+            for (const [lat, lng] of queries) {
+                const expected: number[] = [];
+                for (let row = 0; row < count; row++) {
+                    if (indexed(row) && haversineMeters(lat, lng, lats[row], lngs[row]) <= radius) {
+                        expected.push(row);
+                    }
+                }
+
+                const { count: found, rows, distances } = index.withinRadius(lat, lng, radius);
+                assert.equal(found, expected.length, `radius ${radius} around ${lat}, ${lng}`);
+                assert.deepEqual(Array.from(rows).sort((a, b) => a - b), expected);
+                for (let i = 0; i < found; i++) {
+                    assert.ok(Math.abs(distances[i] - haversineMeters(lat, lng, lats[rows[i]], lngs[rows[i]])) < 1e-6);
+                }
+            }
+        }
+    });
+
+    it('visits the points inside a bounding box', () => {
+        const boxes: Array<[number, number, number, number]> = [
+            [40.6, -74.1, 40.7, -73.9],
+            [40.55, -74.15, 40.9, -73.75],
+            [-90, -180, 90, 180],
+            [10, 10, 11, 11],
+        ];
+        for (const [minLat, minLng, maxLat, maxLng] of boxes) {
+            const expected: number[] = [];
+            for (let row = 0; row < count; row++) {
+                if (lats[row] >= minLat && lats[row] <= maxLat && lngs[row] >= minLng && lngs[row] <= maxLng) {
+                    expected.push(row);
+                }
+            }
+            const visited: number[] = [];
+            index.forEachInBox(minLat, minLng, maxLat, maxLng, (row) => visited.push(row));
+            assert.deepEqual(visited.sort((a, b) => a - b), expected);
+        }
+    });
+
+    it('answers nothing when empty', () => {
+        const empty = new SpatialIndex(new Float64Array(0), new Float64Array(0), 0);
+        assert.equal(empty.nearest(40.7, -74), undefined);
+        assert.equal(empty.withinRadius(40.7, -74, 1_000).count, 0);
+    });
+});
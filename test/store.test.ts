@@ -0,0 +1,60 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { HazardStore, StoreObserver } from '../src/data/index.js';
+import { generateHazards } from '../bench/stub.js';
+
+describe('HazardStore', () => {
+    it('inserts, overwrites and looks up hazards', () => {
+        const store = new HazardStore();
+        assert.equal(store.upsert({ id: 1, lat: 40.7, lng: -74, severity: 3, type: 'pothole', status: 'open', area: 'Downtown' }), true);
+        assert.equal(store.upsert({ id: 2, lat: 40.8, lng: -73.9, severity: 1, type: 'crack', status: 'open', area: 'Uptown' }), true);
+        assert.equal(store.count, 2);
+
+        // Unchanged rows are not rewritten
+        assert.equal(store.upsert({ id: 1, lat: 40.7, lng: -74, severity: 3, type: 'pothole', status: 'open', area: 'Downtown' }), false);
+        assert.equal(store.upsert({ id: 1, lat: 40.7, lng: -74, severity: 5, type: 'pothole', status: 'resolved', area: 'Downtown' }), true);
+        assert.equal(store.count, 2);
+
+        const record = store.record(store.rowOf(1));
+        assert.equal(record.severity, 5);
+        assert.equal(record.status, 'resolved');
+        assert.equal(store.rowOf('2'), store.rowOf(2));
+        assert.equal(store.rowOf(3), -1);
+    });
+
+    it('keeps rows intact as it grows', () => {
+        const hazards = generateHazards(5000, 1);
+        const store = new HazardStore(1);
+        for (const hazard of hazards) {
+            store.upsert(hazard);
+        }
+        assert.equal(store.count, hazards.length);
+        for (const hazard of hazards) {
+            assert.deepEqual(store.record(store.rowOf(hazard.id)), hazard);
+        }
+    });
+
+    it('reports overwrites to observers as a removal then an addition', () => {
+        const store = new HazardStore();
+        const events: string[] = [];
+        const observer: StoreObserver = {
+            add: (_, row) => events.push(`add ${row} ${store.severity[row]}`),
+            remove: (_, row) => events.push(`remove ${row} ${store.severity[row]}`),
+        };
+        store.observe(observer);
+        store.upsert({ id: 'a', severity: 1 });
+        store.upsert({ id: 'a', severity: 1 });
+        store.upsert({ id: 'a', severity: 4 });
+        assert.deepEqual(events, ['add 0 1', 'remove 0 1', 'add 0 4']);
+    });
+
+    it('accepts inserts into a store adopted from empty columns', () => {
+        const store = HazardStore.fromColumns(new HazardStore().columns());
+        assert.equal(store.count, 0);
+        store.upsert({ id: 1, lat: 1, lng: 2, severity: 3 });
+        store.upsert({ id: 2, lat: 3, lng: 4, severity: 5 });
+        assert.equal(store.count, 2);
+        assert.equal(store.record(store.rowOf(1)).severity, 3);
+        assert.equal(store.record(store.rowOf(2)).lat, 3);
+    });
+});
@@ -0,0 +1,123 @@
+import { after, describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { mkdtemp, rm, writeFile } from 'node:fs/promises';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import {
+    CachedWeatherProvider,
+    DEFAULT_WEATHER_OPTIONS,
+    encodeGeohash,
+    FileWeatherProvider,
+    geohashCenter,
+    WeatherProvider
+} from '../src/weather/index.js';
+
+/** Provider that records every lookup it is asked for */
+class RecordingProvider implements WeatherProvider {
+    lookups: Array<{ lat: number; lng: number; at: number }> = [];
+
+    async condition(lat: number, lng: number, at: Date): Promise<string> {
+        this.lookups.push({ lat, lng, at: at.getTime() });
+        return isFinite(lat) ? encodeGeohash(lat, lng, 5) : 'nowhere';
+    }
+}
+
+describe('geohash', () => {
+    it('encodes the reference location and decodes to its cell center', () => {
+        assert.equal(encodeGeohash(57.64911, 10.40744, 11), 'u4pruydqqvj');
+        const center = geohashCenter('u4pruydqqvj');
+        assert.ok(Math.abs(center.lat - 57.64911) < 1e-5);
+        assert.ok(Math.abs(center.lng - 10.40744) < 1e-5);
+        assert.equal(encodeGeohash(center.lat, center.lng, 11), 'u4pruydqqvj');
+    });
+});
+
+describe('CachedWeatherProvider', () => {
+    const at = new Date('2026-03-01T10:42:00Z');
+    const hourStart = Date.parse('2026-03-01T10:00:00Z');
+
+    it('looks each cell up once per hour, at its center and the start of the hour', async () => {
+        const upstream = new RecordingProvider();
+        const weather = new CachedWeatherProvider(upstream, DEFAULT_WEATHER_OPTIONS);
+        // Two hundred hazards around two points a few tens of km apart, and two without a location
+        const lats = [...Array.from({ length: 100 }, (_, i) => 40.7 + i * 1e-5), ...Array.from({ length: 100 }, (_, i) => 41.0 + i * 1e-5), NaN, NaN];
+        const lngs = [...Array.from({ length: 100 }, () => -74.0), ...Array.from({ length: 100 }, () => -73.5), NaN, NaN];
+
+        const cells = new Set(lats.map((lat, i) => isFinite(lat) ? encodeGeohash(lat, lngs[i], 5) : ''));
+        assert.ok(cells.size < 10);
+
+        const conditions = await weather.conditions(lats, lngs, at);
+        assert.equal(upstream.lookups.length, cells.size);
+        for (const lookup of upstream.lookups) {
+            assert.equal(lookup.at, hourStart);
+            if (isFinite(lookup.lat)) {
+                const center = geohashCenter(encodeGeohash(lookup.lat, lookup.lng, 5));
+                assert.deepEqual({ lat: lookup.lat, lng: lookup.lng }, center);
+            }
+        }
+        for (let i = 0; i < lats.length; i++) {
+            assert.equal(conditions[i], isFinite(lats[i]) ? encodeGeohash(lats[i], lngs[i], 5) : 'nowhere');
+        }
+
+        // Later in the same hour everything is cached; the next hour is looked up again
+        await weather.conditions(lats, lngs, new Date(hourStart + 59 * 60_000));
+        assert.equal(upstream.lookups.length, cells.size);
+        await weather.conditions(lats, lngs, new Date(hourStart + 60 * 60_000));
+        assert.equal(upstream.lookups.length, 2 * cells.size);
+        assert.equal(weather.stats().hits, cells.size);
+    });
+
+    it('shares one lookup between concurrent callers in a cell', async () => {
+        const upstream = new RecordingProvider();
+        const weather = new CachedWeatherProvider(upstream, DEFAULT_WEATHER_OPTIONS);
+        const conditions = await Promise.all(Array.from({ length: 20 }, (_, i) => weather.condition(40.7, -74.0 + i * 1e-6, at)));
+        assert.equal(new Set(conditions).size, 1);
+        assert.equal(upstream.lookups.length, 1);
+    });
+
+    it('does not keep a failed lookup', async () => {
+        let calls = 0;
+        const flaky: WeatherProvider = {
+            condition: async () => {
+                if (++calls === 1) {
+                    throw new Error('weather service down');
+                }
+                return 'snow';
+            },
+        };
+        const weather = new CachedWeatherProvider(flaky, DEFAULT_WEATHER_OPTIONS);
+        await assert.rejects(weather.condition(40.7, -74.0, at), /weather service down/);
+        assert.equal(await weather.condition(40.7, -74.0, at), 'snow');
+    });
+});
+
+describe('FileWeatherProvider', async () => {
+    const dir = await mkdtemp(join(tmpdir(), 'pothole-weather-'));
+    after(() => rm(dir, { recursive: true, force: true }));
+
+    const path = join(dir, 'weather.json');
+    const cell = encodeGeohash(40.7, -74.0, 5);
+    await writeFile(path, JSON.stringify({
+        default: 'fog',
+        cells: {
+            [cell.slice(0, 3)]: 'rain',
+            [cell]: [
+                { to: '2026-03-01T00:00:00Z', condition: 'snow' },
+                { from: '2026-03-01T00:00:00Z', to: '2026-03-02T00:00:00Z', condition: 'freezing' },
+            ],
+        },
+    }));
+    const weather = new FileWeatherProvider(path);
+
+    it('answers from the longest matching prefix in force at the time', async () => {
+        assert.equal(await weather.condition(40.7, -74.0, new Date('2026-02-01T00:00:00Z')), 'snow');
+        assert.equal(await weather.condition(40.7, -74.0, new Date('2026-03-01T12:00:00Z')), 'freezing');
+        // No window covers the time, so the shorter prefix answers
+        assert.equal(await weather.condition(40.7, -74.0, new Date('2026-04-01T00:00:00Z')), 'rain');
+    });
+
+    it('falls back to the default outside every cell and without a location', async () => {
+        assert.equal(await weather.condition(-33.87, 151.21, new Date()), 'fog');
+        assert.equal(await weather.condition(NaN, NaN, new Date()), 'fog');
+    });
+});
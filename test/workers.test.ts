@@ -0,0 +1,105 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { projectSeverities } from '../src/projection.js';
+import { ProjectionTask, WorkerPool } from '../src/workers/index.js';
+import { seededRandom } from '../bench/stub.js';
+
+/** A projection task over count random hazards */
+function projectionTask(count: number, seed: number): ProjectionTask {
+    const random = seededRandom(seed);
+    return {
+        initial: Float64Array.from({ length: count }, () => 1 + random() * 4),
+        weeklyRates: Float64Array.from({ length: count }, () => random() * 0.5),
+        stepWeeks: 1,
+        horizon: 12,
+        summary: false,
+    };
+}
+
+/** What the task computes on the event loop, taken before its buffers are transferred */
+function expected(task: ProjectionTask): number[] {
+    return Array.from(projectSeverities(task.initial, task.weeklyRates, task.stepWeeks, task.horizon));
+}
+
+describe('WorkerPool', () => {
+    it('runs tasks on threads and transfers their buffers', async () => {
+        const pool = new WorkerPool({ threads: 2, maxQueue: 16 });
+        try {
+            const tasks = Array.from({ length: 6 }, (_, i) => projectionTask(1000, i));
+            const wanted = tasks.map(expected);
+            const results = await Promise.all(tasks.map((task) => pool.run('project', task)));
+            assert.deepEqual(results.map((result) => Array.from(result)), wanted);
+            // The input buffers moved to the thread instead of being copied
+            assert.equal(tasks[0].initial.length, 0);
+            const stats = pool.stats();
+            assert.equal(stats.completed, 6);
+            assert.ok(stats.threads <= 2);
+        } finally {
+            await pool.close();
+        }
+    });
+
+    it('refuses new tasks once the queue is full', async () => {
+        const pool = new WorkerPool({ threads: 1, maxQueue: 2 });
+        try {
+            // The first task goes straight to the thread, the next two wait
+            const accepted = [1, 2, 3].map((seed) => pool.run('project', projectionTask(100, seed)));
+            await assert.rejects(pool.run('project', projectionTask(100, 4)), /Compute queue is full/);
+            assert.equal(pool.stats().queued, 2);
+            assert.equal(pool.stats().rejected, 1);
+            await Promise.all(accepted);
+            assert.equal(pool.stats().completed, 3);
+        } finally {
+            await pool.close();
+        }
+    });
+
+    it('drops a queued task whose caller gives up, but not a running one', async () => {
+        const pool = new WorkerPool({ threads: 1, maxQueue: 4 });
+        try {
+            const runningCaller = new AbortController();
+            const queuedCaller = new AbortController();
+            const running = pool.run('project', projectionTask(100, 1), runningCaller.signal);
+            const queued = pool.run('project', projectionTask(100, 2), queuedCaller.signal);
+            const after = pool.run('project', projectionTask(100, 3));
+
+            queuedCaller.abort(new Error('caller gave up'));
+            runningCaller.abort(new Error('too late'));
+            await assert.rejects(queued, /caller gave up/);
+            assert.equal(pool.stats().cancelled, 1);
+            assert.equal((await running).length, 100 * 12);
+            assert.equal((await after).length, 100 * 12);
+            await assert.rejects(pool.run('project', projectionTask(100, 4), AbortSignal.abort(new Error('already gone'))), /already gone/);
+        } finally {
+            await pool.close();
+        }
+    });
+
+    it('passes a task error back to its caller and keeps serving', async () => {
+        const pool = new WorkerPool({ threads: 1, maxQueue: 4 });
+        try {
+            await assert.rejects(pool.run('project', null as any));
+            assert.equal(pool.stats().failed, 1);
+            const task = projectionTask(10, 5);
+            const wanted = expected(task);
+            assert.deepEqual(Array.from(await pool.run('project', task)), wanted);
+        } finally {
+            await pool.close();
+        }
+    });
+
+    it('rejects queued tasks when closed', async () => {
+        const pool = new WorkerPool({ threads: 1, maxQueue: 4 });
+        const running = assert.rejects(pool.run('project', projectionTask(100, 1)), /Compute pool closed/);
+        const queued = assert.rejects(pool.run('project', projectionTask(100, 2)), /Compute pool closed/);
+        await pool.close();
+        await Promise.all([running, queued]);
+    });
+
+    it('runs tasks on the event loop without threads', async () => {
+        const pool = new WorkerPool({ threads: 0, maxQueue: 0 });
+        const task = projectionTask(50, 6);
+        assert.deepEqual(Array.from(await pool.run('project', task)), expected(task));
+        assert.equal(pool.stats().threads, 0);
+    });
+});